@@ -0,0 +1,77 @@
+"""
+AML 解析基准 - 单次扫描解析器 vs 旧的逐标签正则解析
+
+用法: python -m benchmarks.bench_aml_parser [记忆条数]
+"""
+import random
+import re
+import sys
+import time
+from core.parser import parse_aml
+from core.state.models import AgentState, TodoItem
+
+REPEAT = 5
+
+
+def legacy_parse_aml(text: str) -> AgentState:
+    """旧实现：每个标签一次整篇正则搜索，模式每次调用时拼接"""
+    def tag_content(tag: str) -> str:
+        match = re.search(f"<{tag}>(.*?)</{tag}>", text, re.DOTALL)
+        return match.group(1).strip() if match else ""
+
+    def as_list(tag: str) -> list:
+        return [l.strip() for l in tag_content(tag).split("\n") if l.strip()]
+
+    agent = {}
+    for line in tag_content("agent").split("\n"):
+        if ":" in line:
+            key, val = line.split(":", 1)
+            agent[key.strip()] = val.strip()
+    todos = []
+    for line in tag_content("todo").split("\n"):
+        line = line.strip()
+        if line:
+            status = "DONE" if line.startswith("! ") else "PENDING"
+            todos.append(TodoItem(content=line[1:].strip() if line[0] in "?!" else line, status=status))
+    return AgentState(agent, as_list("knowledge"), as_list("memory"), as_list("code"), todos)
+
+
+def make_document(memory_lines: int) -> str:
+    rng = random.Random(0)
+    words = ["创建", "文件", "write_file", "task/index.html", "成功", "失败", "读取", "目录", "样式", "脚本"]
+
+    def line(i: int) -> str:
+        return f"[2025-12-10 17:{i % 60:02d}:{i % 60:02d}] " + " ".join(rng.choice(words) for _ in range(12))
+
+    return (
+        "<agent>\nname: bench\nobjective: 基准\nstyle: 简洁\n</agent>\n\n"
+        "<knowledge>\n" + "\n".join(f"[经验] {line(i)}" for i in range(memory_lines // 10)) + "\n</knowledge>\n\n"
+        "<memory>\n" + "\n".join(line(i) for i in range(memory_lines)) + "\n</memory>\n\n"
+        "<code>\n" + "\n".join(f"print({i})" for i in range(memory_lines // 10)) + "\n</code>\n\n"
+        "<todo>\n" + "\n".join(f"{'!' if i % 3 else '?'} 任务 {i}" for i in range(memory_lines // 20)) + "\n</todo>\n"
+    )
+
+
+def best_of(fn, text: str) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    memory_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    text = make_document(memory_lines)
+    assert parse_aml(text) == legacy_parse_aml(text)
+
+    legacy = best_of(legacy_parse_aml, text)
+    current = best_of(parse_aml, text)
+    print(f"文档 {len(text.encode('utf-8')) / 1024 / 1024:.2f} MB，记忆 {memory_lines} 条")
+    print(f"逐标签正则: {legacy * 1000:.1f} ms")
+    print(f"单次扫描:   {current * 1000:.1f} ms（{legacy / current:.1f}x）")
+
+
+if __name__ == "__main__":
+    main()
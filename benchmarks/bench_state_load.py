@@ -0,0 +1,45 @@
+"""
+状态加载基准 - 每次解析 .md 文本 vs 读取二进制快照（AGI_STATE_SNAPSHOT=1）vs StateStore 进程内缓存
+
+用法: python -m benchmarks.bench_state_load [记忆条数]
+"""
+import os
+import sys
+import tempfile
+import time
+from benchmarks.bench_aml_parser import make_document, REPEAT
+from core.parser import parse_aml
+from core.state import StateStore, load_state
+
+
+def best_of(fn) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    memory_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    path = os.path.join(tempfile.mkdtemp(), "bench.md")
+    store = StateStore(path)
+    store.save(parse_aml(make_document(memory_lines)))
+
+    def parse_text():
+        with open(path, "r", encoding="utf-8") as f:
+            return parse_aml(f.read())
+
+    assert load_state(path, snapshot=True) == parse_text()
+    parsed = best_of(parse_text)
+    snapshot = best_of(lambda: load_state(path, snapshot=True))
+    cached = best_of(store.load)
+    print(f"文档 {os.path.getsize(path) / 1024 / 1024:.2f} MB，记忆 {memory_lines} 条")
+    print(f"解析文本: {parsed * 1000:.1f} ms")
+    print(f"读取快照: {snapshot * 1000:.1f} ms（{parsed / snapshot:.1f}x）")
+    print(f"缓存命中: {cached * 1000:.2f} ms（{parsed / cached:.0f}x）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+任务文件列表基准 - 完整解析 vs 惰性视图（只解析 agent 与 todo）vs 仅读取文件
+
+用法: python -m benchmarks.bench_task_listing [文件数] [每个文件的记忆条数]
+"""
+import os
+import sys
+import tempfile
+import time
+from benchmarks.bench_aml_parser import make_document, REPEAT
+from core.parser import parse_aml, parse_aml_lazy
+
+
+def best_of(fn, paths) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for path in paths:
+            fn(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def read_only(path: str):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def full_parse(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        state = parse_aml(f.read())
+    return state.agent.get("name"), sum(1 for t in state.todo if t.status == "PENDING")
+
+
+def lazy_parse(path: str):
+    with open(path, "rb") as f:
+        state = parse_aml_lazy(f.read())
+    return state.agent.get("name"), state.pending_count
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    memory_lines = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    work_dir = tempfile.mkdtemp()
+    document = make_document(memory_lines)
+    paths = []
+    for i in range(files):
+        path = os.path.join(work_dir, f"agent_{i}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(document)
+        paths.append(path)
+    assert full_parse(paths[0]) == lazy_parse(paths[0])
+
+    io = best_of(read_only, paths)
+    full = best_of(full_parse, paths)
+    lazy = best_of(lazy_parse, paths)
+    size = os.path.getsize(paths[0]) * files / 1024 / 1024
+    print(f"{files} 个文件，共 {size:.1f} MB")
+    print(f"仅读取:   {io * 1000:.1f} ms")
+    print(f"完整解析: {full * 1000:.1f} ms")
+    print(f"惰性视图: {lazy * 1000:.1f} ms（{full / lazy:.1f}x）")
+
+
+if __name__ == "__main__":
+    main()
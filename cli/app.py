@@ -25,7 +25,19 @@ def create_parser() -> argparse.ArgumentParser:
     )
 
     # work 命令
-    subparsers.add_parser("work", help="批量处理 work/ 目录中的任务")
+    work_parser = subparsers.add_parser("work", help="批量处理 work/ 目录中的任务")
+    work_parser.add_argument(
+        "-p", "--parallel",
+        type=int,
+        default=0,
+        metavar="N",
+        help="在一个事件循环中并发执行所有任务文件，最多 N 个 LLM 请求同时在途（取代 AGI_LLM_MAX_CONCURRENCY 上限）"
+    )
+    work_parser.add_argument(
+        "--plan-ahead",
+        action="store_true",
+        help="每个任务先一次生成完整行动列表，结果偏离预期时才逐步规划"
+    )
 
     # ui 命令
     ui_parser = subparsers.add_parser("ui", help="启动 Gradio Web UI")
@@ -51,7 +63,7 @@ def main():
             forever=args.forever
         )
     elif args.command == "work":
-        work_command()
+        work_command(parallel=args.parallel, plan_ahead=args.plan_ahead)
     elif args.command == "ui":
         ui_command(share=args.share)
     else:
@@ -1,7 +1,7 @@
 """select 命令 - 交互式选择任务文件"""
 from pathlib import Path
 from core import Agent
-from core.parser import parse_aml
+from core.parser import parse_aml_lazy
 
 
 def get_task_files() -> list[tuple[Path, str]]:
@@ -17,11 +17,10 @@ def get_task_files() -> list[tuple[Path, str]]:
     tasks = []
     for md_file in md_files:
         try:
-            with open(md_file, "r", encoding="utf-8") as f:
-                content = f.read()
-            state = parse_aml(content)
+            # 只解析 agent 与 todo 段落，知识与记忆不解码
+            state = parse_aml_lazy(md_file.read_bytes())
             name = state.agent.get("name", md_file.stem)
-            pending_count = sum(1 for t in state.todo if t.status == "PENDING")
+            pending_count = state.pending_count
             tasks.append((md_file, name, pending_count))
         except Exception:
             tasks.append((md_file, md_file.stem, 0))
@@ -1,10 +1,16 @@
 """work 命令 - 批量处理 work/ 目录中的任务文件"""
+import asyncio
 from pathlib import Path
-from core import Agent
+from core import Agent, run_agents
 
 
-def work_command():
-    """处理 work/ 目录中的所有任务文件"""
+def work_command(parallel: int = 0, plan_ahead: bool = False):
+    """处理 work/ 目录中的所有任务文件
+    
+    Args:
+        parallel: 大于 0 时并发执行所有文件的全部待办，限制同时在途的 LLM 请求数
+        plan_ahead: 每个任务先一次生成完整行动列表，偏离预期时才逐步规划
+    """
     work_dir = Path("work")
     
     if not work_dir.exists():
@@ -21,10 +27,25 @@ def work_command():
 
     print(f"📋 发现 {len(md_files)} 个任务文件")
 
+    if parallel > 0:
+        print(f"⚡ 并发模式：最多 {parallel} 个 LLM 请求同时在途")
+        results = asyncio.run(run_agents(
+            [str(f) for f in md_files],
+            max_in_flight=parallel,
+            plan_ahead=plan_ahead
+        ))
+        for path, stats in results.items():
+            if isinstance(stats, Exception):
+                print(f"❌ {path} 处理失败: {stats}")
+            else:
+                print(f"✅ {path}: 完成 {stats['completed']}, 失败 {stats['failed']}")
+        print("\n📦 work/ 目录任务处理完成")
+        return
+
     for md_file in md_files:
         print(f"\n--- 处理: {md_file} ---")
         try:
-            agent = Agent(str(md_file), start_background=False, mode="foreground")
+            agent = Agent(str(md_file), start_background=False, mode="foreground", plan_ahead=plan_ahead)
             pending = agent.state.next_pending_todo()
             
             if pending:
@@ -1,7 +1,7 @@
 """Genesis Agent Core - AGI 运行时内核"""
 
-from .agent import Agent
+from .agent import Agent, run_agents
 from .state.models import AgentState, TodoItem
 
 __version__ = "0.1.0"
-__all__ = ["Agent", "AgentState", "TodoItem"]
+__all__ = ["Agent", "run_agents", "AgentState", "TodoItem"]
@@ -1,8 +1,11 @@
 """Agent 主类 - 对外统一接口"""
+import asyncio
 import os
+from typing import Callable, Dict, List
 from .state import StateStore
-from .mind import LLMClient
-from .loop import LifeLoop
+from .mind import AdmissionController, AsyncLLMClient, ResponseCache
+from .mind.llm import MAX_IN_FLIGHT
+from .loop import LifeLoop, AsyncLifeLoop
 from .scheduler import BackgroundScheduler
 
 
@@ -16,21 +19,28 @@ class Agent:
         self,
         dna_file: str,
         mode: str = "foreground",
-        start_background: bool = True
+        start_background: bool = True,
+        stream: bool = False,
+        plan_ahead: bool = False
     ):
         self.dna_file = dna_file
         self.mode = mode
         
         # 初始化组件
         self.store = StateStore(dna_file)
-        self.llm = LLMClient()
+        self.llm = AsyncLLMClient(
+            cache=ResponseCache.from_env(),
+            background=(mode == "background")  # 后台自省不与前台争抢 LLM 名额
+        )
         self.meta_prompt = self._load_meta_prompt() if mode in ["background", "dual"] else None
         
         # 生命循环
         self.loop = LifeLoop(
             store=self.store,
             llm=self.llm,
-            meta_prompt=self.meta_prompt
+            meta_prompt=self.meta_prompt,
+            stream=stream,
+            plan_ahead=plan_ahead
         )
         
         # 后台调度
@@ -65,8 +75,8 @@ class Agent:
         return self.store.state
     
     def reload(self):
-        """重新加载状态"""
-        self.store.load()
+        """重新加载状态（忽略缓存）"""
+        self.store.load(force=True)
     
     def save(self):
         """保存状态"""
@@ -94,3 +104,39 @@ class Agent:
         """停止 Agent"""
         self.loop.request_stop()
         self.scheduler.stop()
+
+
+async def run_agents(
+    dna_files: List[str],
+    max_in_flight: int = MAX_IN_FLIGHT,
+    meta_prompt: str = None,
+    on_progress: Callable[[str], None] = None,
+    stream: bool = False,
+    plan_ahead: bool = False,
+    llm: AsyncLLMClient = None
+) -> Dict[str, dict]:
+    """
+    在一个事件循环中并发运行多个 Agent 的全部待办任务
+    所有 Agent 共享一个 LLM 客户端，同时在途的请求数不超过 max_in_flight
+    
+    Args:
+        llm: 共享的异步客户端，为空时按 max_in_flight 新建（准入上限同为 max_in_flight，
+             不受 AGI_LLM_MAX_CONCURRENCY 限制）
+    
+    Returns:
+        {dna_file: 执行统计或异常}
+    """
+    llm = llm or AsyncLLMClient(
+        cache=ResponseCache.from_env(),
+        admission=AdmissionController(max_concurrency=max_in_flight),
+        max_in_flight=max_in_flight
+    )
+    loops = [
+        AsyncLifeLoop(StateStore(path), llm, meta_prompt=meta_prompt, stream=stream, plan_ahead=plan_ahead)
+        for path in dna_files
+    ]
+    results = await asyncio.gather(
+        *(loop.run_all(on_progress) for loop in loops),
+        return_exceptions=True
+    )
+    return dict(zip(dna_files, results))
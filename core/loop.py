@@ -1,49 +1,102 @@
 """生命循环 - Agent 的核心执行逻辑"""
+import asyncio
+import collections
 import datetime
+import functools
+import threading
 from typing import Optional, Callable
-from .state import AgentState, TodoItem, StateStore
-from .mind import LLMClient, Planner, MemoryManager
-from .tools import ToolRegistry, ToolExecutor, register_builtins
+from .state import AgentState, TodoItem, StateStore, MemoryArchive
+from .mind import LLMClient, AsyncLLMClient, Planner, MemoryManager, Priority, TaskConversation, CircuitOpenError
+from .mind.dedup import KnowledgeDeduper
+from .mind.memory import PENDING_TAG, is_pending, local_summary, tools_from_actions
+from .mind.planner import Plan
+from .mind.retrieval import ContextRetriever
+from .mind.verifier import CompletionContext, CompletionVerifier
+from .tools import ToolRegistry, ToolExecutor, register_builtins, is_error_output
+from .scheduler import PostProcessQueue, PostProcessJournal
 
 
-class LifeLoop:
+class AsyncLifeLoop:
     """
     生命循环 - 感知→规划→行动→记忆→沉淀
     
     两层循环结构：
     - 外层：遍历所有待办任务，直到全部完成
     - 内层：单个任务的多步执行 + 重试机制
+    
+    基于 asyncio 实现，多个 Agent 可在同一个事件循环中并发运行
     """
     
     MAX_STEPS_PER_TASK = 10  # 单个任务最大执行步数
     MAX_RETRIES = 3  # 单个任务最大重试次数
+    CONVERSATION_MODE = True  # 任务内多轮对话：工具调用与完整观察结果作为消息回传给模型
+    COMPLETION_TOOL = True  # 规划响应通过 task_complete 伪工具声明完成，不再单独调用 LLM 检查
+    CONTEXT_RETRIEVAL = True  # 规划上下文按任务从全部知识与记忆中检索，而不是只取最近的条目
+    BACKGROUND_POSTPROCESS = True  # 摘要、蒸馏、失败分析在后台队列中执行，下一个任务不必等待
     
     def __init__(
         self,
         store: StateStore,
-        llm: LLMClient,
+        llm: AsyncLLMClient,
         registry: ToolRegistry = None,
-        meta_prompt: str = None
+        meta_prompt: str = None,
+        stream: bool = False,
+        plan_ahead: bool = False
     ):
         self.store = store
         self.llm = llm
         self.meta_prompt = meta_prompt
+        self.plan_ahead = plan_ahead  # 预规划：每个任务先一次生成完整行动列表，偏离时才逐步规划
+        self.plan_stats: "collections.Counter[str]" = collections.Counter()
         self._stop_requested = False
         
         # 初始化工具
         self.registry = registry or ToolRegistry()
         register_builtins(self.registry)
+        self.archive = MemoryArchive.for_dna(store.filepath)
+        self._register_recall()
         self.executor = ToolExecutor(self.registry)
         
         # 初始化认知组件
-        self.planner = Planner(llm, self.registry.get_schemas_for_llm())
+        self.planner = Planner(
+            llm,
+            self.registry.get_schemas_for_llm(),
+            stream=stream,
+            completion_tool=self.COMPLETION_TOOL,
+            retriever=ContextRetriever.for_dna(store.filepath) if self.CONTEXT_RETRIEVAL else None
+        )
         self.memory_mgr = MemoryManager(llm)
+        self.knowledge_dedup = KnowledgeDeduper()
+        self.postprocess = PostProcessQueue()
+        self.journal = PostProcessJournal.for_dna(store.filepath)
+        # 有完成信号时规则无法判断就交给下一步规划声明，否则回退到 LLM 检查
+        self.verifier = CompletionVerifier(
+            None if self.COMPLETION_TOOL else self.planner.check_task_completion
+        )
     
     def request_stop(self):
         """请求停止循环"""
         self._stop_requested = True
     
-    def run_all(self, on_progress: Callable[[str], None] = None) -> dict:
+    def _register_recall(self):
+        """recall 工具：按关键词/时间从本 Agent 的冷记忆归档中取回旧记忆"""
+        self.registry.register(
+            name="recall",
+            description="从记忆归档中检索已被蒸馏淘汰的旧记忆（过去做过什么、结果如何）",
+            parameters={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "关键词"},
+                    "since": {"type": "string", "description": "起始时间，如 2025-12-10（可选）"},
+                    "until": {"type": "string", "description": "截止时间，如 2025-12-31（可选）"}
+                },
+                "required": ["query"]
+            },
+            handler=self.archive.recall_text,
+            modifies_state=False
+        )
+    
+    async def run_all(self, on_progress: Callable[[str], None] = None) -> dict:
         """
         执行所有待办任务，直到全部完成
         
@@ -52,6 +105,7 @@ class LifeLoop:
             
         Returns:
             执行统计 {"completed": int, "failed": int, "total": int}
+            LLM 服务熔断而中止时额外包含 "paused": True
         """
         self._stop_requested = False
         stats = {"completed": 0, "failed": 0, "total": 0}
@@ -62,6 +116,7 @@ class LifeLoop:
                 on_progress(msg)
         
         log("\n🚀 开始执行所有任务...")
+        await self._recover_pending(log)
         
         while not self._stop_requested:
             # 加载最新状态
@@ -69,6 +124,10 @@ class LifeLoop:
             task = state.next_pending_todo()
             
             if not task:
+                if self.postprocess.pending:
+                    # 失败分析可能还会创建后续任务，等后处理完成后再判断
+                    await self.postprocess.drain()
+                    continue
                 log("\n✅ 所有任务已完成！")
                 break
             
@@ -78,20 +137,42 @@ class LifeLoop:
             log(f"{'='*50}")
             
             # 执行单个任务（包含重试机制）
-            success = self._execute_task_with_retry(task, log)
+            try:
+                success = await self._execute_task_with_retry(task, log)
+            except CircuitOpenError as e:
+                # LLM 服务不可用时不消耗重试次数，任务保持待办，等服务恢复后再执行
+                stats["total"] -= 1
+                stats["paused"] = True
+                log(f"\n⏸️ {e}，暂停执行")
+                break
             
             if success:
                 stats["completed"] += 1
             else:
                 stats["failed"] += 1
         
+        await self.postprocess.drain()
         if self._stop_requested:
             log("\n⏹️ 收到停止请求，已终止")
         
         log(f"\n📊 执行统计: 完成 {stats['completed']}, 失败 {stats['failed']}, 总计 {stats['total']}")
+        if self.planner.prompt.stats.calls:
+            log(f"📊 {self.planner.prompt.stats.summary()}")
+        if self.verifier.stats:
+            log(f"📊 {self.verifier.summary()}")
+        if self.plan_stats:
+            log(f"📊 {self.plan_summary()}")
         return stats
 
-    def run_once(self) -> bool:
+    def plan_summary(self) -> str:
+        """预规划统计: 执行的预规划步数、偏离次数与节省的 LLM 调用"""
+        s = self.plan_stats
+        return (
+            f"预规划 {s['planned']}/{s['tasks']} 个任务，执行 {s['executed']} 步，"
+            f"偏离 {s['diverged']} 次，节省 {s['llm_calls_saved']} 次 LLM 调用"
+        )
+
+    async def run_once(self) -> bool:
         """
         执行一次生命循环（兼容旧接口）
         只处理一个任务，但会完整执行该任务（多步+重试）
@@ -99,54 +180,64 @@ class LifeLoop:
         Returns:
             是否有任务被执行
         """
+        await self._recover_pending(print)
         state = self.store.load()
         task = state.next_pending_todo()
         
         if not task:
+            await self.postprocess.drain()
             print("没有待办任务。")
             return False
         
         print(f"\n=== 执行任务: {task.content} ===")
-        self._execute_task_with_retry(task, print)
+        try:
+            await self._execute_task_with_retry(task, print)
+        except CircuitOpenError as e:
+            print(f"⏸️ {e}，暂停执行")
+            return False
+        finally:
+            await self.postprocess.drain()
         return True
     
-    def _execute_task_with_retry(self, task: TodoItem, log: Callable) -> bool:
+    async def _execute_task_with_retry(self, task: TodoItem, log: Callable) -> bool:
         """
         执行单个任务，包含重试机制
         
         Returns:
             任务是否成功完成
         """
-        state = self.store.load()
-        retry_count = 0
+        # 重试次数随 DNA 文件保存，中断后再次运行时接着用剩余的次数
+        retry_count = task.retry_count
+        max_retries = self._max_retries(task)
+        all_actions, last_result = [], ""
         
-        while retry_count < self.MAX_RETRIES:
+        while retry_count < max_retries:
             if self._stop_requested:
                 return False
             
             retry_count += 1
-            log(f"\n--- 尝试 {retry_count}/{self.MAX_RETRIES} ---")
+            log(f"\n--- 尝试 {retry_count}/{max_retries} ---")
             
             # 执行任务的多个步骤
-            success, all_actions, last_result = self._execute_task_steps(task, log)
+            success, all_actions, last_result = await self._execute_task_steps(task, log)
+            if not success:
+                self.llm.breaker.raise_if_open()  # 失败源于服务不可用时不计入重试
             
             if success:
-                # 任务成功完成
+                # 任务成功完成：先写入占位记忆，摘要生成后原位替换
                 state = self.store.load()
                 state.mark_done(task.content)
                 
                 timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                summary = self.memory_mgr.summarize_action(
-                    task=task.content,
-                    thought=f"经过{len(all_actions)}步完成",
-                    action="; ".join(all_actions[-3:]),
-                    result="任务成功完成"
-                )
-                state.memory.append(f"[{timestamp}] ✓ {summary}")
-                
-                self._maybe_distill(state)
+                placeholder = f"[{timestamp}] ✓ {PENDING_TAG} {task.content}（经过{len(all_actions)}步完成）"
+                state.memory.append(placeholder)
                 self.store.save(state)
                 
+                await self._post_process_placeholder(placeholder, {
+                    "kind": "summary", "task": task.content, "actions": all_actions, "timestamp": timestamp
+                }, log)
+                await self._post_process(self._maybe_distill, "记忆蒸馏")
+                
                 log(f"\n✅ 任务完成: {task.content}")
                 return True
             
@@ -159,14 +250,18 @@ class LifeLoop:
             state.memory.append(f"[{timestamp}] ⟳ 第{retry_count}次尝试未完成: {task.content}")
             self.store.save(state)
             
-            if retry_count < self.MAX_RETRIES:
+            if retry_count < max_retries:
                 log(f"⟳ 将进行第 {retry_count + 1} 次尝试...")
         
         # 达到最大重试次数，标记失败
-        self._handle_task_failure(task, all_actions, last_result, log)
+        await self._handle_task_failure(task, all_actions, last_result, log)
         return False
 
-    def _execute_task_steps(self, task: TodoItem, log: Callable) -> tuple:
+    def _max_retries(self, task: TodoItem) -> int:
+        """任务自带的最大重试次数（DNA 中的 max_retries），未设置时用 MAX_RETRIES"""
+        return task.max_retries or self.MAX_RETRIES
+
+    async def _execute_task_steps(self, task: TodoItem, log: Callable) -> tuple:
         """
         执行任务的多个步骤
         
@@ -176,42 +271,73 @@ class LifeLoop:
         state = self.store.load()
         all_actions = []
         last_result = ""
+        conversation = TaskConversation() if self.CONVERSATION_MODE else None
+        written_paths = []
+        first_step = 1
+        
+        if self.plan_ahead:
+            completed, executed, last_result = await self._run_planned_steps(
+                state, task, log, conversation, all_actions, written_paths
+            )
+            if completed:
+                return True, all_actions, last_result
+            # 预规划用满步数时仍留一步，让模型确认完成或继续
+            first_step = min(executed + 1, self.MAX_STEPS_PER_TASK)
         
-        for step in range(1, self.MAX_STEPS_PER_TASK + 1):
+        for step in range(first_step, self.MAX_STEPS_PER_TASK + 1):
             if self._stop_requested:
                 return False, all_actions, last_result
             
+            # LLM 服务熔断时立即中止，不再空耗步数和重试
+            self.llm.breaker.raise_if_open()
             log(f"\n  步骤 {step}/{self.MAX_STEPS_PER_TASK}")
             
             # 规划下一步
-            plan = self.planner.plan(
+            # 对话模式下本任务的行动已在历史消息中，不再拼进记忆
+            plan = await self.planner.plan(
                 agent=state.agent,
                 knowledge=state.knowledge,
-                memory=state.memory[-10:] + all_actions[-5:],
+                memory=state.memory if conversation else state.memory + all_actions[-5:],
                 task=task.content,
-                meta_prompt=self.meta_prompt
+                meta_prompt=self.meta_prompt,
+                on_progress=log,
+                history=conversation.messages() if conversation else None
             )
             
             log(f"  思考: {plan.thought[:100]}")
             
-            # 执行行动
-            action_log, result_str = self._execute_action(state, task, plan)
+            # 执行行动（一次响应中的全部工具调用作为一批执行）
+            action_log, result_str, observations = await self._execute_action(state, task, plan)
             all_actions.append(action_log)
             last_result = result_str
+            if conversation:
+                conversation.add_step(
+                    None if plan.tool_calls else plan.thought,
+                    plan.tool_calls,
+                    observations,
+                    action_log
+                )
             
             log(f"  结果: {result_str[:150]}")
             
-            # 检查是否完成
-            if plan.task_completed:
+            # 检查是否完成（同一响应中有行动失败时不采信完成信号）
+            if plan.task_completed and not any(map(is_error_output, observations)):
                 return True, all_actions, last_result
             
-            # 如果是 write_file 成功，检查任务是否完成
-            if plan.tool_call and plan.tool_call.name == "write_file" and "Error" not in result_str:
-                completion_check = self.planner.check_task_completion(
+            # 如果有 write_file 成功，检查任务是否完成
+            writes = [
+                (call, observation) for call, observation in zip(plan.tool_calls, observations)
+                if call.name == "write_file" and not is_error_output(observation)
+            ]
+            if writes:
+                written_paths.extend(call.args.get("path", "") for call, _ in writes)
+                completion_check = await self.verifier.verify(CompletionContext(
                     task=task.content,
+                    tool_call=writes[-1][0],
+                    result=writes[-1][1],
                     action_history=all_actions,
-                    last_result=result_str
-                )
+                    written_paths=written_paths
+                ))
                 log(f"  完成检查: {completion_check.get('reason', '')[:80]}")
                 
                 if completion_check.get("completed", False):
@@ -221,24 +347,116 @@ class LifeLoop:
         log(f"  ⚠️ 达到最大步数 {self.MAX_STEPS_PER_TASK}，任务未完成")
         return False, all_actions, last_result
     
-    def _execute_action(self, state: AgentState, task: TodoItem, plan) -> tuple:
-        """执行单个行动，返回 (action_log, result_str)"""
-        action_log = ""
-        result_str = ""
-        
-        if plan.tool_call:
-            if plan.tool_call.name == "add_task":
-                result_str = self._handle_add_task(state, task, plan.tool_call.args)
-                action_log = f"add_task: {plan.tool_call.args}"
-            else:
-                result = self.executor.execute(plan.tool_call)
-                result_str = str(result.output)
-                action_log = f"{plan.tool_call.name}({plan.tool_call.args}) -> {result_str[:50]}"
+    async def _run_planned_steps(
+        self,
+        state: AgentState,
+        task: TodoItem,
+        log: Callable,
+        conversation: Optional[TaskConversation],
+        all_actions: list,
+        written_paths: list
+    ) -> tuple:
+        """
+        预规划执行: 一次 LLM 调用得到行动列表，按顺序执行，中间不再调用 LLM
+        某步报错或输出不符合预期时停下，由调用方从下一步起逐步规划（已执行的步骤保留在对话中）
+        
+        Returns:
+            (completed, 已执行步数, last_result)
+        """
+        self.llm.breaker.raise_if_open()
+        self.plan_stats["tasks"] += 1
+        steps = await self.planner.plan_ahead(
+            agent=state.agent,
+            knowledge=state.knowledge,
+            memory=state.memory,
+            task=task.content,
+            meta_prompt=self.meta_prompt,
+            max_steps=self.MAX_STEPS_PER_TASK
+        )
+        if not steps:
+            log("  预规划不可用，改为逐步规划")
+            return False, 0, ""
+        self.plan_stats["planned"] += 1
+        log(f"  预规划 {len(steps)} 步")
+        
+        executed, last_result, completed = 0, "", False
+        for planned in steps:
+            if self._stop_requested:
+                break
+            executed += 1
+            call = planned.tool_call
+            log(f"\n  步骤 {executed}/{self.MAX_STEPS_PER_TASK}（预规划）")
+            action_log, last_result, observations = await self._execute_action(
+                state, task, Plan(thought=f"预规划第 {executed} 步", tool_calls=[call])
+            )
+            all_actions.append(action_log)
+            if conversation:
+                conversation.add_step(None, [call], observations, action_log)
+            log(f"  结果: {last_result[:150]}")
+            
+            if planned.diverged(last_result):
+                self.plan_stats["diverged"] += 1
+                log("  ↪ 结果偏离预规划，改为逐步规划")
+                break
+            if call.name == "write_file":
+                written_paths.append(call.args.get("path", ""))
         else:
-            result_str = plan.final_answer or "无行动"
-            action_log = f"思考: {plan.thought[:50]}"
+            # 全部按预期执行：只用规则复核最后一次写入，规则明确判为完成才算完成，
+            # 没有写入或规则无法判断时回到逐步规划，由模型调用 task_complete 声明
+            writes = [step.tool_call for step in steps if step.tool_call.name == "write_file"]
+            verdict = self.verifier.check_rules(CompletionContext(
+                task=task.content,
+                tool_call=writes[-1],
+                result=last_result,
+                action_history=all_actions,
+                written_paths=written_paths
+            )) if writes else None
+            completed = bool(verdict and verdict.get("completed"))
+            if not completed:
+                reason = verdict.get("reason", "") if verdict else "规则无法判断"
+                log(f"  完成检查: {reason[:80]}，改为逐步规划")
+        
+        # 逐步规划下每个已执行步骤各需一次规划调用，预规划只用了一次
+        saved = max(0, executed - 1)
+        self.plan_stats["executed"] += executed
+        self.plan_stats["llm_calls_saved"] += saved
+        log(f"  预规划执行 {executed} 步，节省 {saved} 次 LLM 调用")
+        return completed, executed, last_result
+    
+    async def _execute_action(self, state: AgentState, task: TodoItem, plan) -> tuple:
+        """
+        执行一次规划的全部工具调用
         
-        return action_log, result_str
+        Returns:
+            (action_log, result_str, 每个工具调用的观察结果)
+        """
+        if not plan.tool_calls:
+            result_str = plan.final_answer or plan.failure_reason or "无行动"
+            return f"思考: {plan.thought[:50]}", result_str, []
+        
+        logs, observations, batch = [], [], []
+        
+        async def flush():
+            # 只读工具在执行器中并发，修改状态的工具按顺序执行
+            results = await asyncio.to_thread(self.executor.execute_batch, batch)
+            for call, result in zip(batch, results):
+                observations.append(str(result.output))
+                logs.append(f"{call.name}({call.args}) -> {observations[-1][:50]}")
+            batch.clear()
+        
+        for call in plan.tool_calls:
+            if call.name != "add_task":
+                batch.append(call)
+                continue
+            # add_task 修改待办列表，与前后的工具调用保持顺序
+            if batch:
+                await flush()
+            observations.append(self._handle_add_task(state, task, call.args))
+            logs.append(f"add_task: {call.args}")
+        if batch:
+            await flush()
+        
+        return "; ".join(logs), "\n".join(observations), observations
     
     def _handle_add_task(self, state: AgentState, current: TodoItem, args: dict) -> str:
         """处理添加任务"""
@@ -247,39 +465,137 @@ class LifeLoop:
         if new_content.strip() == current.content.strip():
             return "错误: 不能将任务分解为它自己"
         
+        # 重新加载，不覆盖后处理在此期间写入的内容
+        state = self.store.load()
         state.todo.append(TodoItem(content=new_content, status="PENDING"))
         self.store.save(state)
         return f"任务已添加: {new_content}"
 
-    def _handle_task_failure(self, task: TodoItem, actions: list, last_result: str, log: Callable):
-        """处理任务失败"""
+    async def _handle_task_failure(self, task: TodoItem, actions: list, last_result: str, log: Callable):
+        """处理任务失败：立即标记并写入占位记忆，失败分析与后续任务交给后处理"""
         state = self.store.load()
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # 分析失败原因
-        failure_analysis = self._analyze_failure(task.content, actions, last_result)
-        
         # 标记任务失败
-        failure_reason = f"重试{self.MAX_RETRIES}次后仍未完成"
+        max_retries = self._max_retries(task)
+        failure_reason = f"重试{max_retries}次后仍未完成"
         state.mark_failed(task.content, failure_reason)
         
         # 记录到记忆
+        placeholder = f"[{timestamp}] 失败分析: {PENDING_TAG} {task.content}"
         state.memory.append(f"[{timestamp}] ✗ 任务失败: {task.content}")
-        state.memory.append(f"[{timestamp}] 失败分析: {failure_analysis}")
+        state.memory.append(placeholder)
+        self.store.save(state)
+        
+        log(f"\n✗ 任务失败（重试{max_retries}次）: {task.content}")
+        await self._post_process_placeholder(placeholder, {
+            "kind": "failure", "task": task.content, "actions": actions, "last_result": last_result
+        }, log)
+        await self._post_process(self._maybe_distill, "记忆蒸馏")
+    
+    async def _post_process(self, job: Callable, label: str):
+        """提交后处理任务；关闭后台后处理时就地执行"""
+        if self.BACKGROUND_POSTPROCESS:
+            self.postprocess.submit(job, label)
+        else:
+            await job()
+    
+    async def _post_process_placeholder(self, placeholder: str, record: dict, log: Callable):
+        """提交替换占位记忆的后处理任务，并记入持久化记录，进程中断后可重新提交"""
+        self.journal.add(placeholder, record)
+        label = "行动摘要" if record["kind"] == "summary" else "失败分析"
+        await self._post_process(functools.partial(self._run_placeholder_job, placeholder, record, log), label)
+    
+    async def _run_placeholder_job(self, placeholder: str, record: dict, log: Callable):
+        """执行占位任务；任务出错时用本地摘要替换占位，避免占位永久留在记忆中"""
+        task = TodoItem(content=record["task"])
+        try:
+            if record["kind"] == "summary":
+                await self._summarize_success(task, record["actions"], record["timestamp"], placeholder)
+            else:
+                await self._analyze_and_follow_up(task, record["actions"], record["last_result"], placeholder, log)
+        except Exception:
+            self._settle_placeholder(placeholder, record)
+            raise
+        finally:
+            self.journal.remove(placeholder)
+    
+    def _settle_placeholder(self, placeholder: str, record: dict = None):
+        """用本地模板摘要替换占位记忆；没有后处理记录时只去掉占位标记"""
+        if record:
+            result = "任务成功完成" if record["kind"] == "summary" else record["last_result"]
+            summary = local_summary(record["task"], tools_from_actions(record["actions"]), result)
+            entry = placeholder.replace(f"{PENDING_TAG} {record['task']}", summary)
+        else:
+            entry = " ".join(placeholder.replace(PENDING_TAG, "").split())
+        state = self.store.load()
+        if placeholder in state.memory:
+            self._replace_memory(state, placeholder, entry)
+            self.store.save(state)
+    
+    async def _recover_pending(self, log: Callable):
+        """
+        启动时处理上次进程中断留下的占位记忆
+        有后处理记录的重新提交（失败分析与后续任务不会丢失），没有记录的用本地摘要替换
+        """
+        if self.postprocess.pending:
+            return  # 本进程的后处理仍在进行，占位不是遗留的
+        memory = self.store.load().memory
+        stale = [entry for entry in memory if is_pending(entry)]
+        records = self.journal.records()
+        for placeholder in records.keys() - set(stale):
+            self.journal.remove(placeholder)
+        if not stale:
+            return
+        log(f"  恢复 {len(stale)} 条未完成的后处理")
+        for placeholder in stale:
+            if placeholder in records:
+                await self._post_process_placeholder(placeholder, records[placeholder], log)
+            else:
+                self._settle_placeholder(placeholder)
+        await self._post_process(self._maybe_distill, "记忆蒸馏")
+    
+    async def _summarize_success(self, task: TodoItem, actions: list, timestamp: str, placeholder: str):
+        """生成行动摘要并替换占位记忆"""
+        summary = await self.memory_mgr.summarize_action(
+            task=task.content,
+            thought=f"经过{len(actions)}步完成",
+            action="; ".join(actions),
+            result="任务成功完成"
+        )
+        state = self.store.load()
+        self._replace_memory(state, placeholder, f"[{timestamp}] ✓ {summary}")
+        self.store.save(state)
+    
+    async def _analyze_and_follow_up(
+        self,
+        task: TodoItem,
+        actions: list,
+        last_result: str,
+        placeholder: str,
+        log: Callable
+    ):
+        """分析失败原因、创建后续任务，并替换占位记忆"""
+        failure_analysis = await self._analyze_failure(task.content, actions, last_result)
+        followup_task = await self._create_followup_task(task.content, actions, failure_analysis)
         
-        # 创建后续任务
-        followup_task = self._create_followup_task(task.content, actions, failure_analysis)
+        state = self.store.load()
+        self._replace_memory(state, placeholder, placeholder.replace(f"{PENDING_TAG} {task.content}", failure_analysis))
         if followup_task:
             state.todo.append(TodoItem(content=followup_task, status="PENDING"))
             log(f"\n→ 已创建后续任务: {followup_task}")
-        
-        self._maybe_distill(state)
         self.store.save(state)
-        
-        log(f"\n✗ 任务失败（重试{self.MAX_RETRIES}次）: {task.content}")
-        log(f"  原因: {failure_analysis[:100]}")
+        log(f"  失败原因（{task.content[:30]}）: {failure_analysis[:100]}")
+    
+    @staticmethod
+    def _replace_memory(state: AgentState, placeholder: str, entry: str):
+        """原位替换占位记忆，占位已不存在时追加"""
+        try:
+            state.memory[state.memory.index(placeholder)] = entry
+        except ValueError:
+            state.memory.append(entry)
     
-    def _analyze_failure(self, task: str, actions: list, last_result: str) -> str:
+    async def _analyze_failure(self, task: str, actions: list, last_result: str) -> str:
         """分析失败原因"""
         actions_str = "\n".join(f"- {a}" for a in actions[-5:])
         
@@ -298,13 +614,13 @@ class LifeLoop:
 3. 可能的解决方案"""
 
         messages = [{"role": "user", "content": prompt}]
-        result = self.llm.chat(messages)
+        result = await self.llm.chat(messages, cacheable=True, priority=Priority.SUMMARY)
         
         if result:
             return result["choices"][0]["message"].get("content", "分析失败")[:200]
         return "无法分析失败原因"
     
-    def _create_followup_task(self, original_task: str, actions: list, failure_analysis: str) -> str:
+    async def _create_followup_task(self, original_task: str, actions: list, failure_analysis: str) -> str:
         """创建后续任务"""
         prompt = f"""原任务失败: {original_task}
 
@@ -314,7 +630,7 @@ class LifeLoop:
 只输出任务描述，不要其他内容（不超过50字）："""
 
         messages = [{"role": "user", "content": prompt}]
-        result = self.llm.chat(messages)
+        result = await self.llm.chat(messages, priority=Priority.SUMMARY)
         
         if result:
             followup = result["choices"][0]["message"].get("content", "").strip()
@@ -322,9 +638,95 @@ class LifeLoop:
                 return f"[续] {followup[:50]}"
         return None
     
-    def _maybe_distill(self, state: AgentState):
-        """如果需要，执行记忆蒸馏"""
-        if self.memory_mgr.should_distill(len(state.memory)):
-            new_knowledge, active_memory = self.memory_mgr.distill(state.memory)
-            state.knowledge.extend(new_knowledge)
-            state.memory = active_memory
+    async def _maybe_distill(self):
+        """如果需要，执行一轮记忆蒸馏"""
+        snapshot = self.store.load().memory
+        if not self.memory_mgr.should_distill(snapshot):
+            return
+        new_knowledge, distilled = await self.memory_mgr.distill(snapshot)
+        
+        # 蒸馏期间记忆可能又有追加：只替换快照部分，之后追加的条目保留
+        state = self.store.load()
+        if state.memory[:len(snapshot)] != snapshot:
+            print("[Memory] 记忆在蒸馏期间被修改，本轮结果丢弃")
+            return
+        # 被淘汰的条目移入冷归档，需要时通过 recall 取回
+        kept = collections.Counter(distilled)
+        evicted = []
+        for entry in snapshot:
+            if kept[entry]:
+                kept[entry] -= 1
+            else:
+                evicted.append(entry)
+        self.archive.append(evicted)
+        state.memory = distilled + state.memory[len(snapshot):]
+        # 与已有知识近似重复的条目不再追加
+        added = self.knowledge_dedup.merge_into(state.knowledge, new_knowledge)
+        if added < len(new_knowledge):
+            print(f"[Memory] 新知识 {len(new_knowledge)} 条，去重后新增 {added} 条")
+        self.store.save(state)
+
+
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _shared_event_loop() -> asyncio.AbstractEventLoop:
+    """同步调用方共用的事件循环，在后台线程中常驻（按循环隔离的状态不会在调用之间丢弃）"""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="life-loop", daemon=True).start()
+        return _sync_loop
+
+
+def run_sync(coro):
+    """在共用事件循环中运行协程并等待结果；调用方被中断时取消该协程"""
+    loop = _shared_event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("不能在共用事件循环内同步等待，请直接 await")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+class LifeLoop:
+    """同步生命循环 - AsyncLifeLoop 的薄包装，供 Agent 等同步调用方使用"""
+    
+    def __init__(
+        self,
+        store: StateStore,
+        llm: LLMClient,
+        registry: ToolRegistry = None,
+        meta_prompt: str = None,
+        stream: bool = False,
+        plan_ahead: bool = False
+    ):
+        if not isinstance(llm, AsyncLLMClient):
+            llm = AsyncLLMClient.from_client(llm)
+        self.engine = AsyncLifeLoop(store, llm, registry, meta_prompt, stream, plan_ahead)
+    
+    def __getattr__(self, name):
+        # store / planner / registry 等属性直接取自异步引擎
+        return getattr(self.engine, name)
+    
+    def request_stop(self):
+        """请求停止循环"""
+        self.engine.request_stop()
+    
+    def run_all(self, on_progress: Callable[[str], None] = None) -> dict:
+        """执行所有待办任务，直到全部完成"""
+        return run_sync(self.engine.run_all(on_progress))
+    
+    def run_once(self) -> bool:
+        """执行一次生命循环（处理一个任务）"""
+        return run_sync(self.engine.run_once())
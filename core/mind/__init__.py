@@ -1,6 +1,12 @@
 """认知模块 - Agent 的大脑"""
-from .llm import LLMClient
+from .llm import LLMClient, AsyncLLMClient
+from .transport import HTTPTransport, AsyncHTTPTransport
+from .cache import ResponseCache
+from .endpoints import EndpointPool
+from .resilience import AdaptiveTimeout, CircuitBreaker, CircuitOpenError
+from .admission import AdmissionController, Priority, default_admission
 from .planner import Planner, Plan
 from .memory import MemoryManager
+from .conversation import TaskConversation
 
-__all__ = ["LLMClient", "Planner", "Plan", "MemoryManager"]
+__all__ = ["LLMClient", "AsyncLLMClient", "HTTPTransport", "AsyncHTTPTransport", "ResponseCache", "EndpointPool", "AdaptiveTimeout", "CircuitBreaker", "CircuitOpenError", "AdmissionController", "Priority", "default_admission", "Planner", "Plan", "MemoryManager", "TaskConversation"]
@@ -0,0 +1,225 @@
+"""LLM 准入控制 - 进程级并发上限、令牌桶限速与优先级调度"""
+import asyncio
+import dataclasses
+import enum
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+
+# 配置常量
+MAX_CONCURRENCY = int(os.getenv("AGI_LLM_MAX_CONCURRENCY", "4"))  # 同时在途的 LLM 请求上限
+RATE_PER_SECOND = float(os.getenv("AGI_LLM_RATE", "0"))  # 令牌补充速率，0 表示不限速
+BURST = int(os.getenv("AGI_LLM_BURST", "10"))  # 令牌桶容量
+BACKGROUND_SLOTS = int(os.getenv("AGI_LLM_BACKGROUND_SLOTS", "1"))  # 后台自省最多占用的并发数
+FOREGROUND_TOKEN_RESERVE = 1  # 后台请求不得动用的令牌数
+
+
+class Priority(enum.IntEnum):
+    """调用优先级，数值越小越优先"""
+    PLANNING = 0  # 前台规划
+    COMPLETION = 1  # 完成检查
+    SUMMARY = 2  # 摘要、蒸馏、失败分析
+    BACKGROUND = 3  # 后台自省
+
+
+@dataclasses.dataclass
+class ClassStats:
+    """单个优先级的排队统计"""
+    admitted: int = 0
+    waiting: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+    @property
+    def avg_wait_ms(self) -> float:
+        return self.total_wait_ms / self.admitted if self.admitted else 0.0
+
+
+class _Waiter:
+    """排队中的请求：同步调用方用 Event，异步调用方用所在事件循环的 Future"""
+
+    def __init__(self, priority: Priority, loop: asyncio.AbstractEventLoop = None):
+        self.priority = priority
+        self.enqueued = time.perf_counter()
+        self.granted = False
+        self.cancelled = False
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def wake(self):
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._resolve)
+        else:
+            self.event.set()
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class AdmissionController:
+    """
+    进程级 LLM 准入控制器，可同时服务多个线程和多个事件循环
+    - 并发上限: 同时在途的请求数不超过 max_concurrency
+    - 令牌桶: 每个请求消耗一个令牌，按 rate 补充（rate=0 不限速）
+    - 优先级: 空出的名额总是先给优先级最高的等待者
+    - 后台隔离: 后台请求最多占 background_slots 个名额，且不动用预留令牌，
+      只要 max_concurrency > background_slots，前台请求就不会因后台突发而排队；
+      background_slots 为 0 时（max_concurrency 为 1 时必然如此）后台请求只在
+      没有任何在途请求时放行
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        rate: float = RATE_PER_SECOND,
+        burst: int = BURST,
+        background_slots: int = BACKGROUND_SLOTS
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.background_slots = max(0, min(background_slots, self.max_concurrency - 1))
+        self._lock = threading.Lock()
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._in_use = 0
+        self._background_in_use = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._timer: Optional[threading.Timer] = None
+        self._stats: Dict[Priority, ClassStats] = {p: ClassStats() for p in Priority}
+
+    @contextmanager
+    def slot(self, priority: Priority = Priority.PLANNING):
+        """同步获取名额（阻塞当前线程）"""
+        waiter = _Waiter(priority)
+        self._enqueue(waiter)
+        waiter.event.wait()
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    @asynccontextmanager
+    async def async_slot(self, priority: Priority = Priority.PLANNING):
+        """异步获取名额（只挂起当前任务）"""
+        waiter = _Waiter(priority, asyncio.get_running_loop())
+        self._enqueue(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                waiter.cancelled = True
+                granted = waiter.granted
+                if not granted:
+                    self._stats[priority].waiting -= 1
+            if granted:
+                self._release(priority)
+            raise
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """各优先级的准入数与排队耗时"""
+        with self._lock:
+            return {
+                p.name.lower(): {
+                    "admitted": s.admitted,
+                    "waiting": s.waiting,
+                    "avg_wait_ms": s.avg_wait_ms,
+                    "max_wait_ms": s.max_wait_ms,
+                }
+                for p, s in self._stats.items()
+            }
+
+    def _enqueue(self, waiter: _Waiter):
+        with self._lock:
+            self._stats[waiter.priority].waiting += 1
+            heapq.heappush(self._queue, (waiter.priority, next(self._seq), waiter))
+            self._dispatch()
+
+    def _release(self, priority: Priority):
+        with self._lock:
+            self._in_use -= 1
+            if priority == Priority.BACKGROUND:
+                self._background_in_use -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        """按优先级放行等待者（调用方需持有锁）"""
+        self._refill()
+        while self._queue:
+            priority, _, waiter = self._queue[0]
+            if waiter.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            if not self._admissible(priority):
+                break
+            heapq.heappop(self._queue)
+            self._grant(waiter)
+
+    def _admissible(self, priority: Priority) -> bool:
+        if self._in_use >= self.max_concurrency:
+            return False
+        if priority == Priority.BACKGROUND:
+            if self.background_slots == 0:
+                if self._in_use > 0:
+                    return False
+            elif self._background_in_use >= self.background_slots:
+                return False
+            needed = 1 + FOREGROUND_TOKEN_RESERVE
+        else:
+            needed = 1
+        if self.rate > 0 and self._tokens < needed:
+            self._schedule_refill(needed - self._tokens)
+            return False
+        return True
+
+    def _grant(self, waiter: _Waiter):
+        self._in_use += 1
+        if waiter.priority == Priority.BACKGROUND:
+            self._background_in_use += 1
+        if self.rate > 0:
+            self._tokens -= 1
+
+        wait_ms = (time.perf_counter() - waiter.enqueued) * 1000
+        stats = self._stats[waiter.priority]
+        stats.waiting -= 1
+        stats.admitted += 1
+        stats.total_wait_ms += wait_ms
+        stats.max_wait_ms = max(stats.max_wait_ms, wait_ms)
+
+        waiter.granted = True
+        waiter.wake()
+
+    def _refill(self):
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _schedule_refill(self, missing_tokens: float):
+        """令牌不足时，在补足所需的时间后重新调度"""
+        if self._timer and self._timer.is_alive():
+            return
+        self._timer = threading.Timer(missing_tokens / self.rate, self._on_refill)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_refill(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+
+# 全局准入控制器实例
+default_admission = AdmissionController()
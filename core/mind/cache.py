@@ -0,0 +1,183 @@
+"""LLM 响应缓存 - 按请求内容寻址的内存 LRU + 磁盘两级缓存"""
+import collections
+import copy
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# 配置常量
+CACHE_DIR = os.getenv("AGI_LLM_CACHE_DIR", "")  # 为空时不启用缓存
+CACHE_TTL_SECONDS = int(os.getenv("AGI_LLM_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+MEMORY_ENTRIES = 256  # 内存层最大条目数
+DISK_MAX_BYTES = 64 * 1024 * 1024  # 磁盘层容量上限
+
+# 参与缓存键计算的请求字段
+KEY_FIELDS = ("model", "messages", "tools", "temperature", "max_tokens")
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """缓存命中统计"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / total if total else 0.0
+
+
+class ResponseCache:
+    """
+    确定性 LLM 调用的响应缓存
+    - 键: (model, messages, tools, temperature, max_tokens) 的 SHA-256
+    - 内存层: LRU，容量 max_entries
+    - 磁盘层: 每个响应一个 JSON 文件，总大小超过 max_bytes 时按最旧淘汰
+    - 两层均按 ttl 过期
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_entries: int = MEMORY_ENTRIES,
+        max_bytes: int = DISK_MAX_BYTES,
+        ttl: float = CACHE_TTL_SECONDS
+    ):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._memory: "collections.OrderedDict[str, tuple]" = collections.OrderedDict()
+        self._disk_bytes = self._scan_disk_bytes() if cache_dir else 0
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """根据 AGI_LLM_CACHE_DIR 创建缓存，未配置时返回 None"""
+        return cls(CACHE_DIR) if CACHE_DIR else None
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """计算请求的内容地址"""
+        material = {field: payload.get(field) for field in KEY_FIELDS}
+        canonical = json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """查找缓存，未命中或已过期返回 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return copy.deepcopy(entry[1])
+            if entry:
+                del self._memory[key]
+
+            entry = self._read_disk(key, now)
+            if entry:
+                self._remember(key, entry)
+                self.stats.disk_hits += 1
+                return copy.deepcopy(entry[1])
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, key: str, response: Dict[str, Any]):
+        """写入缓存"""
+        entry = (time.time(), copy.deepcopy(response))
+        with self._lock:
+            self._remember(key, entry)
+            self._write_disk(key, entry)
+            self.stats.stores += 1
+
+    def clear(self):
+        """清空两级缓存"""
+        with self._lock:
+            self._memory.clear()
+            for path in self._disk_files():
+                os.remove(path)
+            self._disk_bytes = 0
+
+    def _remember(self, key: str, entry: tuple):
+        """写入内存层并做 LRU 淘汰"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[tuple]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if now - data.get("created", 0) > self.ttl:
+            self._remove_file(path)
+            return None
+        os.utime(path)  # 刷新修改时间，磁盘淘汰近似 LRU
+        return data["created"], data["response"]
+
+    def _write_disk(self, key: str, entry: tuple):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        content = json.dumps({"created": entry[0], "response": entry[1]}, ensure_ascii=False)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+
+        # 先写临时文件再替换，崩溃时不会留下半个条目
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        self._disk_bytes += os.path.getsize(path) - previous
+        if self._disk_bytes > self.max_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """按修改时间淘汰最旧条目，降到容量上限的 90%"""
+        files = sorted(self._disk_files(), key=lambda p: os.path.getmtime(p))
+        target = self.max_bytes * 0.9
+        for path in files:
+            if self._disk_bytes <= target:
+                break
+            self._remove_file(path)
+            self.stats.evictions += 1
+
+    def _remove_file(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self._disk_bytes -= size
+        except OSError:
+            pass
+
+    def _disk_files(self) -> list:
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            os.path.join(root, name)
+            for root, _, names in os.walk(self.cache_dir)
+            for name in names
+            if name.endswith(".json")
+        ]
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(os.path.getsize(p) for p in self._disk_files())
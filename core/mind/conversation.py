@@ -0,0 +1,105 @@
+"""任务内对话 - 把每一步的工具调用与观察结果作为多轮消息保留下来"""
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from core.tools.executor import ToolCall
+
+# 配置常量
+TOKEN_BUDGET = int(os.getenv("AGI_CONVERSATION_TOKENS", "6000"))  # 对话历史的 token 预算
+COMPACT_RATIO = 0.7  # 超预算时压缩到预算的比例，留出余量让前缀在之后几步保持稳定
+OBSERVATION_HEAD = 200  # 压缩时旧观察保留的字符数
+CONTINUE_PROMPT = "继续执行任务，需要时调用工具。"
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：ASCII 约 4 字符一个 token，其余字符（中文等）约一个字符一个 token"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+class TaskConversation:
+    """
+    单个任务的对话历史
+    - 每步追加 assistant(tool_calls) + tool(观察) 消息，模型能看到完整的工具输出
+    - 超出 token 预算时从最旧的步骤开始压缩: 先截断观察，再把整步折叠成一行摘要
+    - 只在超预算时压缩且一次压到预算的 COMPACT_RATIO，其余时候历史只追加，前缀保持稳定
+    """
+
+    def __init__(self, token_budget: int = TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self._steps: List[Tuple[List[Dict], str]] = []  # 每步 (消息, 一行摘要)
+        self._folded: List[str] = []  # 被折叠步骤的摘要
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def add_step(
+        self,
+        thought: Optional[str],
+        tool_calls: List[ToolCall],
+        observations: List[str],
+        action_log: str = ""
+    ):
+        """记录一步: 模型的思考/工具调用（可多个），以及与之一一对应的执行结果"""
+        if tool_calls:
+            call_ids = []
+            for call in tool_calls:
+                call_ids.append(call.id or f"call_{self._next_id}")
+                self._next_id += 1
+            step = [{
+                "role": "assistant",
+                "content": thought or None,
+                "tool_calls": [
+                    {
+                        "id": call_id,
+                        "type": "function",
+                        "function": {
+                            "name": call.name,
+                            "arguments": json.dumps(call.args, ensure_ascii=False),
+                        },
+                    }
+                    for call_id, call in zip(call_ids, tool_calls)
+                ],
+            }] + [
+                {"role": "tool", "tool_call_id": call_id, "content": observation}
+                for call_id, observation in zip(call_ids, observations)
+            ]
+        else:
+            step = [
+                {"role": "assistant", "content": thought},
+                {"role": "user", "content": CONTINUE_PROMPT},
+            ]
+        self._steps.append((step, action_log or (thought or "")[:50]))
+        self._compact()
+
+    def messages(self) -> List[Dict]:
+        """追加在规划提示词之后的历史消息"""
+        history = []
+        if self._folded:
+            history.append({"role": "user", "content": "[更早的步骤]\n" + "\n".join(f"- {s}" for s in self._folded)})
+        for step, _ in self._steps:
+            history.extend(step)
+        return history
+
+    def tokens(self) -> int:
+        return sum(estimate_tokens(json.dumps(m, ensure_ascii=False)) for m in self.messages())
+
+    def _compact(self):
+        """超出预算时从最旧步骤开始压缩"""
+        if self.tokens() <= self.token_budget:
+            return
+        target = self.token_budget * COMPACT_RATIO
+
+        # 先截断旧观察，最新一步保持完整
+        for step, _ in self._steps[:-1]:
+            for observation in step[1:]:
+                content = observation["content"]
+                if observation["role"] == "tool" and len(content) > OBSERVATION_HEAD:
+                    observation["content"] = f"{content[:OBSERVATION_HEAD]}…[已截断 {len(content) - OBSERVATION_HEAD} 字]"
+                    if self.tokens() <= target:
+                        return
+
+        # 仍然超出时，把最旧的步骤折叠为摘要
+        while len(self._steps) > 1 and self.tokens() > target:
+            self._folded.append(self._steps.pop(0)[1])
@@ -0,0 +1,163 @@
+"""知识去重 - 哈希字符 n-gram 向量的余弦相似度，MinHash/LSH 找候选"""
+import collections
+import math
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 配置常量
+DEDUP_THRESHOLD = float(os.getenv("AGI_KNOWLEDGE_DEDUP", "0.8"))  # 余弦相似度达到此值视为重复
+NGRAM_SIZES = (2, 3)  # 字符 n-gram 长度
+HASH_DIM = 1 << 16  # n-gram 哈希空间
+LSH_BANDS = 16  # LSH 分段数
+LSH_ROWS = 3  # 每段的 MinHash 数，段内全部相同才成为候选
+_SIGNATURE_SIZE = LSH_BANDS * LSH_ROWS
+_MERSENNE = (1 << 61) - 1
+_PERMUTATION = (0x5BD1E9955BD1E995 % _MERSENNE, 0x27D4EB2F165667C5 % _MERSENNE)  # 固定参数，签名在进程间一致
+
+# 条目开头的分类标签，如 [经验]、[Exp]，不参与比较
+TAG_PATTERN = re.compile(r"^(\s*\[[^\]]*\])+\s*")
+
+
+def normalize(entry: str) -> str:
+    """去掉分类标签、标点与多余空白，统一小写"""
+    text = TAG_PATTERN.sub("", entry).lower()
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def vectorize(entry: str) -> Dict[int, float]:
+    """哈希 n-gram 计数向量，已归一化为单位长度；没有可比内容时为空"""
+    text = normalize(entry).replace(" ", "")  # 中文里标点换成空格会打断相邻字，取 n-gram 前去掉
+    counts: Dict[int, float] = collections.defaultdict(float)
+    for n in NGRAM_SIZES:
+        for i in range(len(text) - n + 1):
+            counts[zlib.crc32(text[i:i + n].encode("utf-8")) % HASH_DIM] += 1.0
+    norm = math.sqrt(sum(v * v for v in counts.values()))
+    return {k: v / norm for k, v in counts.items()} if norm else {}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+def _bands(vector: Dict[int, float]) -> List[Tuple[int, int]]:
+    """
+    MinHash 签名按段切分后的 (段号, 段哈希)
+    用单次置换 MinHash: 每个特征只哈希一次，按哈希值分到签名的各个槽位并取槽内最小值，
+    代价与特征数成正比，而不是特征数 × 签名长度。
+    短条目的特征少于槽位数，空槽用向右（循环）最近的非空槽的值加上距离填充（旋转致密化），
+    否则短条目的段全是空值，会全部落进同一个桶
+    """
+    a, b = _PERMUTATION
+    signature = [_MERSENNE] * _SIGNATURE_SIZE
+    for feature in vector:
+        h = (a * feature + b) % _MERSENNE
+        slot, value = h % _SIGNATURE_SIZE, h // _SIGNATURE_SIZE
+        if value < signature[slot]:
+            signature[slot] = value
+    if _MERSENNE in signature and len(set(signature)) > 1:
+        filled = None
+        # 从后往前走两圈，第二圈时每个空槽都已知右侧最近的非空槽
+        for step in range(2 * _SIGNATURE_SIZE - 1, -1, -1):
+            slot = step % _SIGNATURE_SIZE
+            if signature[slot] < _MERSENNE:
+                filled = (slot, signature[slot])
+            elif filled is not None and step < _SIGNATURE_SIZE:
+                distance = (filled[0] - slot) % _SIGNATURE_SIZE
+                signature[slot] = _MERSENNE + filled[1] * _SIGNATURE_SIZE + distance
+    return [
+        (band, hash(tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])))
+        for band in range(LSH_BANDS)
+    ]
+
+
+class KnowledgeDeduper:
+    """
+    知识库近似重复检测（每个 Agent 一个）
+    - 每条知识转为哈希 n-gram 向量，MinHash/LSH 分桶，新条目只与同桶条目计算余弦相似度，
+      条目数上万时单次检查仍只比较少量候选
+    - merge_into 追加新知识: 与已有条目重复时不追加；新条目更长（信息更多）时替换旧条目
+    - 知识列表在外部被修改时自动重建索引
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self.stats: "collections.Counter[str]" = collections.Counter()
+        self._entries: List[str] = []
+        self._vectors: List[Dict[int, float]] = []
+        self._bands: List[List[Tuple[int, int]]] = []
+        self._buckets: Dict[Tuple[int, int], List[int]] = collections.defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sync(self, knowledge: List[str]):
+        """让索引与知识列表一致"""
+        if self._entries == knowledge:
+            return
+        if knowledge[:len(self._entries)] != self._entries:
+            self._entries, self._vectors, self._bands = [], [], []
+            self._buckets.clear()
+        for entry in knowledge[len(self._entries):]:
+            self._index(entry)
+
+    def find(self, entry: str) -> Optional[Tuple[int, float]]:
+        """最相似的已有条目 (下标, 相似度)，未达到阈值时返回 None"""
+        vector = vectorize(entry)
+        if not vector:
+            return None
+        return self._best_match(vector, _bands(vector))
+
+    def merge_into(self, knowledge: List[str], new_entries: Iterable[str]) -> int:
+        """把新知识并入 knowledge（原地修改），返回新增条数"""
+        self.sync(knowledge)
+        added = 0
+        for entry in new_entries:
+            vector = vectorize(entry)
+            bands = _bands(vector) if vector else []
+            match = self._best_match(vector, bands) if vector else None
+            if not vector and entry in knowledge:
+                # 只有标签或标点的条目无法比较相似度，只去掉完全相同的
+                self.stats["rejected"] += 1
+            elif match is None:
+                knowledge.append(entry)
+                self._index(entry, vector, bands)
+                self.stats["added"] += 1
+                added += 1
+            elif len(normalize(entry)) > len(normalize(knowledge[match[0]])):
+                knowledge[match[0]] = entry
+                self._replace(match[0], entry, vector, bands)
+                self.stats["merged"] += 1
+            else:
+                self.stats["rejected"] += 1
+        return added
+
+    def _best_match(self, vector: Dict[int, float], bands: List[Tuple[int, int]]) -> Optional[Tuple[int, float]]:
+        candidates = {i for key in bands for i in self._buckets.get(key, ())}
+        best = None
+        for i in candidates:
+            similarity = cosine(vector, self._vectors[i])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (i, similarity)
+        return best
+
+    def _index(self, entry: str, vector: Dict[int, float] = None, bands: List[Tuple[int, int]] = None):
+        if vector is None:
+            vector = vectorize(entry)
+            bands = _bands(vector) if vector else []
+        i = len(self._entries)
+        self._entries.append(entry)
+        self._vectors.append(vector)
+        self._bands.append(bands)
+        for key in bands:
+            self._buckets[key].append(i)
+
+    def _replace(self, i: int, entry: str, vector: Dict[int, float], bands: List[Tuple[int, int]]):
+        for key in self._bands[i]:
+            self._buckets[key].remove(i)
+        self._entries[i], self._vectors[i], self._bands[i] = entry, vector, bands
+        for key in bands:
+            self._buckets[key].append(i)
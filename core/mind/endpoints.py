@@ -0,0 +1,161 @@
+"""LLM 端点池 - 多个模型服务间的负载均衡、故障摘除与对冲请求"""
+import collections
+import itertools
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+# 配置常量
+ENDPOINTS = os.getenv("AGI_LLM_ENDPOINTS", "")  # 逗号分隔的多个 base_url，为空时只用客户端默认地址
+EJECT_FAILURES = int(os.getenv("AGI_LLM_EJECT_FAILURES", "2"))  # 连续失败多少次后摘除
+EJECT_SECONDS = float(os.getenv("AGI_LLM_EJECT_SEC", "30"))  # 摘除时长，到期后由正常流量试探
+HEDGE = os.getenv("AGI_LLM_HEDGE", "0") == "1"  # 是否启用对冲请求
+HEDGE_MIN_SAMPLES = 20  # 延迟样本不足时不对冲
+HEDGE_MIN_DELAY = 0.05  # 对冲等待下限（秒）
+LATENCY_WINDOW = 200  # 每个端点保留的最近延迟样本数
+
+
+class Endpoint:
+    """单个模型服务的负载与健康状态"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.api_url = f"{self.base_url}/v1/chat/completions"
+        self.outstanding = 0  # 在途请求数
+        self.failures = 0  # 连续失败次数
+        self.ejected_until = 0.0
+        self.latencies: "collections.deque[float]" = collections.deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.hedge_wins = 0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def p95(self) -> Optional[float]:
+        """最近请求的 p95 延迟（秒），样本不足时返回 None"""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class EndpointPool:
+    """
+    客户端侧端点池
+    - 均衡: 选在途请求最少的健康端点，并列时轮转
+    - 摘除: 连续失败 eject_failures 次的端点摘除 eject_seconds 秒；全部被摘除时试探最早恢复的
+    - 对冲: 请求超过首选端点的 p95 延迟仍未返回时，向另一个端点发同样的请求，取先返回者
+    """
+
+    def __init__(
+        self,
+        base_urls: Sequence[str],
+        eject_failures: int = EJECT_FAILURES,
+        eject_seconds: float = EJECT_SECONDS,
+        hedge: bool = HEDGE
+    ):
+        urls = list(dict.fromkeys(url.rstrip("/") for url in base_urls))
+        if not urls:
+            raise ValueError("EndpointPool 至少需要一个端点")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.eject_failures = max(1, eject_failures)
+        self.eject_seconds = eject_seconds
+        self.hedge = hedge
+        self.hedges = 0
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+
+    @classmethod
+    def from_env(cls, base_url: str) -> "EndpointPool":
+        """根据 AGI_LLM_ENDPOINTS 创建端点池，未配置时只含 base_url"""
+        urls = [url.strip() for url in ENDPOINTS.split(",") if url.strip()]
+        return cls(urls or [base_url])
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def pick(self, exclude: Sequence[Endpoint] = ()) -> Optional[Endpoint]:
+        """选出一个端点并计入在途，没有可选端点时返回 None"""
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            now = time.monotonic()
+            healthy = [e for e in candidates if e.healthy(now)]
+            if healthy:
+                offset = next(self._rotation)
+                n = len(healthy)
+                endpoint = min(
+                    (healthy[(offset + i) % n] for i in range(n)),
+                    key=lambda e: e.outstanding
+                )
+            else:
+                endpoint = min(candidates, key=lambda e: e.ejected_until)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, latency: float = None, failed: bool = False):
+        """
+        请求结束后归还端点
+
+        Args:
+            latency: 成功请求的耗时（秒），用于 p95；流式请求不记录
+            failed: 请求失败，计入连续失败并可能触发摘除
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.calls += 1
+            if not failed:
+                endpoint.failures = 0
+                endpoint.ejected_until = 0.0
+                if latency is not None:
+                    endpoint.latencies.append(latency)
+                return
+
+            endpoint.errors += 1
+            endpoint.failures += 1
+            if endpoint.failures >= self.eject_failures and len(self.endpoints) > 1:
+                endpoint.ejected_until = time.monotonic() + self.eject_seconds
+                print(f"[LLM] 端点 {endpoint.base_url} 连续失败 {endpoint.failures} 次，摘除 {self.eject_seconds:.0f}s")
+
+    def abandon(self, endpoint: Endpoint):
+        """对冲落败被取消的请求，只归还在途计数，不影响健康状态"""
+        with self._lock:
+            endpoint.outstanding -= 1
+
+    def hedge_delay(self, endpoint: Endpoint) -> Optional[float]:
+        """发出对冲请求前的等待时间，不需要对冲时返回 None"""
+        if not self.hedge or len(self.endpoints) < 2:
+            return None
+        p95 = endpoint.p95()
+        return max(p95, HEDGE_MIN_DELAY) if p95 is not None else None
+
+    def record_hedge(self, winner: Optional[Endpoint] = None):
+        """记录一次对冲；winner 为对冲请求所在端点时表示对冲胜出"""
+        with self._lock:
+            if winner is None:
+                self.hedges += 1
+            else:
+                winner.hedge_wins += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """各端点的请求数、错误数、在途数、p95 延迟与摘除状态"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                e.base_url: {
+                    "calls": e.calls,
+                    "errors": e.errors,
+                    "outstanding": e.outstanding,
+                    "p95_ms": (e.p95() or 0.0) * 1000,
+                    "hedge_wins": e.hedge_wins,
+                    "ejected": not e.healthy(now),
+                }
+                for e in self.endpoints
+            }
+
+    @property
+    def urls(self) -> List[str]:
+        return [e.base_url for e in self.endpoints]
@@ -1,61 +1,566 @@
 """LLM 客户端"""
+import asyncio
+import concurrent.futures
 import json
-import requests
-from typing import List, Dict, Any
+import os
+import time
+import weakref
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from core.tools.executor import ToolCall
+from .transport import HTTPTransport, AsyncHTTPTransport, CallTiming, POOL_SIZE, MAX_RETRIES
+from .endpoints import Endpoint, EndpointPool
+from .stream import StreamParser
+from .cache import ResponseCache
+from .admission import AdmissionController, Priority, default_admission
+from .resilience import AdaptiveTimeout, CircuitBreaker, CircuitOpenError
+
+MAX_IN_FLIGHT = int(os.getenv("AGI_LLM_MAX_IN_FLIGHT", "8"))  # 异步客户端最大并发请求数
 
 
 class LLMClient:
     """LLM 接口封装"""
-    
+
     def __init__(
         self,
         base_url: str = "http://127.0.0.1:3000",
-        model: str = "qwen/qwen3-vl-4b"
+        model: str = "qwen/qwen3-vl-4b",
+        pool_size: int = POOL_SIZE,
+        max_retries: int = MAX_RETRIES,
+        transport: HTTPTransport = None,
+        cache: ResponseCache = None,
+        admission: AdmissionController = None,
+        background: bool = False,
+        endpoints: EndpointPool = None,
+        breaker: CircuitBreaker = None,
+        timeouts: AdaptiveTimeout = None
     ):
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.api_url = f"{self.base_url}/v1/chat/completions"
-    
+        self.transport = transport or HTTPTransport(pool_size=pool_size, max_retries=max_retries)
+        self.cache = cache  # 可选的响应缓存，仅用于 cacheable 调用
+        self.admission = admission or default_admission
+        self.background = background  # 后台自省客户端，所有调用按最低优先级排队
+        self.endpoints = endpoints or EndpointPool.from_env(self.base_url)
+        self.breaker = breaker or CircuitBreaker()  # 服务整体不可用时快速失败
+        self.timeouts = timeouts or AdaptiveTimeout()  # 按调用类型从观察到的延迟推算超时
+        self._hedge_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
     def chat(
         self,
         messages: List[Dict[str, str]],
         tools: List[Dict] = None,
         temperature: float = 0.1,
-        max_tokens: int = 1024
+        max_tokens: int = 1024,
+        cacheable: bool = False,
+        priority: Priority = Priority.PLANNING
     ) -> Dict[str, Any]:
-        """发送聊天请求"""
+        """
+        发送聊天请求
+
+        Args:
+            cacheable: 确定性调用（低温度、相同输入应得相同输出），允许走响应缓存
+            priority: 准入优先级，后台客户端一律按 BACKGROUND 处理
+        """
+        payload = self._build_payload(messages, tools, temperature, max_tokens)
+        cache_key, cached = self._cache_lookup(payload, cacheable)
+        if cached:
+            return cached
+
+        if not self._allow():
+            return None
+        call_type = self._call_type(priority)
+        timing = None
+        try:
+            with self.admission.slot(self._priority(priority)):
+                start = time.perf_counter()
+                result, timing = self._post(payload, self.timeouts.timeout(call_type))
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"[LLM Error] {e}")
+            return None
+        finally:
+            self._report_timing(timing)
+
+        self._record_success(call_type, start)
+        self._cache_store(cache_key, result)
+        return result
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        tools: List[Dict] = None,
+        temperature: float = 0.1,
+        max_tokens: int = 1024,
+        on_text: Callable[[str], None] = None,
+        on_tool_call: Callable[[ToolCall], None] = None,
+        stop_on_tool_call: bool = False,
+        priority: Priority = Priority.PLANNING
+    ) -> Dict[str, Any]:
+        """
+        流式聊天请求，返回与 chat 相同结构的结果
+
+        Args:
+            on_text: 文本增量回调
+            on_tool_call: 工具调用参数闭合时的回调
+            stop_on_tool_call: 拿到第一个完整工具调用后立即结束读取
+            priority: 准入优先级
+        """
+        payload = self._build_payload(messages, tools, temperature, max_tokens, stream=True)
+        parser = StreamParser(on_text=on_text)
+        stopped_early = False
+        if not self._allow():
+            return None
+        call_type = self._call_type(priority, stream=True)
+
+        tried = []
+        try:
+            with self.admission.slot(self._priority(priority)):
+                start = time.perf_counter()
+                timeout = self.timeouts.timeout(call_type)
+                while True:
+                    endpoint = self._next_endpoint(tried)
+                    received = False
+                    events = self.transport.stream_events(endpoint.api_url, payload, timeout=timeout)
+                    try:
+                        for event in events:
+                            received = True
+                            stopped_early = self._feed_event(parser, event, on_tool_call, stop_on_tool_call)
+                            if stopped_early:
+                                break
+                    except Exception as e:
+                        self.endpoints.release(endpoint, failed=True)
+                        # 已收到内容的流无法无缝续接，只在首个事件前切换端点
+                        if received or not self._can_failover(tried, e):
+                            raise
+                        continue
+                    finally:
+                        events.close()
+                    self.endpoints.release(endpoint)
+                    break
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"[LLM Error] {e}")
+            return None
+        finally:
+            self._report_timing()
+
+        self._record_success(call_type, start)
+        return self._stream_result(parser, stopped_early)
+
+    def summarize(self, text: str, max_length: int = 100) -> str:
+        """生成摘要"""
+        result = self.chat(
+            self._summary_messages(text, max_length),
+            max_tokens=max_length,
+            cacheable=True,
+            priority=Priority.SUMMARY
+        )
+        return self._parse_summary(result, text, max_length)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """传输统计（调用数、连接复用率、平均耗时）"""
+        return self.transport.stats.summary()
+
+    def _priority(self, priority: Priority) -> Priority:
+        return Priority.BACKGROUND if self.background else priority
+
+    @staticmethod
+    def _call_type(priority: Priority, stream: bool = False) -> str:
+        """自适应超时按调用类型分桶，流式与非流式延迟分布不同，分开统计"""
+        return priority.name.lower() + ("_stream" if stream else "")
+
+    def _allow(self) -> bool:
+        """熔断中直接失败，不占用准入名额"""
+        if self.breaker.allow():
+            return True
+        print(f"[LLM Error] {CircuitOpenError(self.breaker.retry_after())}")
+        return False
+
+    def _record_success(self, call_type: str, start: float):
+        self.breaker.record_success()
+        self.timeouts.record(call_type, time.perf_counter() - start)
+
+    def _next_endpoint(self, tried: List[Endpoint]) -> Endpoint:
+        """选下一个未尝试过的端点"""
+        endpoint = self.endpoints.pick(exclude=tried)
+        tried.append(endpoint)
+        return endpoint
+
+    def _can_failover(self, tried: List[Endpoint], error: Exception) -> bool:
+        """还有未尝试的端点时切换过去"""
+        if len(tried) >= len(self.endpoints):
+            return False
+        print(f"[LLM] 端点 {tried[-1].base_url} 失败，切换端点: {error}")
+        return True
+
+    def _post(self, payload: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], Optional[CallTiming]]:
+        """经端点池发送请求：失败时依次切换端点"""
+        tried = []
+        while True:
+            endpoint = self._next_endpoint(tried)
+            try:
+                return self._post_hedged(endpoint, payload, timeout, tried)
+            except Exception as e:
+                if not self._can_failover(tried, e):
+                    raise
+
+    def _post_hedged(
+        self,
+        endpoint: Endpoint,
+        payload: Dict[str, Any],
+        timeout: float,
+        tried: List[Endpoint]
+    ) -> Tuple[Dict[str, Any], Optional[CallTiming]]:
+        """首选端点超过 p95 仍未返回时，向另一个端点发对冲请求，取先成功者"""
+        delay = self.endpoints.hedge_delay(endpoint)
+        if delay is None:
+            return self._post_to(endpoint, payload, timeout)
+
+        if self._hedge_executor is None:
+            self._hedge_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="llm-hedge")
+        primary = self._hedge_executor.submit(self._post_to, endpoint, payload, timeout)
+        try:
+            return primary.result(timeout=delay)
+        except concurrent.futures.TimeoutError:
+            pass
+
+        backup = self.endpoints.pick(exclude=tried)
+        if backup is None:
+            return primary.result()
+        tried.append(backup)
+        self.endpoints.record_hedge()
+        print(f"[LLM] {endpoint.base_url} 超过 p95 ({delay * 1000:.0f}ms)，对冲到 {backup.base_url}")
+
+        # 落败的同步请求无法中断，让它在后台结束并照常计入端点统计
+        pending = {primary: endpoint, self._hedge_executor.submit(self._post_to, backup, payload, timeout): backup}
+        error = None
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                winner = pending.pop(future)
+                if future.exception() is None:
+                    if winner is backup:
+                        self.endpoints.record_hedge(winner)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _post_to(self, endpoint: Endpoint, payload: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], Optional[CallTiming]]:
+        """向单个端点发送请求并归还端点"""
+        start = time.perf_counter()
+        try:
+            result = self.transport.post_json(endpoint.api_url, payload, timeout=timeout)
+        except Exception:
+            self.endpoints.release(endpoint, failed=True)
+            raise
+        self.endpoints.release(endpoint, latency=time.perf_counter() - start)
+        return result, self.transport.last_timing
+
+    def _build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        tools: List[Dict],
+        temperature: float,
+        max_tokens: int,
+        stream: bool = False
+    ) -> Dict[str, Any]:
+        """构建请求体"""
         payload = {
             "model": self.model,
             "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens,
         }
-        
+
         if tools:
             payload["tools"] = tools
             payload["tool_choice"] = "auto"
-        
-        try:
-            response = requests.post(
-                self.api_url,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=600,
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"[LLM Error] {e}")
-            return None
-    
-    def summarize(self, text: str, max_length: int = 100) -> str:
-        """生成摘要"""
-        messages = [
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _cache_lookup(self, payload: Dict[str, Any], cacheable: bool) -> Tuple[Optional[str], Optional[Dict]]:
+        """查询响应缓存，返回 (缓存键, 命中的响应)"""
+        if not (cacheable and self.cache):
+            return None, None
+        cache_key = self.cache.make_key(payload)
+        cached = self.cache.get(cache_key)
+        if cached:
+            print("[LLM] 命中响应缓存")
+        return cache_key, cached
+
+    def _cache_store(self, cache_key: Optional[str], result: Dict[str, Any]):
+        if cache_key:
+            self.cache.put(cache_key, result)
+
+    @staticmethod
+    def _feed_event(
+        parser: StreamParser,
+        event: str,
+        on_tool_call: Callable[[ToolCall], None],
+        stop_on_tool_call: bool
+    ) -> bool:
+        """解析一条 SSE 事件，返回是否应提前结束"""
+        stop = False
+        for call in parser.feed(json.loads(event)):
+            if on_tool_call:
+                on_tool_call(call)
+            stop = stop or stop_on_tool_call
+        return stop
+
+    @staticmethod
+    def _stream_result(parser: StreamParser, stopped_early: bool) -> Dict[str, Any]:
+        """把流式解析结果拼成与 chat 相同的结构"""
+        return {"choices": [{
+            "message": parser.message(complete_only=stopped_early),
+            "finish_reason": "tool_calls" if stopped_early else parser.finish_reason,
+        }]}
+
+    @staticmethod
+    def _summary_messages(text: str, max_length: int) -> List[Dict[str, str]]:
+        return [
             {"role": "system", "content": "你是摘要专家。生成简洁的摘要。"},
             {"role": "user", "content": f"请用{max_length}字以内总结：\n{text}"}
         ]
-        
-        result = self.chat(messages, max_tokens=max_length)
+
+    @staticmethod
+    def _parse_summary(result: Optional[Dict], text: str, max_length: int) -> str:
         if result:
             return result["choices"][0]["message"]["content"].strip()[:max_length]
         return text[:max_length]
+
+    def _report_timing(self, timing: CallTiming = None):
+        """输出本次调用的建连/总耗时"""
+        timing = timing or self.transport.last_timing
+        if timing:
+            connect = "复用连接" if timing.reused else f"建连 {timing.connect_ms:.0f}ms"
+            retries = f", 重试 {timing.attempts - 1} 次" if timing.attempts > 1 else ""
+            print(f"[LLM] {connect}, 总耗时 {timing.total_ms:.0f}ms{retries}")
+
+
+class AsyncLLMClient(LLMClient):
+    """
+    异步 LLM 客户端 - 接口与 LLMClient 一致，方法均为协程
+    所有调用共享连接池，并受 max_in_flight 限制并发
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:3000",
+        model: str = "qwen/qwen3-vl-4b",
+        pool_size: int = POOL_SIZE,
+        max_retries: int = MAX_RETRIES,
+        transport: AsyncHTTPTransport = None,
+        cache: ResponseCache = None,
+        admission: AdmissionController = None,
+        background: bool = False,
+        endpoints: EndpointPool = None,
+        breaker: CircuitBreaker = None,
+        timeouts: AdaptiveTimeout = None,
+        max_in_flight: int = MAX_IN_FLIGHT
+    ):
+        super().__init__(
+            base_url=base_url,
+            model=model,
+            transport=transport or AsyncHTTPTransport(pool_size=max(pool_size, max_in_flight), max_retries=max_retries),
+            cache=cache,
+            admission=admission,
+            background=background,
+            endpoints=endpoints,
+            breaker=breaker,
+            timeouts=timeouts
+        )
+        self.max_in_flight = max_in_flight
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_client(cls, llm: LLMClient, max_in_flight: int = MAX_IN_FLIGHT) -> "AsyncLLMClient":
+        """由同步客户端的配置创建异步客户端（共享连接池、缓存、准入控制、端点池和熔断状态）"""
+        return cls(
+            base_url=llm.base_url,
+            model=llm.model,
+            transport=AsyncHTTPTransport(sync=llm.transport) if isinstance(llm.transport, HTTPTransport) else None,
+            pool_size=llm.transport.pool_size,
+            max_retries=llm.transport.max_retries,
+            cache=llm.cache,
+            admission=llm.admission,
+            background=llm.background,
+            endpoints=llm.endpoints,
+            breaker=llm.breaker,
+            timeouts=llm.timeouts,
+            max_in_flight=max_in_flight
+        )
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        tools: List[Dict] = None,
+        temperature: float = 0.1,
+        max_tokens: int = 1024,
+        cacheable: bool = False,
+        priority: Priority = Priority.PLANNING
+    ) -> Dict[str, Any]:
+        """发送聊天请求"""
+        payload = self._build_payload(messages, tools, temperature, max_tokens)
+        cache_key, cached = self._cache_lookup(payload, cacheable)
+        if cached:
+            return cached
+
+        if not self._allow():
+            return None
+        call_type = self._call_type(priority)
+        timing = None
+        try:
+            async with self._in_flight(), self.admission.async_slot(self._priority(priority)):
+                start = time.perf_counter()
+                result, timing = await self._post(payload, self.timeouts.timeout(call_type))
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"[LLM Error] {e}")
+            return None
+        finally:
+            self._report_timing(timing)
+
+        self._record_success(call_type, start)
+        self._cache_store(cache_key, result)
+        return result
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        tools: List[Dict] = None,
+        temperature: float = 0.1,
+        max_tokens: int = 1024,
+        on_text: Callable[[str], None] = None,
+        on_tool_call: Callable[[ToolCall], None] = None,
+        stop_on_tool_call: bool = False,
+        priority: Priority = Priority.PLANNING
+    ) -> Dict[str, Any]:
+        """流式聊天请求，返回与 chat 相同结构的结果"""
+        payload = self._build_payload(messages, tools, temperature, max_tokens, stream=True)
+        parser = StreamParser(on_text=on_text)
+        stopped_early = False
+        if not self._allow():
+            return None
+        call_type = self._call_type(priority, stream=True)
+
+        tried = []
+        try:
+            async with self._in_flight(), self.admission.async_slot(self._priority(priority)):
+                start = time.perf_counter()
+                timeout = self.timeouts.timeout(call_type)
+                while True:
+                    endpoint = self._next_endpoint(tried)
+                    received = False
+                    events = self.transport.stream_events(endpoint.api_url, payload, timeout=timeout)
+                    try:
+                        async for event in events:
+                            received = True
+                            stopped_early = self._feed_event(parser, event, on_tool_call, stop_on_tool_call)
+                            if stopped_early:
+                                break
+                    except asyncio.CancelledError:
+                        self.endpoints.abandon(endpoint)
+                        raise
+                    except Exception as e:
+                        self.endpoints.release(endpoint, failed=True)
+                        if received or not self._can_failover(tried, e):
+                            raise
+                        continue
+                    finally:
+                        await events.aclose()
+                    self.endpoints.release(endpoint)
+                    break
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"[LLM Error] {e}")
+            return None
+        finally:
+            self._report_timing()
+
+        self._record_success(call_type, start)
+        return self._stream_result(parser, stopped_early)
+
+    async def summarize(self, text: str, max_length: int = 100) -> str:
+        """生成摘要"""
+        result = await self.chat(
+            self._summary_messages(text, max_length),
+            max_tokens=max_length,
+            cacheable=True,
+            priority=Priority.SUMMARY
+        )
+        return self._parse_summary(result, text, max_length)
+
+    async def _post(self, payload: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], Optional[CallTiming]]:
+        """经端点池发送请求：失败时依次切换端点"""
+        tried = []
+        while True:
+            endpoint = self._next_endpoint(tried)
+            try:
+                return await self._post_hedged(endpoint, payload, timeout, tried)
+            except Exception as e:
+                if not self._can_failover(tried, e):
+                    raise
+
+    async def _post_hedged(
+        self,
+        endpoint: Endpoint,
+        payload: Dict[str, Any],
+        timeout: float,
+        tried: List[Endpoint]
+    ) -> Tuple[Dict[str, Any], Optional[CallTiming]]:
+        """首选端点超过 p95 仍未返回时发对冲请求，先成功者胜出，落败者被取消"""
+        delay = self.endpoints.hedge_delay(endpoint)
+        if delay is None:
+            return await self._post_to(endpoint, payload, timeout)
+
+        primary = asyncio.ensure_future(self._post_to(endpoint, payload, timeout))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        backup = None if done else self.endpoints.pick(exclude=tried)
+        if backup is None:
+            return await primary
+        tried.append(backup)
+        self.endpoints.record_hedge()
+        print(f"[LLM] {endpoint.base_url} 超过 p95 ({delay * 1000:.0f}ms)，对冲到 {backup.base_url}")
+
+        pending = {primary: endpoint, asyncio.ensure_future(self._post_to(backup, payload, timeout)): backup}
+        error = None
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    winner = pending.pop(task)
+                    if task.exception() is None:
+                        if winner is backup:
+                            self.endpoints.record_hedge(winner)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _post_to(self, endpoint: Endpoint, payload: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], Optional[CallTiming]]:
+        """向单个端点发送请求并归还端点"""
+        start = time.perf_counter()
+        try:
+            result = await self.transport.post_json(endpoint.api_url, payload, timeout=timeout)
+        except asyncio.CancelledError:
+            self.endpoints.abandon(endpoint)
+            raise
+        except Exception:
+            self.endpoints.release(endpoint, failed=True)
+            raise
+        self.endpoints.release(endpoint, latency=time.perf_counter() - start)
+        return result, self.transport.last_timing
+
+    def _in_flight(self) -> asyncio.Semaphore:
+        """当前事件循环的并发闸门"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_in_flight)
+        return semaphore
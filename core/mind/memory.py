@@ -1,48 +1,158 @@
 """记忆管理器"""
+import os
+import re
 from typing import List
-from .llm import LLMClient
+from .llm import AsyncLLMClient
+from .admission import Priority
 
 # 配置常量
-MEMORY_LIMIT = 100
-KEEP_COUNT = 3
+ACTION_SUMMARY = os.getenv("AGI_ACTION_SUMMARY", "local")  # local: 本地模板生成行动摘要；llm: 调用 LLM
+SUMMARY_LENGTH = 100  # 行动摘要最大字数
+ACTION_TEXT_LENGTH = 300  # LLM 生成行动摘要时行动日志的最大字数，超出时保留最近的部分
+DIGEST_WINDOW = int(os.getenv("AGI_DIGEST_WINDOW", "10"))  # 每攒够这么多条原始记忆压缩为一条摘要
+DIGEST_LIMIT = int(os.getenv("AGI_DIGEST_LIMIT", "5"))  # 记忆中最多保留的摘要条数，超出时最旧的一批汇总为知识
+KEEP_COUNT = 3  # 最近的原始记忆不参与压缩
+DIGEST_TAG = "[摘要]"
+PENDING_TAG = "[待摘要]"  # 后处理完成前的占位条目，完成后原位替换
+
+
+def is_digest(entry: str) -> bool:
+    return entry.startswith(DIGEST_TAG)
+
+
+def is_pending(entry: str) -> bool:
+    return PENDING_TAG in entry
+
+
+# 行动日志中每个工具调用以 "工具名(" 或 "add_task: " 开头，多个调用以 "; " 分隔
+TOOL_PATTERN = re.compile(r"(?:^|; )([A-Za-z_]\w*)(?:\(|: \{)")
+CODE_PATTERN = re.compile(r"```.*?(```|$)|<(script|style)\b.*?(</\2>|$)", re.DOTALL | re.IGNORECASE)
+TAG_PATTERN = re.compile(r"<[^>]*>")
+
+
+def tools_from_actions(actions: List[str]) -> List[str]:
+    """按首次出现顺序取出行动日志中用到的工具名"""
+    return list(dict.fromkeys(name for action in actions for name in TOOL_PATTERN.findall(action)))
+
+
+def clean_text(text: str) -> str:
+    """去掉代码块与 HTML 标签，压缩空白"""
+    return " ".join(TAG_PATTERN.sub(" ", CODE_PATTERN.sub(" ", text)).split())
+
+
+def truncate(text: str, limit: int) -> str:
+    """
+    按字符截断并加省略号；汉字可以在任意位置截断，
+    英文单词不从中间截断（单词过长时例外）
+    """
+    if len(text) <= limit:
+        return text
+    if limit <= 1:
+        return text[:limit]
+    cut = limit - 1
+    if text[cut - 1].isascii() and text[cut - 1].isalnum() and text[cut].isascii() and text[cut].isalnum():
+        space = text.rfind(" ", 0, cut)
+        if space > cut - 20 and space > 0:
+            cut = space
+    return text[:cut].rstrip() + "…"
+
+
+def local_summary(task: str, tools: List[str], result: str, max_length: int = SUMMARY_LENGTH) -> str:
+    """
+    模板生成 "任务：… → 工具：… → 结果：…" 一行摘要
+    超长时先截断任务描述，其次结果，工具与结果的结构始终保留
+    """
+    result_part = f" → 结果：{truncate(clean_text(result), 30)}"
+    fixed = len("任务：") + len(" → 工具：") + len(result_part)
+    tools_text = "、".join(tools) if tools else "无"
+    tools_text = truncate(tools_text, max(1, max_length - fixed - 8))  # 工具太多时截断，给任务描述至少留 8 字
+    room = max_length - fixed - len(tools_text)
+    return truncate(f"任务：{truncate(clean_text(task), max(room, 0))} → 工具：{tools_text}{result_part}", max_length)
 
 
 class MemoryManager:
-    """记忆管理 - 包含记忆存储和知识蒸馏"""
+    """
+    记忆管理 - 包含记忆存储和分层增量蒸馏
+    - 第一层: 最旧的 DIGEST_WINDOW 条原始记忆压缩为一条 [摘要]，留在记忆中原来的位置
+    - 第二层: 摘要超过 DIGEST_LIMIT 条时，最旧的 DIGEST_LIMIT 条汇总为知识
+    每次蒸馏每层最多处理一批，单次调用的输入有界，开销分摊到各个任务上
+    """
     
-    def __init__(self, llm: LLMClient):
+    def __init__(self, llm: AsyncLLMClient, summary_mode: str = ACTION_SUMMARY):
         self.llm = llm
+        self.summary_mode = summary_mode
     
-    def summarize_action(
+    async def summarize_action(
         self,
         task: str,
         thought: str,
         action: str,
         result: str
     ) -> str:
-        """生成行动摘要"""
+        """
+        生成行动摘要：默认由本地模板生成，配置为 llm 时才调用 LLM
+        action 为本任务全部行动日志（以 "; " 连接），本地模板列出其中用到的全部工具
+        """
+        if self.summary_mode != "llm":
+            return local_summary(task, tools_from_actions([action]), result)
+        if len(action) > ACTION_TEXT_LENGTH:
+            action = "…" + action[-ACTION_TEXT_LENGTH:]
         text = f"任务:{task} 思考:{thought} 行动:{action} 结果:{result[:200]}"
-        return self.llm.summarize(text, max_length=100)
+        return await self.llm.summarize(text, max_length=SUMMARY_LENGTH)
     
-    def should_distill(self, memory_count: int) -> bool:
-        """判断是否需要蒸馏"""
-        return memory_count > MEMORY_LIMIT
+    def should_distill(self, memories: List[str]) -> bool:
+        """判断是否有一批原始记忆或摘要需要蒸馏"""
+        digests = sum(1 for m in memories if is_digest(m))
+        raw = sum(1 for m in memories if not is_digest(m) and not is_pending(m))
+        return raw - KEEP_COUNT >= DIGEST_WINDOW or digests > DIGEST_LIMIT
     
-    def distill(self, memories: List[str]) -> tuple[List[str], List[str]]:
+    async def distill(self, memories: List[str]) -> tuple[List[str], List[str]]:
         """
-        蒸馏记忆为知识
-        返回: (新知识列表, 保留的记忆列表)
+        执行一轮增量蒸馏
+        返回: (新知识列表, 新的记忆列表)
+        LLM 调用失败时该批条目原样保留，下次再试
         """
-        if len(memories) <= KEEP_COUNT:
-            return [], memories
+        memories = await self._digest_window(memories)
+        return await self._roll_up(memories)
+    
+    async def _digest_window(self, memories: List[str]) -> List[str]:
+        """把最旧的一批原始记忆压缩为一条摘要（占位条目等替换后再压缩）"""
+        raw = [i for i, m in enumerate(memories) if not is_digest(m) and not is_pending(m)]
+        if len(raw) - KEEP_COUNT < DIGEST_WINDOW:
+            return memories
+        window = raw[:DIGEST_WINDOW]
         
-        memories_to_distill = memories[:-KEEP_COUNT]
-        active_memory = memories[-KEEP_COUNT:]
+        print(f"\n[Memory] 压缩 {len(window)} 条记忆为摘要...")
+        memory_text = "\n".join(memories[i] for i in window)
+        prompt = f"""把以下记忆压缩为一条摘要（不超过100字），保留做过的任务、用到的工具、结果和失败原因：
+{memory_text}
+
+摘要："""
+        messages = [{"role": "user", "content": prompt}]
+        result = await self.llm.chat(messages, max_tokens=200, priority=Priority.SUMMARY)
+        if not result:
+            return memories
         
-        print(f"\n[Memory] 蒸馏 {len(memories_to_distill)} 条记忆...")
+        content = " ".join(result["choices"][0]["message"]["content"].split())
+        digest = f"{DIGEST_TAG} {content}"
+        dropped = set(window[1:])
+        return [
+            digest if i == window[0] else m
+            for i, m in enumerate(memories)
+            if i not in dropped
+        ]
+    
+    async def _roll_up(self, memories: List[str]) -> tuple[List[str], List[str]]:
+        """摘要过多时，把最旧的一批汇总为知识"""
+        digests = [i for i, m in enumerate(memories) if is_digest(m)]
+        if len(digests) <= DIGEST_LIMIT:
+            return [], memories
+        batch = digests[:DIGEST_LIMIT]
+        
+        print(f"\n[Memory] 蒸馏 {len(batch)} 条摘要为知识...")
         
         # 调用 LLM 提取知识
-        memory_text = "\n".join(memories_to_distill)
+        memory_text = "\n".join(memories[i][len(DIGEST_TAG):].strip() for i in batch)
         prompt = f"""从以下记忆中提取关键洞察（每行一条）：
 {memory_text}
 
@@ -53,16 +163,17 @@ class MemoryManager:
             {"role": "user", "content": prompt}
         ]
         
-        result = self.llm.chat(messages, max_tokens=512)
+        result = await self.llm.chat(messages, max_tokens=512, priority=Priority.SUMMARY)
         
-        if result:
-            content = result["choices"][0]["message"]["content"]
-            insights = [
-                f"[经验] {line.strip('- *').strip()}"
-                for line in content.split("\n")
-                if line.strip()
-            ]
-            print(f"[Memory] 提炼出 {len(insights)} 条知识")
-            return insights, active_memory
+        if not result:
+            return [], memories
         
-        return [], active_memory
+        content = result["choices"][0]["message"]["content"]
+        insights = [
+            f"[经验] {line.strip('- *').strip()}"
+            for line in content.split("\n")
+            if line.strip()
+        ]
+        print(f"[Memory] 提炼出 {len(insights)} 条知识")
+        rolled = set(batch)
+        return insights, [m for i, m in enumerate(memories) if i not in rolled]
@@ -1,29 +1,98 @@
 """规划器 - 决策引擎"""
 import dataclasses
 import json
-from typing import Optional, List, Dict
-from .llm import LLMClient
-from core.tools.executor import ToolCall
+import re
+from typing import Optional, List, Dict, Callable
+from .llm import AsyncLLMClient
+from .admission import Priority
+from .prompt import PromptBuilder
+from .retrieval import ContextRetriever
+from core.tools.executor import ToolCall, is_error_output
+
+
+# 完成信号伪工具：由规划器解析，不进入工具注册表
+TASK_COMPLETE_TOOL = "task_complete"
+TASK_COMPLETE_SCHEMA = {
+    "type": "function",
+    "function": {
+        "name": TASK_COMPLETE_TOOL,
+        "description": "声明当前任务已完成。可与本轮最后一个行动一起调用，行动执行成功后任务即结束。",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "summary": {"type": "string", "description": "完成依据（一句话）"}
+            },
+            "required": ["summary"]
+        }
+    }
+}
+TASK_COMPLETE_RULE = f"5. 任务完成时调用 {TASK_COMPLETE_TOOL}，可与最后一个行动同时调用，不要只用文字声明"
+
+# 不支持工具调用时的文字完成标记，只认行首独立的 DONE，避免“未完成”之类误判
+DONE_PATTERN = re.compile(r"^\s*\[?DONE(?!\w)", re.MULTILINE)
+
+
+PLAN_AHEAD_PROMPT = """请一次性给出完成当前任务的完整行动列表，按执行顺序排列，只输出 JSON 数组：
+[
+    {{"tool": "工具名", "args": {{参数}}, "expect": "预期出现在工具输出中的片段（可留空）"}}
+]
+可用工具: {tools}
+每一步必须是上面的工具之一，最多 {max_steps} 步。"""
+
+
+@dataclasses.dataclass
+class PlannedStep:
+    """预规划中的一步"""
+    tool_call: ToolCall
+    expect: str = ""  # 预期出现在工具输出中的片段，为空时只检查是否报错
+
+    def diverged(self, observation: str) -> bool:
+        """执行结果是否偏离预期"""
+        return is_error_output(observation) or bool(self.expect and self.expect not in observation)
 
 
 @dataclasses.dataclass
 class Plan:
     """执行计划"""
     thought: str
-    tool_call: Optional[ToolCall] = None
+    tool_call: Optional[ToolCall] = None  # 第一个工具调用（兼容单调用的调用方）
+    tool_calls: List[ToolCall] = dataclasses.field(default_factory=list)  # 本次响应的全部工具调用
     final_answer: Optional[str] = None
     task_completed: bool = False  # 任务是否完成
     failure_reason: str = ""  # 失败原因
 
+    def __post_init__(self):
+        # tool_call 与 tool_calls 任给其一即可
+        if self.tool_call and not self.tool_calls:
+            self.tool_calls = [self.tool_call]
+        elif self.tool_calls and not self.tool_call:
+            self.tool_call = self.tool_calls[0]
+
 
 class Planner:
-    """规划器 - 根据上下文生成执行计划"""
+    """规划器 - 根据上下文生成执行计划（异步）"""
     
-    def __init__(self, llm: LLMClient, tool_schemas: List[Dict]):
+    def __init__(
+        self,
+        llm: AsyncLLMClient,
+        tool_schemas: List[Dict],
+        stream: bool = False,
+        completion_tool: bool = True,
+        retriever: ContextRetriever = None
+    ):
         self.llm = llm
-        self.tool_schemas = tool_schemas
+        self.retriever = retriever  # 有检索器时按任务挑选相关的知识与记忆，否则取最近的条目
+        self.completion_tool = completion_tool  # 规划响应通过 task_complete 伪工具声明完成
+        if completion_tool:
+            tool_schemas = tool_schemas + [TASK_COMPLETE_SCHEMA]
+        self.prompt = PromptBuilder(  # 静态部分按 Agent 预构建
+            tool_schemas,
+            extra_rules=[TASK_COMPLETE_RULE] if completion_tool else None
+        )
+        self.tool_schemas = self.prompt.tool_schemas
+        self.stream = stream  # 流式输出思考，整批工具调用在流结束后一起执行
     
-    def check_task_completion(
+    async def check_task_completion(
         self,
         task: str,
         action_history: List[str],
@@ -55,65 +124,57 @@ class Planner:
 }}
 """
         messages = [{"role": "user", "content": prompt}]
-        result = self.llm.chat(messages)
+        result = await self.llm.chat(messages, cacheable=True, priority=Priority.COMPLETION)
         
         if not result:
             return {"completed": False, "reason": "LLM调用失败", "next_action": "重试"}
         
         content = result["choices"][0]["message"].get("content", "")
         
-        # 尝试解析JSON
-        try:
-            # 提取JSON部分
-            import re
-            json_match = re.search(r'\{[^{}]*\}', content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-        except:
-            pass
-        
-        # 简单判断
-        if "完成" in content or "成功" in content or "done" in content.lower():
-            return {"completed": True, "reason": content, "next_action": ""}
+        # 尝试解析JSON：从每个 "{" 起尝试解码，允许嵌套和代码块包裹
+        decoder = json.JSONDecoder()
+        start = content.find("{")
+        while start != -1:
+            try:
+                parsed, _ = decoder.raw_decode(content, start)
+                if isinstance(parsed, dict) and "completed" in parsed:
+                    # 只认明确的 true，"false"、"否" 等都视为未完成
+                    parsed["completed"] = str(parsed["completed"]).strip().lower() == "true"
+                    return parsed
+            except ValueError:
+                pass
+            start = content.find("{", start + 1)
         
+        # 无法解析出判定时一律视为未完成：“任务未完成”之类的回答含有“完成”，不能按关键词判断
         return {"completed": False, "reason": content, "next_action": "继续执行"}
     
-    def plan(
+    async def plan(
         self,
         agent: Dict,
         knowledge: List[str],
         memory: List[str],
         task: str,
-        meta_prompt: str = None
+        meta_prompt: str = None,
+        on_progress: Callable[[str], None] = None,
+        history: List[Dict] = None
     ) -> Plan:
-        """生成执行计划"""
+        """
+        生成执行计划
+
+        Args:
+            history: 本任务之前各步的对话消息（assistant 工具调用 + tool 观察）
+        """
         print(f"\n--- [Planner] 任务: {task} ---")
         
-        # 构建系统提示词
-        meta_section = f"[元层指导]\n{meta_prompt}\n---\n" if meta_prompt else ""
-        
-        system_prompt = f"""{meta_section}你是 {agent.get('name', 'Genesis AI')}。
-目标: {agent.get('objective', 'Evolve')}
-风格: {agent.get('style', 'Concise')}
-
-[核心法则]
-1. 先看记忆，不要重复失败的行动
-2. 行动优先：创建文件用 write_file，创建文件夹用 create_folder
-3. 修改文件直接用 write_file 写入新内容
-4. 避免无效循环：读取后应该写入
-
-[知识库]: {knowledge[-10:] if knowledge else []}
-[记忆]: {memory[-10:] if memory else []}
-"""
+        if self.retriever:
+            knowledge, memory = self.retriever.select(task, knowledge, memory)
+        messages = self.prompt.build(agent, knowledge, memory, task, meta_prompt, history)
 
-        user_prompt = f"当前任务: {task}\n决定下一步行动。"
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-
-        result = self.llm.chat(messages, tools=self.tool_schemas)
+        if self.stream:
+            result = await self._stream_plan(messages, on_progress)
+        else:
+            result = await self.llm.chat(messages, tools=self.tool_schemas)
+        self.prompt.record_response(result)
         
         if not result:
             return Plan(thought="LLM 调用失败", final_answer="Error")
@@ -121,22 +182,124 @@ class Planner:
         message = result["choices"][0]["message"]
         content = message.get("content", "") or ""
         
-        # 解析工具调用
-        if message.get("tool_calls"):
-            tool_data = message["tool_calls"][0]
+        # 解析全部工具调用，task_complete 作为完成信号单独提取
+        tool_calls = []
+        completion = None
+        for tool_data in message.get("tool_calls") or []:
             func_name = tool_data["function"]["name"]
-            args = json.loads(tool_data["function"]["arguments"])
-            
+            try:
+                args = json.loads(tool_data["function"]["arguments"] or "{}")
+                if not isinstance(args, dict):
+                    raise ValueError("参数不是 JSON 对象")
+            except ValueError as e:
+                # 参数无法解析时整批不执行，错误作为观察结果反馈给下一步规划
+                error = f"Error: 工具调用 {func_name} 的参数无法解析（{e}）: {tool_data['function']['arguments'][:200]}"
+                print(f"[Planner] {error}")
+                return Plan(thought=error, failure_reason=error)
+            if func_name == TASK_COMPLETE_TOOL:
+                completion = args.get("summary") or "任务完成"
+            else:
+                tool_calls.append(ToolCall(name=func_name, args=args, id=tool_data.get("id") or ""))
+        
+        if tool_calls:
             return Plan(
-                thought=f"调用 {func_name}，参数: {args}",
-                tool_call=ToolCall(name=func_name, args=args)
+                thought="；".join(f"调用 {c.name}，参数: {c.args}" for c in tool_calls),
+                tool_call=tool_calls[0],
+                tool_calls=tool_calls,
+                final_answer=completion,
+                task_completed=completion is not None
             )
         
-        # 检查是否明确表示完成
-        is_done = "DONE" in content or "完成" in content or "已完成" in content
+        if completion is None and DONE_PATTERN.search(content):
+            completion = content
         
         return Plan(
-            thought=content,
-            final_answer=content if is_done else None,
-            task_completed=is_done
+            thought=completion or content,
+            final_answer=completion,
+            task_completed=completion is not None
+        )
+
+    async def plan_ahead(
+        self,
+        agent: Dict,
+        knowledge: List[str],
+        memory: List[str],
+        task: str,
+        meta_prompt: str = None,
+        max_steps: int = 10
+    ) -> Optional[List[PlannedStep]]:
+        """
+        一次请求生成整个任务的有序行动列表
+        与 plan 共用同一提示词前缀，解析失败或包含未知工具时返回 None（退回逐步规划）
+        """
+        print(f"\n--- [Planner] 预规划: {task} ---")
+        if self.retriever:
+            knowledge, memory = self.retriever.select(task, knowledge, memory)
+        tools = {
+            schema["function"]["name"]: list(schema["function"].get("parameters", {}).get("properties", {}))
+            for schema in self.tool_schemas
+            if schema["function"]["name"] != TASK_COMPLETE_TOOL
+        }
+        messages = self.prompt.build(agent, knowledge, memory, task, meta_prompt) + [{
+            "role": "user",
+            "content": PLAN_AHEAD_PROMPT.format(
+                tools=", ".join(f"{name}({', '.join(params)})" for name, params in tools.items()),
+                max_steps=max_steps
+            ),
+        }]
+        result = await self.llm.chat(messages)
+        self.prompt.record_response(result)
+        if not result:
+            return None
+
+        steps = self._parse_steps(result["choices"][0]["message"].get("content") or "")
+        if not steps or len(steps) > max_steps:
+            return None
+        planned = []
+        for i, step in enumerate(steps):
+            name, args = step.get("tool"), step.get("args")
+            if name not in tools or not isinstance(args, dict):
+                print(f"[Planner] 预规划第 {i + 1} 步无效: {step}")
+                return None
+            planned.append(PlannedStep(ToolCall(name=name, args=args), str(step.get("expect") or "")))
+        return planned
+
+    @staticmethod
+    def _parse_steps(content: str) -> Optional[List[Dict]]:
+        """从回复中取出第一个由对象组成的 JSON 数组"""
+        decoder = json.JSONDecoder()
+        start = content.find("[")
+        while start != -1:
+            try:
+                parsed, _ = decoder.raw_decode(content, start)
+                if isinstance(parsed, list) and parsed and all(isinstance(s, dict) for s in parsed):
+                    return parsed
+            except ValueError:
+                pass
+            start = content.find("[", start + 1)
+        return None
+
+    async def _stream_plan(self, messages: List[Dict], on_progress: Callable[[str], None] = None) -> Dict:
+        """流式规划：思考逐行回传；读到流结束（finish_reason 之后）才返回，整批工具调用与 task_complete 一起交给调用方"""
+        buffer = []
+        
+        def flush():
+            line = "".join(buffer).strip()
+            buffer.clear()
+            if line and on_progress:
+                on_progress(f"  💭 {line}")
+        
+        def on_text(text: str):
+            *lines, rest = text.split("\n")
+            for line in lines:
+                buffer.append(line)
+                flush()
+            buffer.append(rest)
+        
+        result = await self.llm.chat_stream(
+            messages,
+            tools=self.tool_schemas,
+            on_text=on_text if on_progress else None
         )
+        flush()
+        return result
@@ -0,0 +1,128 @@
+"""提示词构建 - 按稳定性排列内容，让模型服务端复用 KV 缓存前缀"""
+import dataclasses
+import json
+from typing import Any, Dict, List, Optional
+
+# 配置常量
+KNOWLEDGE_WINDOW = 10  # 提示词中保留的最近知识条数
+MEMORY_WINDOW = 10  # 提示词中保留的最近记忆条数
+
+RULES = """[核心法则]
+1. 先看记忆，不要重复失败的行动
+2. 行动优先：创建文件用 write_file，创建文件夹用 create_folder
+3. 修改文件直接用 write_file 写入新内容
+4. 避免无效循环：读取后应该写入"""
+
+
+@dataclasses.dataclass
+class PromptStats:
+    """
+    前缀复用统计
+    - 客户端侧: 相邻两次请求序列化后的公共前缀占比
+    - 服务端侧: 响应中报告的缓存 token 数（llama.cpp 的 timings.cache_n 或 usage.prompt_tokens_details.cached_tokens）
+    """
+    calls: int = 0
+    prompt_chars: int = 0
+    prefix_chars: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def prefix_hit_rate(self) -> float:
+        return self.prefix_chars / self.prompt_chars if self.prompt_chars else 0.0
+
+    @property
+    def server_hit_rate(self) -> Optional[float]:
+        """服务端未报告缓存信息时返回 None"""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else None
+
+    def summary(self) -> str:
+        text = f"前缀复用率 {self.prefix_hit_rate:.0%}（{self.calls} 次规划）"
+        if self.server_hit_rate is not None:
+            text += f"，服务端缓存命中 {self.server_hit_rate:.0%}"
+        return text
+
+
+class PromptBuilder:
+    """
+    规划提示词构建器（每个 Agent 一个）
+    消息按从稳定到易变排列:
+      system: 元层指导 → 身份 → 核心法则 → 知识库
+      user:   记忆 → 当前任务
+      之后:   本任务的多轮工具调用历史（只追加）
+    工具定义通过请求的 tools 字段传入，构建时规范化一次，之后每步复用同一份，
+    保证序列化结果逐字节一致。
+    """
+
+    def __init__(self, tool_schemas: List[Dict], extra_rules: List[str] = None):
+        self.tool_schemas = json.loads(json.dumps(tool_schemas, sort_keys=True, ensure_ascii=False))
+        self.rules = "\n".join([RULES] + (extra_rules or []))
+        self.stats = PromptStats()
+        self._static_key: Optional[tuple] = None
+        self._static_prompt = ""
+        self._last_rendered = ""
+
+    def build(
+        self,
+        agent: Dict,
+        knowledge: List[str],
+        memory: List[str],
+        task: str,
+        meta_prompt: str = None,
+        history: List[Dict] = None
+    ) -> List[Dict[str, str]]:
+        """构建规划消息，history 为本任务已有的多轮消息，追加在末尾"""
+        system_prompt = self._static(agent, meta_prompt)
+        if knowledge:
+            system_prompt += "\n\n[知识库]\n" + "\n".join(f"- {k}" for k in knowledge[-KNOWLEDGE_WINDOW:])
+
+        user_prompt = ""
+        if memory:
+            user_prompt += "[记忆]\n" + "\n".join(f"- {m}" for m in memory[-MEMORY_WINDOW:]) + "\n\n"
+        user_prompt += f"当前任务: {task}\n决定下一步行动。"
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ] + (history or [])
+        self._measure(messages)
+        return messages
+
+    def record_response(self, result: Optional[Dict[str, Any]]):
+        """从响应中读取服务端报告的提示词缓存命中"""
+        if not result:
+            return
+        timings = result.get("timings") or {}
+        usage = result.get("usage") or {}
+        if "cache_n" in timings:
+            self.stats.cached_tokens += timings["cache_n"]
+            self.stats.prompt_tokens += timings["cache_n"] + timings.get("prompt_n", 0)
+        elif (usage.get("prompt_tokens_details") or {}).get("cached_tokens") is not None:
+            self.stats.cached_tokens += usage["prompt_tokens_details"]["cached_tokens"]
+            self.stats.prompt_tokens += usage.get("prompt_tokens", 0)
+
+    def _static(self, agent: Dict, meta_prompt: Optional[str]) -> str:
+        """身份与法则只在 Agent 配置或元层指导变化时重建"""
+        key = (agent.get("name"), agent.get("objective"), agent.get("style"), meta_prompt)
+        if key != self._static_key:
+            meta_section = f"[元层指导]\n{meta_prompt}\n---\n" if meta_prompt else ""
+            self._static_prompt = f"""{meta_section}你是 {agent.get('name', 'Genesis AI')}。
+目标: {agent.get('objective', 'Evolve')}
+风格: {agent.get('style', 'Concise')}
+
+{self.rules}"""
+            self._static_key = key
+        return self._static_prompt
+
+    def _measure(self, messages: List[Dict[str, str]]):
+        """统计与上一次请求的公共前缀"""
+        rendered = json.dumps(messages, ensure_ascii=False)
+        prefix = 0
+        for a, b in zip(rendered, self._last_rendered):
+            if a != b:
+                break
+            prefix += 1
+        self.stats.calls += 1
+        self.stats.prompt_chars += len(rendered)
+        self.stats.prefix_chars += prefix
+        self._last_rendered = rendered
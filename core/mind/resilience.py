@@ -0,0 +1,129 @@
+"""LLM 调用韧性 - 熔断器与按调用类型自适应的超时"""
+import collections
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# 配置常量
+BREAKER_FAILURES = int(os.getenv("AGI_LLM_BREAKER_FAILURES", "5"))  # 连续失败多少次后熔断
+BREAKER_RESET_SECONDS = float(os.getenv("AGI_LLM_BREAKER_RESET_SEC", "30"))  # 熔断多久后放行一次试探
+TIMEOUT_MAX = float(os.getenv("AGI_LLM_TIMEOUT_MAX", "600"))  # 超时上限，也是样本不足时的超时
+TIMEOUT_MIN = float(os.getenv("AGI_LLM_TIMEOUT_MIN", "15"))  # 超时下限
+TIMEOUT_MULTIPLIER = 3.0  # 超时 = p99 延迟 × 倍数
+TIMEOUT_MIN_SAMPLES = 10  # 至少这么多样本才开始自适应
+LATENCY_WINDOW = 200  # 每种调用保留的最近延迟样本数
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开，LLM 服务被判定为不可用"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"LLM 服务不可用（熔断中，{retry_after:.0f}s 后重试）")
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    - closed: 正常放行，连续失败达到 failure_threshold 次后打开
+    - open: 直接拒绝，reset_timeout 秒后转为 half-open
+    - half-open: 只放行一个试探请求，成功则关闭，失败则重新打开
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None  # 试探请求发出时间，超过 reset_timeout 未回报视为丢失
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """熔断中且尚未到试探时间"""
+        return self.retry_after() > 0
+
+    def retry_after(self) -> float:
+        """距离允许试探还有多少秒，未熔断时为 0"""
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """是否放行本次请求"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                return False
+            self._probe_started = now
+            return True
+
+    def raise_if_open(self):
+        """熔断中时抛出 CircuitOpenError（不占用试探名额）"""
+        retry_after = self.retry_after()
+        if retry_after > 0:
+            raise CircuitOpenError(retry_after)
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                print("[LLM] 服务恢复，熔断关闭")
+            self.failures = 0
+            self.opened_at = None
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    print(f"[LLM] 连续失败 {self.failures} 次，熔断 {self.reset_timeout:.0f}s")
+                self.opened_at = time.monotonic()
+            self._probe_started = None
+
+
+class AdaptiveTimeout:
+    """
+    按调用类型（规划、完成检查、摘要……）记录成功请求的延迟，
+    超时取 p99 × TIMEOUT_MULTIPLIER，并限制在 [min_timeout, max_timeout] 内
+    """
+
+    def __init__(
+        self,
+        min_timeout: float = TIMEOUT_MIN,
+        max_timeout: float = TIMEOUT_MAX,
+        multiplier: float = TIMEOUT_MULTIPLIER
+    ):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.multiplier = multiplier
+        self._samples: Dict[str, "collections.deque[float]"] = collections.defaultdict(
+            lambda: collections.deque(maxlen=LATENCY_WINDOW)
+        )
+        self._lock = threading.Lock()
+
+    def timeout(self, call_type: str) -> float:
+        """本次调用应使用的超时（秒）"""
+        with self._lock:
+            samples = self._samples.get(call_type)
+            if not samples or len(samples) < TIMEOUT_MIN_SAMPLES:
+                return self.max_timeout
+            ordered = sorted(samples)
+        p99 = ordered[int(0.99 * (len(ordered) - 1))]
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.multiplier))
+
+    def record(self, call_type: str, latency: float):
+        with self._lock:
+            self._samples[call_type].append(latency)
+
+    def summary(self) -> Dict[str, float]:
+        """各调用类型当前的超时"""
+        with self._lock:
+            call_types = list(self._samples)
+        return {call_type: self.timeout(call_type) for call_type in call_types}
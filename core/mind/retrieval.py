@@ -0,0 +1,186 @@
+"""上下文检索 - 用 BM25 倒排索引从记忆与知识中挑出与当前任务相关的条目"""
+import collections
+import json
+import math
+import os
+import re
+from typing import Dict, List, Set, Tuple
+from core.text import TIMESTAMP_PATTERN, tokenize
+from .conversation import estimate_tokens
+
+# 配置常量
+RETRIEVAL_TOKENS = int(os.getenv("AGI_RETRIEVAL_TOKENS", "1200"))  # 知识与记忆合计的 token 预算，各占一半
+TOP_K = 10  # 每类最多选出的条目数
+RECENT_MEMORY = 3  # 无论是否相关都保留的最近记忆条数
+INDEX_SUFFIX = ".index.json"  # 索引文件与 DNA 文件同目录，文件名追加此后缀
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def _dedup_key(text: str) -> str:
+    """去掉时间戳和数字后的文本，“第1次尝试未完成”与“第2次尝试未完成”视为同一条"""
+    return re.sub(r"\d+", "#", TIMESTAMP_PATTERN.sub("", text))
+
+
+class BM25Index:
+    """
+    单类条目的 BM25 倒排索引
+    以条目文本为文档键（重复条目只索引一次），sync 时只为新增条目切词
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, Dict[str, int]] = {}  # 文档 -> 词频
+        self._postings: Dict[str, Set[str]] = collections.defaultdict(set)
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, text: str):
+        if text in self._docs:
+            return
+        frequencies = dict(collections.Counter(tokenize(text)))
+        self._docs[text] = frequencies
+        self._total_length += sum(frequencies.values())
+        for term in frequencies:
+            self._postings[term].add(text)
+
+    def remove(self, text: str):
+        frequencies = self._docs.pop(text, None)
+        if frequencies is None:
+            return
+        self._total_length -= sum(frequencies.values())
+        for term in frequencies:
+            self._postings[term].discard(text)
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def sync(self, entries: List[str]) -> bool:
+        """让索引与当前条目一致，返回是否有变化"""
+        current = set(entries)
+        stale = [text for text in self._docs if text not in current]
+        fresh = [text for text in current if text not in self._docs]
+        for text in stale:
+            self.remove(text)
+        for text in fresh:
+            self.add(text)
+        return bool(stale or fresh)
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """与查询有共同词的文档及其 BM25 得分"""
+        n = len(self._docs)
+        if not n:
+            return {}
+        avg_length = self._total_length / n or 1.0
+        scores: Dict[str, float] = collections.defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for text in postings:
+                frequencies = self._docs[text]
+                tf = frequencies[term]
+                length = sum(frequencies.values())
+                scores[text] += idf * tf * (self.k1 + 1) / (
+                    tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                )
+        return scores
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        return self._docs
+
+    @classmethod
+    def from_dict(cls, docs: Dict[str, Dict[str, int]]) -> "BM25Index":
+        index = cls()
+        for text, frequencies in docs.items():
+            index._docs[text] = frequencies
+            index._total_length += sum(frequencies.values())
+            for term in frequencies:
+                index._postings[term].add(text)
+        return index
+
+
+class ContextRetriever:
+    """
+    每个 Agent 一个的规划上下文检索器
+    - 知识与记忆各建一个 BM25 索引，条目增删时增量更新，并保存在 DNA 文件旁边
+    - select 按当前任务挑出最相关的条目，在 token 预算内按原顺序返回，
+      同一任务的各步骤得到相同的上下文，提示词前缀保持稳定
+    - 条目不多、全部放得下时原样返回
+    """
+
+    def __init__(self, index_path: str = None, token_budget: int = RETRIEVAL_TOKENS, top_k: int = TOP_K):
+        self.index_path = index_path
+        self.token_budget = token_budget
+        self.top_k = top_k
+        self.knowledge = BM25Index()
+        self.memory = BM25Index()
+        self._load()
+
+    @classmethod
+    def for_dna(cls, dna_file: str) -> "ContextRetriever":
+        return cls(dna_file + INDEX_SUFFIX)
+
+    def select(self, task: str, knowledge: List[str], memory: List[str]) -> Tuple[List[str], List[str]]:
+        """返回 (相关知识, 相关记忆)"""
+        changed = self.knowledge.sync(knowledge)
+        changed = self.memory.sync(memory) or changed
+        if changed:
+            self._save()
+        budget = self.token_budget // 2
+        return (
+            self._select(self.knowledge, task, knowledge, budget, recent=0),
+            self._select(self.memory, task, memory, budget, recent=RECENT_MEMORY),
+        )
+
+    def _select(self, index: BM25Index, task: str, entries: List[str], budget: int, recent: int) -> List[str]:
+        if len(entries) <= self.top_k and sum(estimate_tokens(e) for e in entries) <= budget:
+            return list(entries)
+
+        # 最近的几条总是保留，其余按得分从高到低，同一模板的条目只取最新一条
+        positions = {text: i for i, text in enumerate(entries)}  # 重复条目取最后一次出现的位置
+        chosen: List[int] = []
+        seen_keys = set()
+        used = 0
+        recent_positions = list(range(max(0, len(entries) - recent), len(entries)))
+        scores = index.scores(task)
+        ranked = sorted(scores, key=lambda text: (-scores[text], -positions.get(text, -1)))
+        for i in recent_positions[::-1] + [positions[text] for text in ranked if text in positions]:
+            text = entries[i]
+            key = _dedup_key(text)
+            if i in chosen or key in seen_keys:
+                continue
+            cost = estimate_tokens(text)
+            if used + cost > budget or len(chosen) >= self.top_k:
+                continue
+            chosen.append(i)
+            seen_keys.add(key)
+            used += cost
+        return [entries[i] for i in sorted(chosen)]
+
+    def _load(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.knowledge = BM25Index.from_dict(data.get("knowledge", {}))
+            self.memory = BM25Index.from_dict(data.get("memory", {}))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"[Retrieval] 索引损坏，重新构建: {e}")
+            self.knowledge, self.memory = BM25Index(), BM25Index()
+
+    def _save(self):
+        if not self.index_path:
+            return
+        data = {"knowledge": self.knowledge.to_dict(), "memory": self.memory.to_dict()}
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"[Retrieval] 索引保存失败: {e}")
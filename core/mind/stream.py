@@ -0,0 +1,118 @@
+"""流式响应解析 - 增量拼装 SSE 分片，参数 JSON 闭合即产出工具调用"""
+import json
+from typing import Callable, Dict, List, Optional
+from core.tools.executor import ToolCall
+
+
+class JSONCloseScanner:
+    """增量扫描 JSON 文本，判断顶层对象何时闭合"""
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.closed = False
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> bool:
+        """追加文本，返回顶层对象是否已闭合"""
+        for ch in text:
+            if self.closed:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                self.started = True
+            elif ch in "}]":
+                self.depth -= 1
+                if self.started and self.depth == 0:
+                    self.closed = True
+        return self.closed
+
+
+class _PendingToolCall:
+    """正在拼装的工具调用"""
+
+    def __init__(self):
+        self.id = ""
+        self.name = ""
+        self.arguments = ""
+        self.scanner = JSONCloseScanner()
+        self.emitted = False
+
+    def to_message(self) -> Dict:
+        return {
+            "id": self.id,
+            "type": "function",
+            "function": {"name": self.name, "arguments": self.arguments},
+        }
+
+
+class StreamParser:
+    """
+    OpenAI 兼容的 chat.completion.chunk 增量解析器
+    - 文本增量通过 on_text 回调实时输出
+    - 某个工具调用的函数名和参数 JSON 都完整后，feed 立即返回该 ToolCall
+    """
+
+    def __init__(self, on_text: Callable[[str], None] = None):
+        self.on_text = on_text
+        self.content = ""
+        self.finish_reason: Optional[str] = None
+        self._tool_calls: Dict[int, _PendingToolCall] = {}
+
+    def feed(self, chunk: Dict) -> List[ToolCall]:
+        """处理一个分片，返回本分片中新完成的工具调用"""
+        completed = []
+        for choice in chunk.get("choices", []):
+            # 兼容不支持流式的服务端：整条 message 当作一个增量
+            delta = choice.get("delta") or choice.get("message") or {}
+            if choice.get("finish_reason"):
+                self.finish_reason = choice["finish_reason"]
+
+            text = delta.get("content")
+            if text:
+                self.content += text
+                if self.on_text:
+                    self.on_text(text)
+
+            for position, tc in enumerate(delta.get("tool_calls") or []):
+                # 非流式响应的 tool_calls 不带 index，按在列表中的位置区分
+                call = self._tool_calls.setdefault(tc.get("index", position), _PendingToolCall())
+                call.id = tc.get("id") or call.id
+                func = tc.get("function") or {}
+                call.name += func.get("name") or ""
+                args = func.get("arguments") or ""
+                call.arguments += args
+                if call.scanner.feed(args) and call.name and not call.emitted:
+                    parsed = self._parse_args(call.arguments)
+                    if parsed is not None:
+                        call.emitted = True
+                        completed.append(ToolCall(name=call.name, args=parsed, id=call.id))
+        return completed
+
+    @staticmethod
+    def _parse_args(arguments: str) -> Optional[dict]:
+        try:
+            return json.loads(arguments)
+        except json.JSONDecodeError:
+            return None
+
+    def message(self, complete_only: bool = False) -> Dict:
+        """拼装为与非流式响应一致的 message"""
+        calls = [
+            self._tool_calls[i] for i in sorted(self._tool_calls)
+            if self._tool_calls[i].emitted or not complete_only
+        ]
+        message = {"role": "assistant", "content": self.content}
+        if calls:
+            message["tool_calls"] = [c.to_message() for c in calls]
+        return message
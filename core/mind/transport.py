@@ -0,0 +1,346 @@
+"""HTTP 传输层 - 连接池、重试退避与耗时统计"""
+import asyncio
+import concurrent.futures
+import contextvars
+import dataclasses
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# 配置常量
+POOL_SIZE = int(os.getenv("AGI_LLM_POOL_SIZE", "10"))  # 每个主机的长连接数
+MAX_RETRIES = int(os.getenv("AGI_LLM_MAX_RETRIES", "3"))  # 最大重试次数
+BACKOFF_BASE = 0.5  # 退避基数（秒）
+BACKOFF_MAX = 8.0  # 单次退避上限（秒）
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.exceptions.ChunkedEncodingError)
+
+# 线程本地的调用计时上下文
+_local = threading.local()
+
+
+class _ConnectTimerMixin:
+    """记录 TCP/TLS 建连耗时"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            elapsed = time.perf_counter() - start
+            _local.connect_time = getattr(_local, "connect_time", 0.0) + elapsed
+            _local.new_connections = getattr(_local, "new_connections", 0) + 1
+
+
+class _TimedHTTPConnection(_ConnectTimerMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_ConnectTimerMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _PooledAdapter(HTTPAdapter):
+    """使用计时连接的连接池适配器"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+@dataclasses.dataclass
+class CallTiming:
+    """单次调用耗时"""
+    connect_ms: float  # 建连耗时，复用连接时为 0
+    total_ms: float  # 含重试与退避的总耗时
+    attempts: int = 1
+    new_connections: int = 0
+    ok: bool = True
+
+    @property
+    def reused(self) -> bool:
+        """是否完全复用已有连接"""
+        return self.new_connections == 0
+
+
+@dataclasses.dataclass
+class TransportStats:
+    """累计传输统计"""
+    calls: int = 0
+    failures: int = 0
+    retries: int = 0
+    new_connections: int = 0
+    reused_calls: int = 0
+    connect_ms: float = 0.0
+    total_ms: float = 0.0
+
+    def record(self, timing: CallTiming):
+        """累加一次调用"""
+        self.calls += 1
+        self.failures += 0 if timing.ok else 1
+        self.retries += timing.attempts - 1
+        self.new_connections += timing.new_connections
+        self.reused_calls += 1 if timing.reused else 0
+        self.connect_ms += timing.connect_ms
+        self.total_ms += timing.total_ms
+
+    def summary(self) -> Dict[str, float]:
+        """统计摘要"""
+        calls = self.calls or 1
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "new_connections": self.new_connections,
+            "reuse_rate": self.reused_calls / calls,
+            "avg_connect_ms": self.connect_ms / calls,
+            "avg_total_ms": self.total_ms / calls,
+        }
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX,
+                  retry_after: Optional[str] = None) -> float:
+    """带抖动的指数退避（full jitter），优先遵循 Retry-After"""
+    delay = random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+    if retry_after:
+        try:
+            delay = max(delay, min(cap, float(retry_after)))
+        except ValueError:
+            pass
+    return delay
+
+
+class HTTPTransport:
+    """带连接池和重试的 HTTP 传输 - 所有 LLM 调用共享 keep-alive 连接"""
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX
+    ):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = TransportStats()
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        adapter = _PooledAdapter(pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post_json(self, url: str, payload: Dict[str, Any], timeout: float = 600) -> Dict[str, Any]:
+        """发送 JSON 请求并返回解析后的响应，重试耗尽后抛出异常"""
+        start = self._begin()
+        ok = False
+        try:
+            response = self._send(url, json.dumps(payload), timeout)
+            result = response.json()
+            ok = True
+            return result
+        finally:
+            self._record(start, ok)
+
+    def stream_events(self, url: str, payload: Dict[str, Any], timeout: float = 600) -> Iterator[str]:
+        """
+        发送流式请求，逐条产出 SSE 的 data 内容
+        仅在收到响应前重试；服务端返回普通 JSON 时整体作为一条产出
+        """
+        start = self._begin()
+        ok = False
+        response = None
+        try:
+            response = self._send(url, json.dumps(payload), timeout, stream=True)
+            if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                yield response.text
+            else:
+                done = False
+                for line in response.iter_lines():
+                    if done or not line.startswith(b"data:"):
+                        continue
+                    event = line[5:].strip().decode("utf-8")
+                    if event == "[DONE]":
+                        done = True  # 继续读完响应体，连接才能归还复用
+                        continue
+                    yield event
+            ok = True
+        except GeneratorExit:
+            # 调用方提前结束（如已拿到完整工具调用），不算失败
+            ok = True
+            raise
+        finally:
+            if response is not None:
+                response.close()
+            self._record(start, ok)
+
+    def _send(self, url: str, data: str, timeout: float, stream: bool = False) -> requests.Response:
+        """发送请求，对连接错误和 429/5xx 做退避重试"""
+        while True:
+            _local.attempts += 1
+            attempt = _local.attempts
+            try:
+                response = self.session.post(
+                    url, data=data, timeout=timeout, stream=stream,
+                    headers={"Accept": "text/event-stream"} if stream else None
+                )
+            except RETRY_EXCEPTIONS:
+                if attempt > self.max_retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUS and attempt <= self.max_retries:
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+                time.sleep(self._delay(attempt, retry_after))
+                continue
+
+            response.raise_for_status()
+            return response
+
+    @property
+    def last_timing(self) -> Optional[CallTiming]:
+        """当前线程最近一次调用的耗时"""
+        return getattr(_local, "last_timing", None)
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+    def _delay(self, attempt: int, retry_after: str = None) -> float:
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after)
+
+    def _begin(self) -> float:
+        """重置当前线程的计时上下文"""
+        _local.connect_time = 0.0
+        _local.new_connections = 0
+        _local.attempts = 0
+        return time.perf_counter()
+
+    def _record(self, start: float, ok: bool):
+        """记录本次调用耗时"""
+        timing = CallTiming(
+            connect_ms=getattr(_local, "connect_time", 0.0) * 1000,
+            total_ms=(time.perf_counter() - start) * 1000,
+            attempts=_local.attempts,
+            new_connections=getattr(_local, "new_connections", 0),
+            ok=ok,
+        )
+        with self._stats_lock:
+            self.stats.record(timing)
+        _local.last_timing = timing
+
+
+class AsyncHTTPTransport:
+    """
+    异步 HTTP 传输 - 在工作线程中运行 HTTPTransport
+    与同步路径共用同一个 requests.Session：代理（HTTP(S)_PROXY/NO_PROXY）、重定向、
+    Content-Encoding、keep-alive 连接池与退避重试行为完全一致，且连接池不随事件循环丢弃
+    """
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        sync: HTTPTransport = None
+    ):
+        """
+        Args:
+            sync: 复用已有的同步传输（与同步客户端共享连接池和统计），为空时新建
+        """
+        self.sync = sync or HTTPTransport(
+            pool_size=pool_size, max_retries=max_retries, backoff_base=backoff_base, backoff_max=backoff_max
+        )
+        self.pool_size = self.sync.pool_size
+        self.max_retries = self.sync.max_retries
+        self.stats = self.sync.stats
+        # 每个在途请求占一个线程，线程数与连接池大小一致，连接都能归还复用
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.pool_size, thread_name_prefix="llm-http"
+        )
+        self._last_timing: contextvars.ContextVar = contextvars.ContextVar("last_timing", default=None)
+
+    async def post_json(self, url: str, payload: Dict[str, Any], timeout: float = 600) -> Dict[str, Any]:
+        """发送 JSON 请求并返回解析后的响应，重试耗尽后抛出异常"""
+        loop = asyncio.get_running_loop()
+        result, timing, error = await loop.run_in_executor(self._executor, self._post_json, url, payload, timeout)
+        self._last_timing.set(timing)
+        if error is not None:
+            raise error
+        return result
+
+    async def stream_events(self, url: str, payload: Dict[str, Any], timeout: float = 600) -> AsyncIterator[str]:
+        """
+        发送流式请求，逐条产出 SSE 的 data 内容
+        仅在收到响应前重试；服务端返回普通 JSON 时整体作为一条产出
+        同步生成器的计时上下文是线程本地的，一次流式调用始终在同一个专用线程中推进
+        """
+        loop = asyncio.get_running_loop()
+        worker = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-stream")
+        events = self.sync.stream_events(url, payload, timeout)
+        cancelled = False
+        try:
+            while True:
+                event = await loop.run_in_executor(worker, next, events, _END)
+                if event is _END:
+                    break
+                yield event
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if cancelled:
+                # 取消时不等待阻塞中的读取，由工作线程在读取返回后自行关闭
+                worker.submit(self._close_stream, events)
+            else:
+                self._last_timing.set(await loop.run_in_executor(worker, self._close_stream, events))
+            worker.shutdown(wait=False)
+
+    @property
+    def last_timing(self) -> Optional[CallTiming]:
+        """当前任务最近一次调用的耗时"""
+        return self._last_timing.get()
+
+    def close(self):
+        """关闭连接池和工作线程"""
+        self._executor.shutdown(wait=False)
+        self.sync.close()
+
+    def _post_json(self, url: str, payload: Dict[str, Any], timeout: float) -> tuple:
+        """在工作线程中发送，连同该线程记录的耗时一起返回"""
+        try:
+            return self.sync.post_json(url, payload, timeout), self.sync.last_timing, None
+        except Exception as e:
+            return None, self.sync.last_timing, e
+
+    def _close_stream(self, events: Iterator[str]) -> Optional[CallTiming]:
+        events.close()
+        return self.sync.last_timing
+
+
+_END = object()  # 流式迭代结束标记
@@ -0,0 +1,124 @@
+"""完成验证 - 先用确定性规则判断任务是否完成，规则无法判断时才询问 LLM"""
+import collections
+import dataclasses
+import os
+import re
+from typing import Awaitable, Callable, Dict, List, Optional
+from core.tools.executor import ToolCall, is_error_output
+
+# 任务描述中的文件名（含扩展名），如 index.html、task/zw.txt
+# 只识别 ASCII 文件名：识别不全时规则只会判为“无法判断”，交给 LLM，不会误判完成
+FILENAME_PATTERN = re.compile(r"[A-Za-z0-9_\-./]+\.[A-Za-z][A-Za-z0-9]{0,7}(?![A-Za-z0-9])")
+
+
+@dataclasses.dataclass
+class CompletionContext:
+    """一次完成检查的输入"""
+    task: str
+    tool_call: Optional[ToolCall]
+    result: str
+    action_history: List[str]
+    written_paths: List[str]  # 本任务中成功写入的文件
+
+
+# 规则返回 {"completed", "reason", "next_action"}，无法判断时返回 None
+Rule = Callable[[CompletionContext], Optional[Dict]]
+
+
+def tool_error_rule(ctx: CompletionContext) -> Optional[Dict]:
+    """工具报错时任务一定未完成"""
+    if ctx.tool_call and is_error_output(ctx.result):
+        return {"completed": False, "reason": f"工具执行失败: {ctx.result[:80]}", "next_action": "修正参数后重试"}
+    return None
+
+
+def named_files_rule(ctx: CompletionContext) -> Optional[Dict]:
+    """
+    任务点名的文件全部写入且非空 → 完成；刚写入的文件不存在或为空 → 未完成
+    任务没有点名文件，或点名的文件还没写全时无法判断
+    """
+    if not ctx.tool_call or ctx.tool_call.name != "write_file":
+        return None
+
+    path = ctx.tool_call.args.get("path", "")
+    if not _non_empty(path):
+        return {"completed": False, "reason": f"文件未写入或为空: {path}", "next_action": "重新写入文件内容"}
+
+    named = set(FILENAME_PATTERN.findall(ctx.task))
+    if not named:
+        return None
+    missing = [name for name in named if not _written(name, ctx.written_paths)]
+    if missing:
+        return None
+    return {"completed": True, "reason": f"任务要求的文件均已写入: {', '.join(sorted(named))}", "next_action": ""}
+
+
+DEFAULT_RULES: List[Rule] = [tool_error_rule, named_files_rule]
+
+
+class CompletionVerifier:
+    """
+    可插拔的完成验证器
+    依次执行规则，第一个给出结论的规则决定结果；全部无法判断时调用 llm_check，
+    未提供 llm_check 时判为未完成（由后续规划通过 task_complete 声明）。
+    stats 记录每条路径做出决定的次数。
+    """
+
+    def __init__(
+        self,
+        llm_check: Optional[Callable[[str, List[str], str], Awaitable[Dict]]] = None,
+        rules: List[Rule] = None
+    ):
+        self.llm_check = llm_check
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        self.stats: "collections.Counter[str]" = collections.Counter()
+
+    def register(self, rule: Rule):
+        """追加一条规则（在已有规则之后执行）"""
+        self.rules.append(rule)
+
+    def check_rules(self, ctx: CompletionContext) -> Optional[Dict]:
+        """只执行规则，全部无法判断时返回 None"""
+        for rule in self.rules:
+            verdict = rule(ctx)
+            if verdict is not None:
+                self.stats[rule.__name__] += 1
+                return verdict
+        return None
+
+    async def verify(self, ctx: CompletionContext) -> Dict:
+        """返回 {"completed": bool, "reason": str, "next_action": str}"""
+        verdict = self.check_rules(ctx)
+        if verdict is not None:
+            return verdict
+
+        if self.llm_check is None:
+            self.stats["deferred"] += 1
+            return {"completed": False, "reason": "规则无法判断，等待规划声明完成", "next_action": ""}
+
+        self.stats["llm"] += 1
+        return await self.llm_check(ctx.task, ctx.action_history, ctx.result)
+
+    def summary(self) -> str:
+        decided = ", ".join(f"{name} {count}" for name, count in self.stats.most_common())
+        return f"完成检查: {decided}"
+
+
+def _non_empty(path: str) -> bool:
+    return bool(path) and os.path.isfile(path) and os.path.getsize(path) > 0
+
+
+def _written(name: str, written_paths: List[str]) -> bool:
+    """
+    点名的文件是否已在本任务中写入
+    点名带目录时按路径后缀匹配（task/index.html 不匹配 ./index.html），只有文件名时才按文件名匹配
+    """
+    normalized = os.path.normpath(name)
+    bare = os.path.basename(normalized) == normalized
+    for path in written_paths:
+        candidate = os.path.normpath(path)
+        if candidate == normalized or candidate.endswith(os.sep + normalized) or \
+                (bare and os.path.basename(candidate) == normalized):
+            if _non_empty(path):
+                return True
+    return False
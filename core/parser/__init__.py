@@ -1,4 +1,10 @@
 """AML 解析模块"""
-from .aml import parse_aml, dump_aml
+from .aml import (
+    parse_aml, dump_aml, scan_sections, parse_entries, dump_entries,
+    parse_aml_lazy, LazyAgentState, locate_sections, parse_todo_line, dump_todo_line,
+)
 
-__all__ = ["parse_aml", "dump_aml"]
+__all__ = [
+    "parse_aml", "dump_aml", "scan_sections", "parse_entries", "dump_entries",
+    "parse_aml_lazy", "LazyAgentState", "locate_sections", "parse_todo_line", "dump_todo_line",
+]
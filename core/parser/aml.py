@@ -1,18 +1,65 @@
 """AML (Agent Markup Language) 解析器"""
+import functools
+import json
 import re
+from typing import Dict, List, Tuple
 from core.state.models import AgentState, TodoItem
 
+SECTION_TAGS = ("agent", "knowledge", "memory", "code", "todo")
+OPEN_TAG_PATTERN = re.compile(r"<(agent|knowledge|memory|code|todo)>")
+CLOSE_TAGS = {tag: f"</{tag}>" for tag in SECTION_TAGS}
+# 字节版本：标签都是 ASCII，可直接在未解码的 UTF-8 字节上定位段落
+OPEN_TAG_BYTES_PATTERN = re.compile(OPEN_TAG_PATTERN.pattern.encode())
+CLOSE_TAG_BYTES = {tag: close.encode() for tag, close in CLOSE_TAGS.items()}
+LEGACY_TODO_PATTERN = re.compile(r"\[(.*?)\] (.*)")
+# 待办行末尾的元数据注释（重试次数、失败原因、执行历史），Markdown 渲染时不可见
+# 元数据 JSON 中的尖括号已转义，不含 ">"，只匹配行末最后一个注释
+TODO_META_PATTERN = re.compile(r"\s*<!--\s*(\{[^>]*\})\s*-->\s*$")
+TODO_MARKERS = {"PENDING": "?", "DONE": "!", "FAILED": "✗", "IN_PROGRESS": "~"}
+# 列表条目的续行缩进：缩进的行接在上一条后面，多行条目（如失败分析）仍是一条
+CONTINUATION_INDENT = "  "
+# 记忆条目开头的时间戳，旧文件中未缩进的续行以此判断条目边界
+ENTRY_TIMESTAMP_PATTERN = re.compile(r"^\[\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}\]")
 
-def _parse_tag_content(text: str, tag: str) -> str:
-    """提取标签内容"""
-    pattern = f"<{tag}>(.*?)</{tag}>"
-    match = re.search(pattern, text, re.DOTALL)
-    return match.group(1).strip() if match else ""
 
+def scan_sections(text: str) -> Dict[str, str]:
+    """
+    单次扫描文档，返回 {标签: 去掉首尾空白的内容}
+    每个标签取第一次出现的完整段落；段落内容中出现的其他标签视为普通文本
+    """
+    return {
+        tag: text[start:end].strip()
+        for tag, (start, end) in _locate_sections(text, OPEN_TAG_PATTERN, CLOSE_TAGS).items()
+    }
 
-def _parse_agent(text: str) -> dict:
-    """解析 <agent> 标签"""
-    content = _parse_tag_content(text, "agent")
+
+def locate_sections(data: bytes) -> Dict[str, Tuple[int, int]]:
+    """在 UTF-8 字节上单次扫描，返回 {标签: (内容起点, 内容终点)}，不解码正文"""
+    return _locate_sections(data, OPEN_TAG_BYTES_PATTERN, CLOSE_TAG_BYTES)
+
+
+def _locate_sections(text, open_pattern, close_tags) -> Dict[str, Tuple[int, int]]:
+    sections: Dict[str, Tuple[int, int]] = {}
+    pos = 0
+    while len(sections) < len(SECTION_TAGS):
+        match = open_pattern.search(text, pos)
+        if not match:
+            break
+        tag = match.group(1)
+        if isinstance(tag, bytes):
+            tag = tag.decode()
+        end = text.find(close_tags[tag], match.end())
+        if end == -1:
+            # 没有闭合标签，当作普通文本继续向后找
+            pos = match.end()
+            continue
+        sections.setdefault(tag, (match.end(), end))
+        pos = end + len(close_tags[tag])
+    return sections
+
+
+def _parse_agent(content: str) -> dict:
+    """解析 <agent> 段落"""
     data = {}
     for line in content.split("\n"):
         if ":" in line:
@@ -21,16 +68,55 @@ def _parse_agent(text: str) -> dict:
     return data
 
 
-def _parse_list(text: str, tag: str) -> list:
-    """解析列表类标签"""
-    content = _parse_tag_content(text, tag)
-    lines = [l.strip() for l in content.split("\n") if l.strip()]
-    return lines
+def parse_entries(content: str, timestamped: bool = False) -> List[str]:
+    """
+    解析列表类段落，每个逻辑条目一项
+    - 不缩进的行开始新条目，缩进的行是上一条的续行（去掉一级缩进后拼接）
+    - timestamped: 上一条以时间戳开头时，不以 "[" 开头的行也视为续行，
+      兼容续行未缩进的旧文件（每条记忆都以 [时间戳]、[摘要] 等开头）
+    - 条目内部的空行保留，条目之间的空行忽略
+    """
+    raw_lines = content.split("\n")
+    if list(map(str.lstrip, raw_lines)) == raw_lines:
+        # 快速路径：没有缩进行时，只有时间戳条目后不以 "[" 开头的行才可能是续行
+        lines = [line for line in map(str.rstrip, raw_lines) if line]
+        if not timestamped or all(line[0] == "[" for line in lines):
+            return lines
+    entries: List[List[str]] = []
+    blank_lines = 0
+    for raw in raw_lines:
+        line = raw.rstrip()
+        if not line:
+            blank_lines += 1
+            continue
+        if entries and (
+            line[0] in " \t"
+            or (timestamped and not line.startswith("[") and ENTRY_TIMESTAMP_PATTERN.match(entries[-1][0]))
+        ):
+            if line.startswith(CONTINUATION_INDENT):
+                line = line[len(CONTINUATION_INDENT):]
+            elif line[0] in " \t":
+                line = line[1:]
+            entries[-1].extend([""] * blank_lines + [line])
+        else:
+            entries.append([line.strip()])
+        blank_lines = 0
+    return ["\n".join(lines) for lines in entries]
+
+
+def dump_entries(entries: List[str]) -> str:
+    """序列化列表类段落：条目的第二行起加续行缩进，条目内的空行保持为空"""
+    return "\n".join(
+        "\n".join(
+            line if i == 0 or not line.strip() else CONTINUATION_INDENT + line
+            for i, line in enumerate(entry.strip().split("\n"))
+        )
+        for entry in entries
+    )
 
 
-def _parse_todo(text: str) -> list:
-    """解析 <todo> 标签"""
-    content = _parse_tag_content(text, "todo")
+def _parse_todo(content: str) -> List[TodoItem]:
+    """解析 <todo> 段落"""
     todos = []
     
     for line in content.split("\n"):
@@ -38,45 +124,163 @@ def _parse_todo(text: str) -> list:
         if not line:
             continue
 
-        status = "PENDING"
-        task_content = line
-
-        # Markdown Checkboxes: - [ ] / - [x]
-        if line.startswith("- [ ]") or line.startswith("- [x]"):
-            is_done = "[x]" in line.lower()
-            status = "DONE" if is_done else "PENDING"
-            task_content = line.split("]", 1)[1].strip()
-
-        # 简化语法: ? (待处理) / ! (已完成)
-        elif line.startswith("? ") or line.startswith("？ "):
-            status = "PENDING"
-            task_content = line[1:].strip()
-        elif line.startswith("! ") or line.startswith("！ "):
-            status = "DONE"
-            task_content = line[1:].strip()
-
-        # 旧版语法: [PENDING] / [DONE]
-        elif line.startswith("["):
-            match = re.match(r"\[(.*?)\] (.*)", line)
-            if match:
-                status, task_content = match.groups()
-
-        todos.append(TodoItem(content=task_content, status=status))
+        status, task_content, meta = parse_todo_line(line)
+        todos.append(TodoItem(
+            content=task_content,
+            status=status,
+            retry_count=int(meta.get("retry_count", 0)),
+            max_retries=int(meta.get("max_retries", 3)),
+            action_history=[str(a) for a in meta.get("action_history", [])],
+            failure_reason=str(meta.get("failure_reason", "")),
+        ))
 
     return todos
 
 
+def _count_pending(content: str) -> int:
+    """只统计待处理任务数，不构造 TodoItem"""
+    return sum(
+        1 for line in map(str.strip, content.split("\n"))
+        if line and parse_todo_line(line)[0] == "PENDING"
+    )
+
+
+def parse_todo_line(line: str) -> Tuple[str, str, dict]:
+    """解析一行待办（已去掉首尾空白），返回 (状态, 内容, 元数据)"""
+    status = "PENDING"
+    meta = {}
+    match = TODO_META_PATTERN.search(line) if "<!--" in line else None
+    if match:
+        try:
+            meta = json.loads(match.group(1))
+            line = line[:match.start()]
+        except ValueError:
+            pass
+    task_content = line
+
+    # Markdown Checkboxes: - [ ] / - [x]
+    if line.startswith("- [ ]") or line.startswith("- [x]"):
+        is_done = "[x]" in line.lower()
+        status = "DONE" if is_done else "PENDING"
+        task_content = line.split("]", 1)[1].strip()
+
+    # 简化语法: ? (待处理) / ! (已完成)
+    elif line.startswith("? ") or line.startswith("？ "):
+        status = "PENDING"
+        task_content = line[1:].strip()
+    elif line.startswith("! ") or line.startswith("！ "):
+        status = "DONE"
+        task_content = line[1:].strip()
+    elif line.startswith("✗ "):
+        status = "FAILED"
+        task_content = line[1:].strip()
+    elif line.startswith("~ "):
+        status = "IN_PROGRESS"
+        task_content = line[1:].strip()
+
+    # 旧版语法: [PENDING] / [DONE]
+    elif line.startswith("["):
+        match = LEGACY_TODO_PATTERN.match(line)
+        if match:
+            status, task_content = match.groups()
+
+    return status, task_content, meta
+
+
+def _dump_todo(item: TodoItem) -> str:
+    """序列化一个待办: 状态标记 + 内容，非默认字段写入行末注释"""
+    meta = {}
+    if item.retry_count:
+        meta["retry_count"] = item.retry_count
+    if item.max_retries != 3:
+        meta["max_retries"] = item.max_retries
+    if item.failure_reason:
+        meta["failure_reason"] = item.failure_reason
+    if item.action_history:
+        meta["action_history"] = item.action_history
+    return dump_todo_line(item.status, item.content, meta)
+
+
+def dump_todo_line(status: str, content: str, meta: dict) -> str:
+    """
+    一行待办: 状态标记 + 内容，元数据非空时写入行末注释
+    内容本身以注释结尾时总是写出元数据注释（可能是 <!-- {} -->），解析时不会把内容的结尾当作元数据
+    """
+    line = f"{TODO_MARKERS.get(status, '?')} {content}"
+    if meta or TODO_META_PATTERN.search(content):
+        # 转义尖括号，注释内容不会提前结束注释或段落
+        encoded = json.dumps(meta, ensure_ascii=False).replace("<", "\\u003c").replace(">", "\\u003e")
+        line += f" <!-- {encoded} -->"
+    return line
+
+
 def parse_aml(text: str) -> AgentState:
-    """解析 AML 文本为 AgentState"""
+    """解析 AML 文本为 AgentState（整个文档只扫描一遍）"""
+    sections = scan_sections(text)
     return AgentState(
-        agent=_parse_agent(text),
-        knowledge=_parse_list(text, "knowledge"),
-        memory=_parse_list(text, "memory"),
-        code=_parse_list(text, "code"),
-        todo=_parse_todo(text),
+        agent=_parse_agent(sections.get("agent", "")),
+        knowledge=parse_entries(sections.get("knowledge", "")),
+        memory=parse_entries(sections.get("memory", ""), timestamped=True),
+        code=parse_entries(sections.get("code", "")),
+        todo=_parse_todo(sections.get("todo", "")),
     )
 
 
+class LazyAgentState:
+    """
+    AgentState 的只读惰性视图
+    构造时只在字节上定位各段落，段落在首次访问时才解码、解析；
+    只需要名称和待办数的调用方（任务文件列表）不会解析知识与记忆
+    """
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._sections = locate_sections(data)
+
+    def _content(self, tag: str) -> str:
+        span = self._sections.get(tag)
+        if span is None:
+            return ""
+        text = self._data[span[0]:span[1]].decode("utf-8")
+        return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+    @functools.cached_property
+    def agent(self) -> Dict[str, str]:
+        return _parse_agent(self._content("agent"))
+
+    @functools.cached_property
+    def knowledge(self) -> List[str]:
+        return parse_entries(self._content("knowledge"))
+
+    @functools.cached_property
+    def memory(self) -> List[str]:
+        return parse_entries(self._content("memory"), timestamped=True)
+
+    @functools.cached_property
+    def code(self) -> List[str]:
+        return parse_entries(self._content("code"))
+
+    @functools.cached_property
+    def todo(self) -> List[TodoItem]:
+        return _parse_todo(self._content("todo"))
+
+    @property
+    def pending_count(self) -> int:
+        """待处理任务数；todo 尚未解析时只识别每行的状态"""
+        if "todo" in self.__dict__:
+            return sum(1 for item in self.todo if item.status == "PENDING")
+        return _count_pending(self._content("todo"))
+
+    def to_state(self) -> AgentState:
+        """解析全部段落，得到完整的 AgentState"""
+        return AgentState(self.agent, self.knowledge, self.memory, self.code, self.todo)
+
+
+def parse_aml_lazy(data: bytes) -> LazyAgentState:
+    """解析 AML 文件内容（UTF-8 字节）为惰性视图"""
+    return LazyAgentState(data)
+
+
 def dump_aml(state: AgentState) -> str:
     """将 AgentState 序列化为 AML 文本"""
     md = ""
@@ -87,21 +291,20 @@ def dump_aml(state: AgentState) -> str:
     md += "</agent>\n\n"
 
     md += "<knowledge>\n"
-    md += "\n".join(state.knowledge)
+    md += dump_entries(state.knowledge)
     md += "\n</knowledge>\n\n"
 
     md += "<memory>\n"
-    md += "\n".join(state.memory)
+    md += dump_entries(state.memory)
     md += "\n</memory>\n\n"
 
     md += "<code>\n"
-    md += "\n".join(state.code)
+    md += dump_entries(state.code)
     md += "\n</code>\n\n"
 
     md += "<todo>\n"
     for item in state.todo:
-        prefix = "!" if item.status == "DONE" else "?"
-        md += f"{prefix} {item.content}\n"
+        md += _dump_todo(item) + "\n"
     md += "</todo>\n"
 
     return md
@@ -1,4 +1,5 @@
 """调度模块"""
 from .background import BackgroundScheduler
+from .postprocess import PostProcessQueue, PostProcessJournal
 
-__all__ = ["BackgroundScheduler"]
+__all__ = ["BackgroundScheduler", "PostProcessQueue", "PostProcessJournal"]
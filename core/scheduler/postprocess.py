@@ -0,0 +1,113 @@
+"""后处理队列 - 把摘要、蒸馏、失败分析移出任务执行的关键路径"""
+import asyncio
+import json
+import os
+from typing import Awaitable, Callable, Dict, Optional
+
+Job = Callable[[], Awaitable[None]]
+
+# 配置常量
+JOURNAL_SUFFIX = ".pending.json"  # 后处理记录与 DNA 文件同目录，文件名追加此后缀
+
+
+class PostProcessQueue:
+    """
+    单 worker 的异步后处理队列
+    - 任务按提交顺序逐个执行，后提交的任务总能看到先提交任务的结果
+    - worker 在首次提交时于当前事件循环中启动，drain 后退出，
+      因此可跨多次 asyncio.run 使用
+    - 单个任务出错只打印日志，不影响后续任务
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.pending = 0  # 尚未完成的任务数（含正在执行的）
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, job: Job, label: str = ""):
+        """提交一个后处理任务，立即返回"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self.pending = 0  # 上一个事件循环中未执行的任务已随循环丢弃
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        self._queue.put_nowait((job, label))
+        self.pending += 1
+
+    async def drain(self):
+        """等待已提交的任务全部完成，然后停止 worker"""
+        if self._worker is None:
+            return
+        if not self._worker.done():
+            await self._queue.join()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._queue = None
+        self._worker = None
+
+    async def _run(self):
+        while True:
+            job, label = await self._queue.get()
+            try:
+                await job()
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"[PostProcess] {label or '后处理'}失败: {e}")
+            finally:
+                self.pending -= 1
+                self._queue.task_done()
+
+
+class PostProcessJournal:
+    """
+    尚未完成的后处理任务的持久化记录（每个 Agent 一个）
+    队列只在内存中，进程中断后据此重新提交任务；记录以占位记忆为键，任务完成后删除，
+    没有记录时不保留文件
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._records: Dict[str, Dict] = self._load()
+
+    @classmethod
+    def for_dna(cls, dna_file: str) -> "PostProcessJournal":
+        return cls(dna_file + JOURNAL_SUFFIX)
+
+    def records(self) -> Dict[str, Dict]:
+        return dict(self._records)
+
+    def add(self, key: str, record: Dict):
+        self._records[key] = record
+        self._save()
+
+    def remove(self, key: str):
+        if self._records.pop(key, None) is not None:
+            self._save()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[PostProcess] 后处理记录损坏，已忽略: {e}")
+            return {}
+
+    def _save(self):
+        try:
+            if not self._records:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._records, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[PostProcess] 后处理记录保存失败: {e}")
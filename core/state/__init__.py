@@ -1,5 +1,7 @@
 """状态管理模块"""
 from .models import AgentState, TodoItem
 from .store import StateStore
+from .archive import MemoryArchive
+from .snapshot import load_state
 
-__all__ = ["AgentState", "TodoItem", "StateStore"]
+__all__ = ["AgentState", "TodoItem", "StateStore", "MemoryArchive", "load_state"]
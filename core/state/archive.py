@@ -0,0 +1,189 @@
+"""冷记忆归档 - 被蒸馏淘汰的记忆追加写入归档文件，按时间与关键词建立块索引"""
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional
+from core.text import tokenize
+
+# 配置常量
+ARCHIVE_SUFFIX = ".archive"  # 归档文件与 DNA 文件同目录，文件名追加此后缀
+INDEX_SUFFIX = ".idx"  # 索引文件名为归档文件名追加此后缀
+COMPRESS = os.getenv("AGI_ARCHIVE_COMPRESS", "0") == "1"  # 每个块用 zlib 压缩
+RECALL_LIMIT = 10  # recall 默认返回的条目数
+
+TIMESTAMP_PATTERN = re.compile(r"^\[(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})\]")
+
+
+class MemoryArchive:
+    """
+    每个 Agent 一个的只追加记忆归档
+    文件格式: 每次 append 写一个块 = 一行块头 {"n", "len", "z"} + 块内容（JSON 行，可压缩）
+    索引（单独的小文件）记录每个块的偏移、长度、时间范围，以及关键词 → 块号的倒排表；
+    recall 只读取命中的块，不加载整个归档。索引缺失或与归档大小不符时从归档重建。
+    """
+
+    def __init__(self, path: str, compress: bool = COMPRESS):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._index: Optional[Dict] = None
+
+    @classmethod
+    def for_dna(cls, dna_file: str) -> "MemoryArchive":
+        return cls(dna_file + ARCHIVE_SUFFIX)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(block["n"] for block in self._load_index()["blocks"])
+
+    def append(self, entries: List[str]):
+        """把一批淘汰的记忆追加为一个块"""
+        if not entries:
+            return
+        payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries).encode("utf-8")
+        if self.compress:
+            payload = zlib.compress(payload)
+        header = json.dumps({"n": len(entries), "len": len(payload), "z": int(self.compress)}).encode() + b"\n"
+
+        with self._lock:
+            index = self._load_index()
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(header + payload)
+            self._add_block(index, offset + len(header), len(payload), bool(self.compress), entries)
+            index["size"] = offset + len(header) + len(payload)
+            self._save_index(index)
+
+    def recall(self, query: str = "", since: str = "", until: str = "", limit: int = RECALL_LIMIT) -> List[str]:
+        """
+        按关键词与时间范围检索旧记忆，最相关（其次最新）的在前
+
+        Args:
+            query: 关键词，为空时按时间返回最新的条目
+            since / until: 时间范围（与记忆时间戳同格式的前缀即可，如 "2025-12-10"）
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            index = self._load_index()
+            if terms:
+                hits = set()
+                for term in terms:
+                    hits.update(index["keywords"].get(term, ()))
+                block_ids = sorted(hits)
+            else:
+                block_ids = list(range(len(index["blocks"])))
+            block_ids = [
+                i for i in block_ids
+                if self._in_range(index["blocks"][i], since, until)
+            ]
+            scored = []
+            for i in block_ids:
+                for position, entry in enumerate(self._read_block(index["blocks"][i])):
+                    stamp = _timestamp(entry)
+                    if (since and stamp and stamp < since) or (until and stamp and stamp[:len(until)] > until):
+                        continue
+                    score = len(terms & set(tokenize(entry))) if terms else 0
+                    if terms and not score:
+                        continue
+                    scored.append((score, i, position, entry))
+        scored.sort(key=lambda item: (-item[0], -item[1], -item[2]))
+        return [entry for *_, entry in scored[:limit]]
+
+    def recall_text(self, query: str = "", since: str = "", until: str = "", limit: int = RECALL_LIMIT) -> str:
+        """recall 工具的处理函数"""
+        entries = self.recall(query, since, until, int(limit))
+        if not entries:
+            return "归档中没有匹配的记忆"
+        return "\n".join(f"- {e}" for e in entries)
+
+    def _in_range(self, block: Dict, since: str, until: str) -> bool:
+        if since and block["last"] and block["last"] < since:
+            return False
+        if until and block["first"] and block["first"][:len(until)] > until:
+            return False
+        return True
+
+    def _read_block(self, block: Dict) -> List[str]:
+        with open(self.path, "rb") as f:
+            f.seek(block["offset"])
+            payload = f.read(block["len"])
+        if block["z"]:
+            payload = zlib.decompress(payload)
+        return [json.loads(line) for line in payload.decode("utf-8").splitlines() if line]
+
+    def _add_block(self, index: Dict, offset: int, length: int, compressed: bool, entries: List[str]):
+        stamps = sorted(s for s in map(_timestamp, entries) if s)
+        block_id = len(index["blocks"])
+        index["blocks"].append({
+            "offset": offset,
+            "len": length,
+            "z": int(compressed),
+            "n": len(entries),
+            "first": stamps[0] if stamps else "",
+            "last": stamps[-1] if stamps else "",
+        })
+        for term in {t for entry in entries for t in tokenize(entry)}:
+            index["keywords"].setdefault(term, []).append(block_id)
+
+    def _load_index(self) -> Dict:
+        if self._index is not None:
+            return self._index
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        index = None
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[Archive] 索引损坏，重新构建: {e}")
+        if not index or index.get("size") != size:
+            index = self._rebuild(size)
+            if index["size"] < size:
+                # 上次写入中断留下的不完整块，截掉后才能继续追加
+                print(f"[Archive] 丢弃归档尾部 {size - index['size']} 字节的不完整内容")
+                with open(self.path, "r+b") as f:
+                    f.truncate(index["size"])
+            if size:
+                self._save_index(index)
+        self._index = index
+        return index
+
+    def _rebuild(self, size: int) -> Dict:
+        """顺序扫描块头重建索引，index["size"] 为最后一个完整块的结尾"""
+        index = {"size": 0, "blocks": [], "keywords": {}}
+        if not size:
+            return index
+        with open(self.path, "rb") as f:
+            while True:
+                header_line = f.readline()
+                if not header_line:
+                    break
+                try:
+                    header = json.loads(header_line)
+                except ValueError:
+                    break
+                offset = f.tell()
+                payload = f.read(header["len"])
+                if len(payload) < header["len"]:
+                    break
+                block = {"offset": offset, "len": header["len"], "z": header["z"]}
+                self._add_block(index, offset, header["len"], bool(header["z"]), self._read_block(block))
+                index["size"] = offset + header["len"]
+        return index
+
+    def _save_index(self, index: Dict):
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"[Archive] 索引保存失败: {e}")
+
+
+def _timestamp(entry: str) -> str:
+    match = TIMESTAMP_PATTERN.match(entry)
+    return match.group(1) if match else ""
@@ -0,0 +1,120 @@
+"""状态快照 - DNA 文件旁的二进制快照，文件未改动时跳过文本解析"""
+import marshal
+import os
+import sys
+import zlib
+from typing import Optional, Tuple
+from .models import AgentState, TodoItem
+from core.parser import parse_aml
+
+# 配置常量
+SNAPSHOT_SUFFIX = ".snap"  # 快照文件与 DNA 文件同目录，文件名追加此后缀
+# 默认关闭：解析已接近读文件的内存带宽，快照只省下约 1.1-1.5x，未必值得多占一份磁盘
+SNAPSHOT_ENABLED = os.getenv("AGI_STATE_SNAPSHOT", "0") == "1"
+# marshal 格式随 Python 版本变化，版本不同的快照视为过期
+SNAPSHOT_VERSION = (2, sys.version_info[:2])
+# 列表段落拼成一整段 UTF-16 文本保存：解码一整段远快于逐条解码上万个 UTF-8 短字符串
+ENTRY_SEPARATOR = "\x00"
+ENTRY_ENCODING = "utf-16-le"
+
+
+def snapshot_path(path: str) -> str:
+    return path + SNAPSHOT_SUFFIX
+
+
+def file_key(path: str, data: bytes) -> Tuple[int, int, int]:
+    """快照的有效性键 (mtime_ns, size, CRC32)，CRC32 只用于发现大小与 mtime 都相同的改写"""
+    return os.stat(path).st_mtime_ns, len(data), zlib.crc32(data)
+
+
+def decode(data: bytes) -> str:
+    """与文本模式读取一致: UTF-8 解码并统一换行符"""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def load_state(path: str, snapshot: Optional[bool] = None) -> AgentState:
+    """
+    读取 DNA 文件的状态
+    启用快照时，快照的 (mtime_ns, size, CRC32) 与文件一致则直接使用快照，否则解析文本并刷新快照
+
+    Args:
+        snapshot: 是否使用快照，为空时按 AGI_STATE_SNAPSHOT
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not (SNAPSHOT_ENABLED if snapshot is None else snapshot):
+        return parse_aml(decode(data))
+    key = file_key(path, data)
+    state = read_snapshot(path, key)
+    if state is None:
+        state = parse_aml(decode(data))
+        write_snapshot(path, state, key)
+    return state
+
+
+def read_snapshot(path: str, key: Tuple[int, int, int]) -> Optional[AgentState]:
+    """快照有效时返回其中的状态，缺失、过期或损坏时返回 None"""
+    try:
+        with open(snapshot_path(path), "rb") as f:
+            # 整体读入再 loads：marshal.load 直接读文件对象会逐个对象小块读取，慢一个数量级
+            version, snapshot_key, payload = marshal.loads(f.read())
+        if version != SNAPSHOT_VERSION or tuple(snapshot_key) != key:
+            return None
+        return _unpack(payload)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError) as e:
+        print(f"[Snapshot] 快照损坏，改为解析原文件: {e}")
+        return None
+
+
+def write_snapshot(path: str, state: AgentState, key: Tuple[int, int, int]):
+    """原子写入快照（先写临时文件再替换），失败只打印日志"""
+    tmp_path = f"{snapshot_path(path)}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            marshal.dump((SNAPSHOT_VERSION, key, _pack(state)), f)
+        os.replace(tmp_path, snapshot_path(path))
+    except OSError as e:
+        print(f"[Snapshot] 快照保存失败: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _pack_entries(entries: list):
+    text = ENTRY_SEPARATOR.join(entries)
+    if not entries or text.count(ENTRY_SEPARATOR) != len(entries) - 1:
+        return list(entries)  # 条目本身含分隔符时按列表保存
+    return text.encode(ENTRY_ENCODING)
+
+
+def _unpack_entries(packed) -> list:
+    if isinstance(packed, bytes):
+        return packed.decode(ENTRY_ENCODING).split(ENTRY_SEPARATOR)
+    return list(packed)
+
+
+def _pack(state: AgentState) -> tuple:
+    return (
+        state.agent,
+        _pack_entries(state.knowledge),
+        _pack_entries(state.memory),
+        _pack_entries(state.code),
+        [
+            (t.content, t.status, t.retry_count, t.max_retries, t.action_history, t.failure_reason)
+            for t in state.todo
+        ],
+    )
+
+
+def _unpack(payload: tuple) -> AgentState:
+    agent, knowledge, memory, code, todo = payload
+    return AgentState(
+        agent=agent,
+        knowledge=_unpack_entries(knowledge),
+        memory=_unpack_entries(memory),
+        code=_unpack_entries(code),
+        todo=[TodoItem(c, s, r, m, list(h), f) for c, s, r, m, h, f in todo],
+    )
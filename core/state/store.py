@@ -1,23 +1,48 @@
 """状态持久化"""
+import collections
+import dataclasses
+import os
 import threading
+from typing import Optional, Tuple
 from .models import AgentState
-from core.parser import parse_aml, dump_aml
+from .snapshot import load_state
+from core.parser import dump_aml
 
 
 class StateStore:
-    """状态存储管理器"""
+    """
+    状态存储管理器
+    .md 文件是唯一的事实来源；旁边的二进制快照在文件未改动时省去文本解析，
+    快照只在 load 解析文件时写入，save 不写快照
+    进程内缓存最近一次解析的状态及文件的 (mtime_ns, size, inode)，文件未变时 load 不再读取解析
+    （save 后缓存失效，下一次 load 重新读取），
+    每次返回缓存的独立副本（列表浅拷贝），调用方修改返回值不影响缓存
+    """
     
     def __init__(self, filepath: str):
         self.filepath = filepath
         self._lock = threading.Lock()
         self._state: AgentState = None
+        self._cached: Optional[AgentState] = None
+        self._cached_key: Optional[Tuple[int, int, int]] = None
+        self.stats: "collections.Counter[str]" = collections.Counter()  # hits / misses
     
-    def load(self) -> AgentState:
-        """从文件加载状态"""
+    def load(self, force: bool = False) -> AgentState:
+        """
+        从文件加载状态
+        
+        Args:
+            force: 忽略缓存，重新读取文件
+        """
         with self._lock:
-            with open(self.filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-            self._state = parse_aml(content)
+            # 先取文件状态再读取：读取期间文件被改写时，下次 load 的键不同会重新读取
+            key = _stat_key(self.filepath)
+            if force or self._cached is None or key != self._cached_key:
+                self.stats["misses"] += 1
+                self._cached, self._cached_key = load_state(self.filepath), key
+            else:
+                self.stats["hits"] += 1
+            self._state = _copy_state(self._cached)
             return self._state
     
     def save(self, state: AgentState = None):
@@ -26,10 +51,29 @@ class StateStore:
             if state:
                 self._state = state
             content = dump_aml(self._state)
-            with open(self.filepath, "w", encoding="utf-8") as f:
-                f.write(content)
+            data = content.encode("utf-8")
+            with open(self.filepath, "wb") as f:
+                f.write(data)
+            # 传入的状态未必是规范形式（条目首尾空白等），不重新解析，只让缓存失效，下次 load 时再读
+            self._cached, self._cached_key = None, None
         print(f"[Store] State saved to {self.filepath}")
     
     @property
     def state(self) -> AgentState:
         return self._state
+
+
+def _stat_key(path: str) -> Tuple[int, int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _copy_state(state: AgentState) -> AgentState:
+    """条目都是不可变字符串，复制列表与待办即可得到互不影响的状态"""
+    return AgentState(
+        agent=dict(state.agent),
+        knowledge=list(state.knowledge),
+        memory=list(state.memory),
+        code=list(state.code),
+        todo=[dataclasses.replace(t, action_history=list(t.action_history)) for t in state.todo],
+    )
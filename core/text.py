@@ -0,0 +1,20 @@
+"""文本切词 - 检索索引与记忆归档共用的中英文切词"""
+import re
+from typing import List
+
+# 英文/数字按词切分，中文按字二元组切分
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+|[\u3400-\u4dbf\u4e00-\u9fff]+")
+TIMESTAMP_PATTERN = re.compile(r"^\[[\d\-: ]+\]\s*")
+
+
+def tokenize(text: str) -> List[str]:
+    """切词: ASCII 词小写，连续汉字取相邻两字（单字时取单字），忽略条目开头的时间戳"""
+    tokens = []
+    for run in TOKEN_PATTERN.findall(TIMESTAMP_PATTERN.sub("", text).lower()):
+        if run.isascii():
+            tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
@@ -1,6 +1,6 @@
 """工具模块"""
 from .registry import ToolRegistry
-from .executor import ToolExecutor
+from .executor import ToolExecutor, is_error_output
 from .builtins import register_builtins
 
-__all__ = ["ToolRegistry", "ToolExecutor", "register_builtins"]
+__all__ = ["ToolRegistry", "ToolExecutor", "register_builtins", "is_error_output"]
@@ -1,14 +1,26 @@
 """工具执行器"""
+import concurrent.futures
 import dataclasses
-from typing import Any
+from typing import Any, List
 from .registry import ToolRegistry, default_registry
 
+# 配置常量
+MAX_PARALLEL_TOOLS = 4  # 只读工具并发执行的线程数
+# 工具以这些前缀开头的输出表示执行失败；只看开头，文件内容等正文中出现 "Error" 不算失败
+ERROR_PREFIXES = ("Error", "Unknown tool:", "错误:")
+
+
+def is_error_output(output: Any) -> bool:
+    """工具输出是否为失败状态"""
+    return str(output).lstrip().startswith(ERROR_PREFIXES)
+
 
 @dataclasses.dataclass
 class ToolCall:
     """工具调用"""
     name: str
     args: dict
+    id: str = dataclasses.field(default="", compare=False)  # 模型返回的调用 ID，多轮对话中回填 tool 消息
 
 
 @dataclasses.dataclass
@@ -24,6 +36,7 @@ class ToolExecutor:
     
     def __init__(self, registry: ToolRegistry = None):
         self.registry = registry or default_registry
+        self._pool: concurrent.futures.ThreadPoolExecutor = None
     
     def execute(self, call: ToolCall) -> ToolResult:
         """执行工具调用"""
@@ -38,7 +51,7 @@ class ToolExecutor:
         try:
             output = tool.handler(**call.args)
             return ToolResult(
-                success="Error" not in str(output),
+                success=not is_error_output(output),
                 output=output,
                 modifies_state=tool.modifies_state
             )
@@ -47,3 +60,40 @@ class ToolExecutor:
                 success=False,
                 output=f"Error executing tool: {e}"
             )
+
+    def execute_batch(self, calls: List[ToolCall]) -> List[ToolResult]:
+        """
+        批量执行一次规划返回的多个工具调用，结果与 calls 一一对应
+        相邻的只读调用（modifies_state=False）在线程池中并发执行，
+        修改状态的调用按原顺序逐个执行，保证其后的读取能看到修改
+        """
+        results: List[ToolResult] = [None] * len(calls)
+        readers: List[int] = []
+
+        for i, call in enumerate(calls):
+            if self._read_only(call):
+                readers.append(i)
+                continue
+            self._run_parallel(calls, readers, results)
+            readers = []
+            results[i] = self.execute(call)
+        self._run_parallel(calls, readers, results)
+        return results
+
+    def _read_only(self, call: ToolCall) -> bool:
+        tool = self.registry.get(call.name)
+        return bool(tool) and not tool.modifies_state
+
+    def _run_parallel(self, calls: List[ToolCall], indexes: List[int], results: List[ToolResult]):
+        if not indexes:
+            return
+        if len(indexes) == 1:
+            results[indexes[0]] = self.execute(calls[indexes[0]])
+            return
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=MAX_PARALLEL_TOOLS,
+                thread_name_prefix="tool"
+            )
+        for i, result in zip(indexes, self._pool.map(self.execute, (calls[i] for i in indexes))):
+            results[i] = result
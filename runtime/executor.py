@@ -1,5 +1,6 @@
 from .llm import ToolCall
 import os
+from core.mind.dedup import KnowledgeDeduper
 
 
 def read_file(path):
@@ -51,10 +52,8 @@ def synthesize(file_a, file_b, output_file):
     # Create a new state with Agent from A and merged content
     synthesized_state = state_a
     
-    # Merge knowledge (unique items from both)
-    for k in state_b.knowledge:
-        if k not in synthesized_state.knowledge:
-            synthesized_state.knowledge.append(k)
+    # Merge knowledge (unique items from both, near-duplicates included)
+    KnowledgeDeduper().merge_into(synthesized_state.knowledge, state_b.knowledge)
     
     # Merge memory (all items from both)
     synthesized_state.memory.extend(state_b.memory)
@@ -1,7 +1,7 @@
 import dataclasses
 from typing import List, Optional, Dict, Any
-import requests
 import json
+from core.mind.transport import HTTPTransport
 
 
 @dataclasses.dataclass
@@ -24,6 +24,7 @@ class SimpleLLM:
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.api_url = f"{self.base_url}/v1/chat/completions"
+        self.transport = HTTPTransport()
 
     def _get_tool_schemas(self):
         return [
@@ -220,14 +221,7 @@ class SimpleLLM:
 
         try:
             print("[LLM] 正在向本地模型发送请求...")
-            response = requests.post(
-                self.api_url,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=600,
-            )
-            response.raise_for_status()
-            result = response.json()
+            result = self.transport.post_json(self.api_url, payload, timeout=600)
 
             choice = result["choices"][0]
             message = choice["message"]
@@ -305,14 +299,8 @@ class SimpleLLM:
         try:
             # Send request (Using same fallback logic if needed or just try/except)
             # For brevity assuming main generator logic or simple request
-            response = requests.post(
-                self.api_url,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=600,
-            )
-            response.raise_for_status()
-            content = response.json()["choices"][0]["message"]["content"]
+            result = self.transport.post_json(self.api_url, payload, timeout=600)
+            content = result["choices"][0]["message"]["content"]
 
             # Simple parsing: split by newlines
             insights = [
@@ -364,14 +352,8 @@ class SimpleLLM:
         }
 
         try:
-            response = requests.post(
-                self.api_url,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=30,
-            )
-            response.raise_for_status()
-            summary = response.json()["choices"][0]["message"]["content"].strip()
+            result = self.transport.post_json(self.api_url, payload, timeout=30)
+            summary = result["choices"][0]["message"]["content"].strip()
             return summary[:100]  # 强制限制100字
         except Exception as e:
             # 如果LLM失败,返回简化版本
@@ -1,15 +1,12 @@
-import re
 from .state import AgentState, TodoItem
+from core.parser.aml import scan_sections, parse_entries, dump_entries, parse_todo_line, dump_todo_line
 
 
 def parse_tag_content(text: str, tag: str) -> str:
-    pattern = f"<{tag}>(.*?)</{tag}>"
-    match = re.search(pattern, text, re.DOTALL)
-    return match.group(1).strip() if match else ""
+    return scan_sections(text).get(tag, "")
 
 
-def parse_agent(text: str) -> dict:
-    content = parse_tag_content(text, "agent")
+def parse_agent(content: str) -> dict:
     data = {}
     for line in content.split("\n"):
         if ":" in line:
@@ -18,65 +15,33 @@ def parse_agent(text: str) -> dict:
     return data
 
 
-def parse_list(text: str, tag: str) -> list:
-    content = parse_tag_content(text, tag)
-    # Simple line-based/dash-based definition for now
-    lines = [l.strip() for l in content.split("\n") if l.strip()]
-    return lines
+def parse_list(content: str, timestamped: bool = False) -> list:
+    # One entry per logical item; indented lines continue the previous entry
+    return parse_entries(content, timestamped)
 
 
-def parse_todo(text: str) -> list:
-    content = parse_tag_content(text, "todo")
+def parse_todo(content: str) -> list:
+    # Same line syntax as the core parser: ? ! ✗ ~ markers, checkboxes, legacy [STATUS],
+    # and the trailing <!-- {json} --> metadata comment
     todos = []
     for line in content.split("\n"):
         line = line.strip()
         if not line:
             continue
-
-        status = "PENDING"
-        task_content = line
-
-        # 1. Standard Markdown Checkboxes
-        if line.startswith("- [ ]") or line.startswith("- [x]"):
-            is_done = "[x]" in line.lower()
-            status = "DONE" if is_done else "PENDING"
-            task_content = line.split("]", 1)[1].strip()
-
-        # 2. Simplified Human Syntax (?, !, ？, ！)
-        # Starts with ? or ？ -> PENDING
-        elif line.startswith("? ") or line.startswith("？ "):
-            status = "PENDING"
-            task_content = line[1:].strip()
-
-        # Starts with ! or ！ -> DONE
-        elif line.startswith("! ") or line.startswith("！ "):
-            status = "DONE"
-            task_content = line[1:].strip()
-
-        # 3. Legacy Bracket Syntax [PENDING]
-        elif line.startswith("["):
-            match = re.match(r"\[(.*?)\] (.*)", line)
-            if match:
-                status, task_content = match.groups()
-                # Compat: Map old statuses
-                if status == "PENDING":
-                    status = "PENDING"
-                if status == "DONE":
-                    status = "DONE"
-
-        # 4. Fallback (Plain text is pending)
-        todos.append(TodoItem(content=task_content, status=status))
-
+        status, task_content, meta = parse_todo_line(line)
+        todos.append(TodoItem(content=task_content, status=status, meta=meta))
     return todos
 
 
 def parse_md(text: str) -> AgentState:
+    # One pass over the document finds all sections
+    sections = scan_sections(text)
     return AgentState(
-        agent=parse_agent(text),
-        knowledge=parse_list(text, "knowledge"),
-        memory=parse_list(text, "memory"),
-        code=parse_list(text, "code"),
-        todo=parse_todo(text),
+        agent=parse_agent(sections.get("agent", "")),
+        knowledge=parse_list(sections.get("knowledge", "")),
+        memory=parse_list(sections.get("memory", ""), timestamped=True),
+        code=parse_list(sections.get("code", "")),
+        todo=parse_todo(sections.get("todo", "")),
     )
 
 
@@ -90,24 +55,21 @@ def dump_state(state: AgentState) -> str:
     md += "</agent>\n\n"
 
     md += "<knowledge>\n"
-    md += "\n".join(state.knowledge)
+    md += dump_entries(state.knowledge)
     md += "\n</knowledge>\n\n"
 
     md += "<memory>\n"
-    md += "\n".join(state.memory)
+    md += dump_entries(state.memory)
     md += "\n</memory>\n\n"
 
     md += "<code>\n"
-    md += "\n".join(state.code)
+    md += dump_entries(state.code)
     md += "\n</code>\n\n"
 
     md += "<todo>\n"
     for item in state.todo:
-        # Dump using the new simplified syntax
-        if item.status == "DONE":
-            md += f"! {item.content}\n"
-        else:
-            md += f"? {item.content}\n"
+        # Dump using the simplified marker syntax, metadata included
+        md += dump_todo_line(item.status, item.content, item.meta) + "\n"
     md += "</todo>\n"
 
     return md
@@ -2,6 +2,7 @@ import datetime
 from .parser import parse_md, dump_state
 from .llm import SimpleLLM
 from .executor import execute_tool
+from core.mind.dedup import KnowledgeDeduper
 
 # Memory 配置常量
 MEMORY_LIMIT = 100  # 记忆库容量上限
@@ -135,17 +136,16 @@ style: Focused, specialized.
                             c_content = f.read()
                         c_state = parse_md(c_content)
 
-                        # 1. Absorb Knowledge (Uniquely)
-                        new_know = 0
-                        for k in c_state.knowledge:
-                            if (
-                                k not in self.state.knowledge
-                                and "[父辈智慧]" not in k
+                        # 1. Absorb Knowledge (Uniquely, near-duplicates included)
+                        new_know = KnowledgeDeduper().merge_into(
+                            self.state.knowledge,
+                            (
+                                k for k in c_state.knowledge
+                                if "[父辈智慧]" not in k
                                 and "[继承公理]" not in k
                                 and "[Parental Wisdom]" not in k
-                            ):
-                                self.state.knowledge.append(k)
-                                new_know += 1
+                            ),
+                        )
 
                         # 2. Absorb Key Memory/Result (Last 3 memories)
                         last_mems = c_state.memory[-3:] if c_state.memory else []
@@ -218,7 +218,9 @@ style: Focused, specialized.
                 print(f"[系统] 提炼出 {len(new_insights)} 条新智慧:")
                 for insight in new_insights:
                     print(f"  + {insight}")
-                    self.state.knowledge.append(f"[经验] {insight}")
+                KnowledgeDeduper().merge_into(
+                    self.state.knowledge, [f"[经验] {insight}" for insight in new_insights]
+                )
 
                 self.state.memory = active_memory
                 print(f"[系统] 记忆库已截断。保留最后 {KEEP_COUNT} 条。")
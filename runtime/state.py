@@ -5,7 +5,8 @@ from typing import List, Dict, Optional
 @dataclasses.dataclass
 class TodoItem:
     content: str
-    status: str = "PENDING"  # PENDING, IN_PROGRESS, DONE
+    status: str = "PENDING"  # PENDING, IN_PROGRESS, DONE, FAILED
+    meta: Dict = dataclasses.field(default_factory=dict)  # Line-end <!-- {json} --> metadata, kept verbatim
 
 
 @dataclasses.dataclass
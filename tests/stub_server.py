@@ -0,0 +1,128 @@
+"""
+A scripted HTTP/1.1 server for transport tests.
+
+Each request takes the next scripted response (or is passed to a handler
+callable when the script is empty). Responses are raw bytes, so tests can
+exercise keep-alive, chunked bodies, Content-Length bodies, dropped
+connections and SSE exactly as a real server would send them.
+"""
+
+import dataclasses
+import itertools
+import json
+import socketserver
+import threading
+import time
+from typing import Callable, List, Optional
+
+DROP = object()  # read the request, then close the connection without answering
+
+
+@dataclasses.dataclass
+class Request:
+    connection: int
+    path: str
+    headers: dict
+    body: bytes
+    at: float
+
+    def json(self):
+        return json.loads(self.body)
+
+
+def response(status: int = 200, body: bytes = b"", headers: dict = None,
+             chunked: bool = False, close: bool = False, chunk_size: int = 7) -> bytes:
+    """Build a raw HTTP/1.1 response."""
+    lines = [f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}"]
+    for name, value in (headers or {}).items():
+        lines.append(f"{name}: {value}")
+    if close:
+        lines.append("Connection: close")
+    if chunked:
+        lines.append("Transfer-Encoding: chunked")
+        payload = b"".join(
+            f"{len(body[i:i + chunk_size]):x}\r\n".encode() + body[i:i + chunk_size] + b"\r\n"
+            for i in range(0, len(body), chunk_size)
+        ) + b"0\r\n\r\n"
+    else:
+        lines.append(f"Content-Length: {len(body)}")
+        payload = body
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+
+def json_response(obj, **kwargs) -> bytes:
+    headers = {"Content-Type": "application/json", **kwargs.pop("headers", {})}
+    return response(body=json.dumps(obj, ensure_ascii=False).encode(), headers=headers, **kwargs)
+
+
+def sse_response(events: List[str], **kwargs) -> bytes:
+    body = "".join(f"data: {event}\n\n" for event in events + ["[DONE]"]).encode()
+    return response(body=body, headers={"Content-Type": "text/event-stream"}, chunked=True, **kwargs)
+
+
+class StubServer:
+    """Context manager running the scripted server on an ephemeral local port."""
+
+    def __init__(self, handler: Callable[[Request], bytes] = None):
+        self.handler = handler
+        self.script: List = []
+        self.requests: List[Request] = []
+        self._lock = threading.Lock()
+        self._connections = itertools.count()
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                connection = next(stub._connections)
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    headers = {}
+                    while True:
+                        header = self.rfile.readline()
+                        if header in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = header.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    body = self.rfile.read(int(headers.get("content-length", 0)))
+                    request = Request(connection, line.split()[1].decode(), headers, body, time.monotonic())
+                    reply = stub._next(request)
+                    if reply is DROP:
+                        return
+                    self.wfile.write(reply)
+                    self.wfile.flush()
+                    if b"\r\nConnection: close\r\n" in reply.split(b"\r\n\r\n", 1)[0] + b"\r\n":
+                        return
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def add(self, *replies):
+        with self._lock:
+            self.script.extend(replies)
+
+    def _next(self, request: Request):
+        with self._lock:
+            self.requests.append(request)
+            if self.script:
+                return self.script.pop(0)
+        return self.handler(request)
+
+    def __enter__(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.01,), daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
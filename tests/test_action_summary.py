@@ -0,0 +1,93 @@
+"""
+Tests for the local template summarizer used for action summaries.
+"""
+
+import asyncio
+import os
+import re
+import tempfile
+from hypothesis import given, strategies as st, settings
+
+from core.loop import AsyncLifeLoop
+from core.mind import CircuitBreaker
+from core.mind.memory import ACTION_TEXT_LENGTH, MemoryManager, local_summary, tools_from_actions
+from core.state import StateStore, TodoItem
+
+
+text_strategy = st.text(alphabet="创建文件首页abc XYZ<>/=\"`;.", max_size=200)
+tool_strategy = st.lists(st.sampled_from(["write_file", "read_file", "create_folder", "add_task"]), max_size=4, unique=True)
+
+
+@settings(max_examples=200)
+@given(text_strategy, tool_strategy, st.sampled_from(["任务成功完成", "任务未完成"]), st.integers(min_value=40, max_value=120))
+def test_summary_is_bounded_and_structured(task: str, tools: list, result: str, limit: int):
+    """
+    **Feature: action-summary, Property 1: Bounded Template Line**
+
+    The local summary SHALL never exceed the length limit, SHALL keep the
+    "任务 → 工具 → 结果" structure with the result intact, and SHALL contain
+    no HTML tags or code fences.
+    """
+    summary = local_summary(task, tools, result, max_length=limit)
+
+    assert len(summary) <= limit
+    assert summary.startswith("任务：") and " → 工具：" in summary
+    assert summary.endswith(f" → 结果：{result}")
+    assert "```" not in summary
+    assert re.search(r"<[^>]*>", summary) is None
+
+
+def test_code_bodies_are_dropped():
+    task = "创建 index.html，内容 ```html\n<div>很长的代码</div>\n``` 完成后检查 <b>样式</b>"
+    assert local_summary(task, ["write_file"], "任务成功完成") == \
+        "任务：创建 index.html，内容 完成后检查 样式 → 工具：write_file → 结果：任务成功完成"
+
+
+def test_local_mode_needs_no_llm_call():
+    class _NoLLM:
+        async def summarize(self, *args, **kwargs):
+            raise AssertionError("LLM should not be called")
+
+    action = "create_folder({'path': 'task'}) -> Folder created successfully: task; write_file({'path': 'task/a.md', 'content': 'x'}) -> File written successfully."
+    summary = asyncio.run(MemoryManager(_NoLLM()).summarize_action("创建 task/a.md", "经过2步完成", action, "任务成功完成"))
+    assert summary == "任务：创建 task/a.md → 工具：create_folder、write_file → 结果：任务成功完成"
+    assert tools_from_actions([action]) == ["create_folder", "write_file"]
+
+
+_ACTIONS = [
+    "create_folder({'path': 'task'}) -> Folder created successfully: task",
+    "read_file({'path': 'task/a.md'}) -> Error: not found",
+    "write_file({'path': 'task/a.md', 'content': 'x'}) -> File written successfully.",
+    "list_files({'path': 'task'}) -> a.md",
+    "read_file({'path': 'task/a.md'}) -> x",
+]
+
+
+def test_success_summary_covers_every_step():
+    class _NoLLM:
+        breaker = CircuitBreaker()
+
+    path = os.path.join(tempfile.mkdtemp(), "agent.md")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<agent>\nname: t\n</agent>\n<memory>\n占位\n</memory>\n")
+    loop = AsyncLifeLoop(StateStore(path), _NoLLM())
+    asyncio.run(loop._summarize_success(TodoItem("创建 task/a.md"), _ACTIONS, "2026-01-01 00:00:00", "占位"))
+    assert StateStore(path).load().memory == [
+        "[2026-01-01 00:00:00] ✓ 任务：创建 task/a.md → 工具：create_folder、read_file、write_file、list_files → 结果：任务成功完成"
+    ]
+
+
+def test_llm_mode_keeps_the_latest_actions_within_budget():
+    class _RecordingLLM:
+        def __init__(self):
+            self.texts = []
+
+        async def summarize(self, text, max_length=100):
+            self.texts.append(text)
+            return "摘要"
+
+    llm = _RecordingLLM()
+    action = "; ".join(_ACTIONS * 5)
+    asyncio.run(MemoryManager(llm, summary_mode="llm").summarize_action("t", "经过25步完成", action, "完成"))
+    logged = llm.texts[0].split(" 行动:")[1].rsplit(" 结果:", 1)[0]
+    assert logged == "…" + action[-ACTION_TEXT_LENGTH:]
@@ -0,0 +1,86 @@
+"""
+Tests for the global LLM admission controller.
+"""
+
+import asyncio
+from hypothesis import given, strategies as st, settings
+
+from core import agent as agent_module
+from core.mind.admission import AdmissionController, Priority
+
+
+async def _admission_order(priorities: list) -> list:
+    """Queue one request per priority behind a held slot and record admission order."""
+    controller = AdmissionController(max_concurrency=2, background_slots=1)
+    order = []
+
+    async def request(i: int, priority: Priority):
+        async with controller.async_slot(priority):
+            order.append(i)
+            await asyncio.sleep(0)
+
+    async with controller.async_slot(Priority.PLANNING), controller.async_slot(Priority.PLANNING):
+        tasks = [asyncio.create_task(request(i, p)) for i, p in enumerate(priorities)]
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return order
+
+
+@settings(max_examples=50, deadline=None)
+@given(st.lists(st.sampled_from(list(Priority)), min_size=1, max_size=12))
+def test_higher_priority_admitted_first(priorities: list):
+    """
+    **Feature: admission, Property 1: Priority Ordering**
+
+    When slots free up, waiters SHALL be admitted by priority first and
+    arrival order second.
+    """
+    order = asyncio.run(_admission_order(priorities))
+    admitted = [priorities[i] for i in order]
+    assert sorted(order) == list(range(len(priorities)))
+    foreground = [i for i in order if priorities[i] != Priority.BACKGROUND]
+    assert foreground == sorted(foreground, key=lambda i: (priorities[i], i))
+    assert admitted[:len(foreground)] == sorted(admitted[:len(foreground)])
+
+
+def test_background_burst_leaves_foreground_slot():
+    controller = AdmissionController(max_concurrency=2, background_slots=1, rate=1, burst=2)
+
+    async def scenario():
+        async with controller.async_slot(Priority.BACKGROUND):
+            blocked = asyncio.create_task(controller.async_slot(Priority.BACKGROUND).__aenter__())
+            await asyncio.sleep(0.01)
+            assert not blocked.done()
+            async with controller.async_slot(Priority.PLANNING):
+                pass
+            blocked.cancel()
+
+    asyncio.run(scenario())
+    stats = controller.stats()
+    assert stats["planning"]["admitted"] == 1
+    assert stats["background"]["admitted"] == 1
+    assert stats["background"]["waiting"] == 0
+
+
+def test_single_slot_gives_background_no_reserved_slot():
+    controller = AdmissionController(max_concurrency=1, background_slots=1)
+    assert controller.background_slots == 0
+
+    async def scenario():
+        async with controller.async_slot(Priority.PLANNING):
+            background = asyncio.create_task(controller.async_slot(Priority.BACKGROUND).__aenter__())
+            await asyncio.sleep(0.01)
+            assert not background.done()
+        await asyncio.wait_for(background, 1)
+        controller._release(Priority.BACKGROUND)
+
+    asyncio.run(scenario())
+    assert controller.stats()["background"]["admitted"] == 1
+
+
+def test_run_agents_sizes_admission_from_max_in_flight(monkeypatch):
+    created = []
+    monkeypatch.setattr(agent_module, "AsyncLLMClient", lambda **kwargs: created.append(kwargs))
+    asyncio.run(agent_module.run_agents([], max_in_flight=16))
+    assert created[0]["admission"].max_concurrency == 16
+    assert created[0]["max_in_flight"] == 16
@@ -0,0 +1,46 @@
+"""
+Tests for the single-pass AML section scanner.
+"""
+
+import re
+from hypothesis import given, strategies as st, settings
+
+from core.parser import parse_aml, dump_aml, scan_sections
+from core.parser.aml import SECTION_TAGS
+
+
+body_strategy = st.text(alphabet="abc:?! 任务记忆\n[]x-", max_size=60)
+
+
+@settings(max_examples=200)
+@given(
+    st.permutations(SECTION_TAGS),
+    st.lists(body_strategy, min_size=5, max_size=5),
+    st.lists(st.text(alphabet="说明 \n", max_size=10), min_size=6, max_size=6),
+    st.sets(st.sampled_from(SECTION_TAGS)),
+)
+def test_single_pass_matches_per_tag_search(order, bodies, gaps, missing):
+    """
+    **Feature: aml-scanner, Property 1: Per-Tag Equivalence**
+
+    For documents whose section bodies contain no tags, the single pass SHALL
+    find exactly what a separate regex search per tag finds, in any section
+    order and with any sections missing.
+    """
+    text = gaps[0] + "".join(
+        f"<{tag}>{body}</{tag}>{gap}"
+        for tag, body, gap in zip(order, bodies, gaps[1:])
+        if tag not in missing
+    )
+    sections = scan_sections(text)
+    for tag in SECTION_TAGS:
+        match = re.search(f"<{tag}>(.*?)</{tag}>", text, re.DOTALL)
+        assert sections.get(tag) == (match.group(1).strip() if match else None)
+
+
+def test_tags_inside_a_section_are_content():
+    text = "<memory>\n写入 <todo>示例</todo> 到文件\n</memory>\n<todo>\n? 真正的任务\n</todo>\n<todo>\n? 重复段落\n</todo>"
+    state = parse_aml(text)
+    assert state.memory == ["写入 <todo>示例</todo> 到文件"]
+    assert [t.content for t in state.todo] == ["真正的任务"]
+    assert parse_aml(dump_aml(state)) == state
@@ -0,0 +1,227 @@
+"""
+Tests for AsyncHTTPTransport against a scripted local HTTP server.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+
+import pytest
+import requests
+from hypothesis import given, strategies as st, settings
+
+from core.agent import run_agents
+from core.loop import LifeLoop, run_sync
+from core.mind import AsyncLLMClient, EndpointPool, LLMClient
+from core.mind.planner import TASK_COMPLETE_TOOL
+from core.mind.transport import AsyncHTTPTransport
+from core.state import StateStore
+from tests.stub_server import StubServer, DROP, response, json_response, sse_response
+
+
+def _transport(**kwargs) -> AsyncHTTPTransport:
+    return AsyncHTTPTransport(backoff_base=0.01, backoff_max=1.0, **kwargs)
+
+
+async def _stream(transport, url) -> list:
+    return [event async for event in transport.stream_events(url, {})]
+
+
+@settings(max_examples=25, deadline=None)
+@given(st.lists(st.tuples(st.text(max_size=40), st.booleans(), st.integers(1, 9)), min_size=1, max_size=4))
+def test_bodies_arrive_intact_over_one_connection(bodies):
+    """
+    **Feature: async-transport, Property 1: Framing And Reuse**
+
+    For any sequence of chunked or Content-Length responses, each call SHALL
+    return its exact body, and all calls SHALL share one keep-alive connection.
+    """
+    transport = _transport()
+
+    async def main():
+        results = []
+        for text, chunked, chunk_size in bodies:
+            results.append(await transport.post_json(f"{stub.url}/v1", {"n": len(results)}))
+        return results
+
+    with StubServer() as stub:
+        for text, chunked, chunk_size in bodies:
+            body = json.dumps({"text": text}, ensure_ascii=False).encode()
+            stub.add(response(body=body, chunked=chunked, chunk_size=chunk_size))
+        results = asyncio.run(main())
+    assert results == [{"text": text} for text, _, _ in bodies]
+    assert [r.json()["n"] for r in stub.requests] == list(range(len(bodies)))
+    assert {r.connection for r in stub.requests} == {0}
+    assert transport.stats.new_connections == 1
+    assert transport.stats.reused_calls == len(bodies) - 1
+
+
+def test_dropped_pooled_connection_is_retried_on_a_new_one():
+    transport = _transport()
+
+    async def main():
+        first = await transport.post_json(f"{stub.url}/v1", {})
+        second = await transport.post_json(f"{stub.url}/v1", {})
+        return first, second, transport.last_timing
+
+    with StubServer() as stub:
+        stub.add(json_response({"n": 1}), DROP, json_response({"n": 2}))
+        first, second, timing = asyncio.run(main())
+    assert (first, second) == ({"n": 1}, {"n": 2})
+    assert timing.attempts == 2 and timing.new_connections == 1
+    assert [r.connection for r in stub.requests] == [0, 0, 1]
+
+
+def test_connections_survive_across_event_loops():
+    transport = _transport()
+    with StubServer() as stub:
+        stub.add(json_response({"n": 1}), json_response({"n": 2}))
+        assert asyncio.run(transport.post_json(f"{stub.url}/v1", {})) == {"n": 1}
+        assert asyncio.run(transport.post_json(f"{stub.url}/v1", {})) == {"n": 2}
+    assert {r.connection for r in stub.requests} == {0}
+    assert transport.stats.new_connections == 1
+
+
+def test_proxy_redirect_and_content_encoding_are_honoured(monkeypatch):
+    transport = _transport()
+    with StubServer() as stub:
+        monkeypatch.setenv("HTTP_PROXY", stub.url)
+        monkeypatch.setenv("NO_PROXY", "")
+        stub.add(
+            response(307, headers={"Location": "http://llm.internal/v2"}),
+            response(body=gzip.compress(b'{"ok": true}'), headers={"Content-Encoding": "gzip"}),
+        )
+        assert asyncio.run(transport.post_json("http://llm.internal/v1", {"q": 1})) == {"ok": True}
+    assert [r.path for r in stub.requests] == ["http://llm.internal/v1", "http://llm.internal/v2"]
+    assert [r.json() for r in stub.requests] == [{"q": 1}, {"q": 1}]
+
+
+def test_retry_after_is_honoured_on_429():
+    transport = _transport()
+    with StubServer() as stub:
+        stub.add(response(429, headers={"Retry-After": "0.3"}), json_response({"ok": True}))
+        start = time.monotonic()
+        assert asyncio.run(transport.post_json(f"{stub.url}/v1", {})) == {"ok": True}
+        elapsed = time.monotonic() - start
+    assert elapsed >= 0.3
+    assert stub.requests[1].at - stub.requests[0].at >= 0.3
+    assert transport.stats.retries == 1
+
+
+def test_5xx_is_retried_until_retries_run_out():
+    transport = _transport(max_retries=2)
+    with StubServer() as stub:
+        stub.add(response(503), response(502), json_response({"ok": True}))
+        assert asyncio.run(transport.post_json(f"{stub.url}/v1", {})) == {"ok": True}
+        assert len(stub.requests) == 3
+
+        stub.add(response(500), response(500), response(500), json_response({"ok": True}))
+        with pytest.raises(requests.HTTPError) as error:
+            asyncio.run(transport.post_json(f"{stub.url}/v1", {}))
+    assert error.value.response.status_code == 500
+    assert len(stub.requests) == 6
+    assert transport.stats.failures == 1 and transport.stats.retries == 4
+
+
+def test_client_errors_are_not_retried():
+    transport = _transport()
+    with StubServer() as stub:
+        stub.add(response(400))
+        with pytest.raises(requests.HTTPError):
+            asyncio.run(transport.post_json(f"{stub.url}/v1", {}))
+    assert len(stub.requests) == 1
+
+
+def test_sse_stream_stops_at_done_and_reuses_the_connection():
+    transport = _transport()
+    events = [json.dumps({"delta": c}, ensure_ascii=False) for c in "流式输出abc"]
+
+    async def main():
+        first = await _stream(transport, f"{stub.url}/v1")
+        second = await _stream(transport, f"{stub.url}/v1")
+        return first, second
+
+    with StubServer() as stub:
+        # chunk_size=5 splits events across chunk boundaries
+        stub.add(sse_response(events, chunk_size=5), sse_response(["tail"], chunk_size=3))
+        first, second = asyncio.run(main())
+    assert first == events
+    assert second == ["tail"]
+    assert stub.requests[0].headers["accept"] == "text/event-stream"
+    assert {r.connection for r in stub.requests} == {0}
+
+
+def test_stream_closed_early_is_not_a_failure():
+    transport = _transport()
+
+    async def main():
+        events = transport.stream_events(f"{stub.url}/v1", {})
+        async for event in events:
+            break
+        await events.aclose()
+        return event, transport.last_timing
+
+    with StubServer() as stub:
+        stub.add(sse_response(["first", "second", "third"]))
+        event, timing = asyncio.run(main())
+    assert event == "first"
+    assert timing.ok and transport.stats.failures == 0
+
+
+def test_non_sse_response_is_yielded_whole():
+    transport = _transport()
+    with StubServer() as stub:
+        stub.add(json_response({"choices": []}, close=True))
+        assert asyncio.run(_stream(transport, f"{stub.url}/v1")) == ['{"choices": []}']
+
+
+def _answer(request) -> bytes:
+    """Every tool-enabled request completes the task; any other prompt gets a short reply."""
+    if request.json().get("tools"):
+        call = {"id": "done", "type": "function",
+                "function": {"name": TASK_COMPLETE_TOOL, "arguments": "{}"}}
+        message = {"role": "assistant", "content": None, "tool_calls": [call]}
+    else:
+        message = {"role": "assistant", "content": "摘要"}
+    return json_response({"choices": [{"message": message, "finish_reason": "stop"}]})
+
+
+def test_run_agents_smoke():
+    out = tempfile.mkdtemp()
+    paths = []
+    for name, tasks in (("a", ["任务一", "任务二"]), ("b", ["任务三"])):
+        path = os.path.join(out, f"{name}.md")
+        todo = "\n".join(f"? {task}" for task in tasks)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"<agent>\nname: {name}\n</agent>\n<todo>\n{todo}\n</todo>\n")
+        paths.append(path)
+
+    with StubServer(_answer) as stub:
+        llm = AsyncLLMClient(base_url=stub.url, endpoints=EndpointPool([stub.url]), max_in_flight=2)
+        results = asyncio.run(run_agents(paths, llm=llm))
+
+    assert not [r for r in results.values() if isinstance(r, BaseException)]
+    assert [results[path]["completed"] for path in paths] == [2, 1]
+    for path in paths:
+        assert all(t.status == "DONE" for t in StateStore(path).load().todo)
+    assert all(r.path == "/v1/chat/completions" for r in stub.requests)
+    assert llm.transport.stats.failures == 0
+
+
+def test_sync_life_loop_keeps_one_event_loop_and_connection():
+    path = os.path.join(tempfile.mkdtemp(), "agent.md")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<agent>\nname: t\n</agent>\n<todo>\n? 任务一\n? 任务二\n</todo>\n")
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    with StubServer(_answer) as stub:
+        life = LifeLoop(StateStore(path), LLMClient(base_url=stub.url, endpoints=EndpointPool([stub.url])))
+        assert life.run_once() and life.run_once()
+    assert all(t.status == "DONE" for t in StateStore(path).load().todo)
+    assert {r.connection for r in stub.requests} == {0}
+    assert run_sync(current_loop()) is run_sync(current_loop())
@@ -0,0 +1,140 @@
+"""
+Tests for the rule-based completion verifier.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+from hypothesis import given, strategies as st, settings
+
+from core.mind.verifier import CompletionContext, CompletionVerifier
+from core.tools.executor import ToolCall
+
+
+name_strategy = st.text(alphabet="abcdefghij_", min_size=1, max_size=8)
+
+
+def _verify(verifier: CompletionVerifier, task: str, path: str, written: list) -> dict:
+    ctx = CompletionContext(
+        task=task,
+        tool_call=ToolCall(name="write_file", args={"path": path, "content": "x"}),
+        result="File written successfully.",
+        action_history=[f"write_file({path})"],
+        written_paths=written,
+    )
+    return asyncio.run(verifier.verify(ctx))
+
+
+@settings(max_examples=50, deadline=None)
+@given(st.lists(name_strategy, min_size=1, max_size=4, unique=True), st.data())
+def test_completes_only_when_every_named_file_is_written(names: list, data):
+    """
+    **Feature: completion-verifier, Property 1: No False Completion**
+
+    The rules SHALL report completion only when every file named in the task
+    has been written and is non-empty; otherwise they SHALL defer to the LLM.
+    """
+    root = tempfile.mkdtemp()
+    llm_calls = []
+
+    async def llm_check(task, history, result):
+        llm_calls.append(task)
+        return {"completed": False, "reason": "llm", "next_action": ""}
+
+    try:
+        files = [f"{name}.html" for name in names]
+        task = "创建 " + " 和 ".join(files)
+        written_count = data.draw(st.integers(min_value=1, max_value=len(files)))
+        written = []
+        for name in files[:written_count]:
+            path = os.path.join(root, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("<html></html>")
+            written.append(path)
+
+        verifier = CompletionVerifier(llm_check)
+        verdict = _verify(verifier, task, written[-1], written)
+        assert verdict["completed"] == (written_count == len(files))
+        assert (len(llm_calls) == 1) == (written_count < len(files))
+    finally:
+        shutil.rmtree(root)
+
+
+def test_empty_file_is_not_complete_and_unnamed_task_defers():
+    root = tempfile.mkdtemp()
+    try:
+        empty = os.path.join(root, "index.html")
+        open(empty, "w").close()
+
+        async def llm_check(task, history, result):
+            return {"completed": True, "reason": "llm", "next_action": ""}
+
+        verifier = CompletionVerifier(llm_check)
+        assert not _verify(verifier, "创建 index.html", empty, [empty])["completed"]
+        with open(empty, "w") as f:
+            f.write("x")
+        assert _verify(verifier, "写一篇作文", empty, [empty])["reason"] == "llm"
+        assert verifier.stats == {"named_files_rule": 1, "llm": 1}
+    finally:
+        shutil.rmtree(root)
+
+
+def test_named_directory_must_match():
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        os.chdir(root)
+        os.mkdir("task")
+        for path in ("index.html", os.path.join("task", "index.html")):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("<html></html>")
+        verifier = CompletionVerifier()
+        assert not _verify(verifier, "创建 task/index.html", "./index.html", ["./index.html"])["completed"]
+        assert _verify(verifier, "创建 task/index.html", "task/index.html", ["task/index.html"])["completed"]
+        assert _verify(verifier, "创建 index.html", "task/index.html", ["task/index.html"])["completed"]
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+def test_error_inside_tool_output_is_not_a_failure():
+    """Only a leading error status fails a step; file contents mentioning Error do not."""
+    from core.loop import AsyncLifeLoop
+    from core.mind import CircuitBreaker
+    from core.mind.planner import PlannedStep, TASK_COMPLETE_TOOL
+    from core.mind.verifier import tool_error_rule
+    from core.state import StateStore
+
+    source = "function f() {\n  throw new Error('bad input');\n}\n"
+    read = ToolCall(name="read_file", args={"path": "a.js"})
+    assert tool_error_rule(CompletionContext("读 a.js", read, source, [], [])) is None
+    assert tool_error_rule(CompletionContext("读 a.js", read, "Error: File not found.", [], []))["completed"] is False
+    assert not PlannedStep(read, expect="throw").diverged(source)
+    assert PlannedStep(read).diverged("Error: File not found.")
+
+    root = tempfile.mkdtemp()
+    js_path = os.path.join(root, "a.js")
+    with open(js_path, "w", encoding="utf-8") as f:
+        f.write(source)
+
+    class _LLM:
+        breaker = CircuitBreaker()
+
+        async def chat(self, messages, tools=None, **kwargs):
+            calls = [
+                {"id": "r", "type": "function",
+                 "function": {"name": "read_file", "arguments": f'{{"path": "{js_path}"}}'}},
+                {"id": "d", "type": "function",
+                 "function": {"name": TASK_COMPLETE_TOOL, "arguments": '{"summary": "已检查"}'}},
+            ]
+            return {"choices": [{"message": {"content": None, "tool_calls": calls}}]}
+
+        async def summarize(self, text, max_length=100):
+            return text[:max_length]
+
+    dna = os.path.join(root, "agent.md")
+    with open(dna, "w", encoding="utf-8") as f:
+        f.write("<agent>\nname: t\n</agent>\n<todo>\n? 检查 a.js 的错误处理\n</todo>\n")
+    stats = asyncio.run(AsyncLifeLoop(StateStore(dna), _LLM()).run_all())
+    assert stats["completed"] == 1 and stats["failed"] == 0
@@ -0,0 +1,71 @@
+"""
+Tests for BM25 retrieval of planner knowledge and memory.
+"""
+
+import os
+import tempfile
+from hypothesis import given, strategies as st, settings
+
+from core.mind.conversation import estimate_tokens
+from core.mind.retrieval import BM25Index, ContextRetriever, tokenize
+
+
+entry_strategy = st.text(alphabet="创建文件网页样式读取失败abc.md 12", min_size=1, max_size=20)
+
+
+@settings(max_examples=100)
+@given(st.lists(st.lists(entry_strategy, max_size=12), min_size=1, max_size=4), entry_strategy)
+def test_incremental_sync_matches_rebuild(snapshots: list, query: str):
+    """
+    **Feature: context-retrieval, Property 1: Incremental Index Consistency**
+
+    Syncing one index through a series of entry lists SHALL score every query
+    exactly as an index built from scratch over the final list.
+    """
+    index = BM25Index()
+    for entries in snapshots:
+        index.sync(entries)
+    fresh = BM25Index()
+    fresh.sync(snapshots[-1])
+
+    assert index.scores(query).keys() == fresh.scores(query).keys()
+    for text, score in fresh.scores(query).items():
+        assert abs(index.scores(query)[text] - score) < 1e-9
+
+
+@settings(max_examples=100)
+@given(st.lists(entry_strategy, max_size=40), entry_strategy, st.integers(min_value=10, max_value=200))
+def test_selection_fits_budget_in_original_order(memory: list, task: str, budget: int):
+    """
+    **Feature: context-retrieval, Property 2: Bounded Ordered Selection**
+
+    The selected memory SHALL be a subsequence of the input in its original
+    order, and SHALL fit the token budget whenever it is not returned whole.
+    """
+    retriever = ContextRetriever(token_budget=budget * 2, top_k=5)
+    _, selected = retriever.select(task, [], memory)
+
+    it = iter(memory)
+    assert all(entry in it for entry in selected)
+    if selected != memory:
+        assert len(selected) <= 5
+        assert sum(estimate_tokens(e) for e in selected) <= budget
+
+
+def test_relevant_old_entry_beats_recent_noise():
+    memory = ["[2025-01-01 10:00:00] ✓ 用 write_file 创建 index.html 时路径必须包含 site/ 目录"]
+    memory += [f"[2025-01-02 10:{i:02d}:00] ⟳ 第{i}次尝试未完成: 整理日志" for i in range(30)]
+    path = os.path.join(tempfile.mkdtemp(), "agent.md.index.json")
+
+    retriever = ContextRetriever(path, token_budget=400, top_k=5)
+    _, selected = retriever.select("创建 index.html 网页", [], memory)
+    assert memory[0] in selected
+    assert sum("尝试未完成" in entry for entry in selected) == 1
+
+    reloaded = ContextRetriever(path)
+    assert len(reloaded.memory) == len(memory)
+    assert reloaded.memory.scores("创建网页") == retriever.memory.scores("创建网页")
+
+
+def test_cjk_bigrams():
+    assert tokenize("[2025-01-01 10:00:00] 创建网页 Index.HTML") == ["创建", "建网", "网页", "index", "html"]
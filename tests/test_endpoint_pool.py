@@ -0,0 +1,97 @@
+"""
+Tests for the multi-endpoint LLM pool, using local stand-in servers.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from hypothesis import given, strategies as st, settings
+
+from core.mind import LLMClient
+from core.mind.endpoints import EndpointPool, HEDGE_MIN_SAMPLES
+
+
+def _serve(status: int = 200, delay: float = 0.0) -> ThreadingHTTPServer:
+    """Start a stand-in chat completions server on a free port."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            body = json.dumps({"choices": [{"message": {"content": str(self.server.server_port)}}]}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+@settings(max_examples=50)
+@given(st.lists(st.booleans(), min_size=1, max_size=40))
+def test_pick_balances_least_outstanding(finishes: list):
+    """
+    **Feature: endpoint-pool, Property 1: Least-Outstanding Balancing**
+
+    Among healthy endpoints, pick SHALL always return one with the fewest
+    outstanding requests, so in-flight counts never differ by more than one.
+    """
+    pool = EndpointPool(["http://a", "http://b", "http://c"])
+    in_flight = []
+    for finish in finishes:
+        if finish and in_flight:
+            pool.release(in_flight.pop(0), latency=0.01)
+        else:
+            least = min(e.outstanding for e in pool.endpoints)
+            endpoint = pool.pick()
+            assert endpoint.outstanding - 1 == least
+            in_flight.append(endpoint)
+        counts = [e.outstanding for e in pool.endpoints]
+        assert sum(counts) == len(in_flight)
+
+
+def test_failing_endpoint_is_ejected_and_bypassed():
+    bad, good = _serve(status=500), _serve()
+    try:
+        pool = EndpointPool([_url(bad), _url(good)], eject_failures=1, eject_seconds=60)
+        llm = LLMClient(endpoints=pool, max_retries=0)
+        for _ in range(4):
+            result = llm.chat([{"role": "user", "content": "hi"}])
+            assert result["choices"][0]["message"]["content"] == str(good.server_port)
+        stats = pool.stats()
+        assert stats[_url(bad)]["ejected"]
+        assert stats[_url(bad)]["calls"] == 1
+        assert stats[_url(good)]["calls"] == 4
+    finally:
+        bad.shutdown()
+        good.shutdown()
+
+
+def test_slow_endpoint_is_hedged():
+    slow, fast = _serve(delay=1.0), _serve()
+    try:
+        pool = EndpointPool([_url(slow), _url(fast)], hedge=True)
+        slow_endpoint = pool.endpoints[0]
+        slow_endpoint.latencies.extend([0.05] * HEDGE_MIN_SAMPLES)
+        llm = LLMClient(endpoints=pool, max_retries=0)
+
+        start = time.perf_counter()
+        result = llm.chat([{"role": "user", "content": "hi"}])
+        assert time.perf_counter() - start < 0.8
+        assert result["choices"][0]["message"]["content"] == str(fast.server_port)
+        assert pool.hedges == 1
+        assert pool.endpoints[1].hedge_wins == 1
+    finally:
+        slow.shutdown()
+        fast.shutdown()
@@ -0,0 +1,104 @@
+"""
+Tests for the pooled, retrying HTTPTransport against a scripted local HTTP server.
+"""
+
+import pytest
+import requests
+from hypothesis import given, strategies as st, settings
+
+from core.mind import transport as transport_module
+from core.mind.transport import HTTPTransport, backoff_delay
+from tests.stub_server import StubServer, response, json_response, sse_response
+
+
+@settings(max_examples=200)
+@given(
+    st.integers(1, 12),
+    st.floats(0.01, 2.0),
+    st.floats(0.5, 30.0),
+    st.one_of(st.none(), st.floats(0, 60).map(str), st.just("soon")),
+)
+def test_backoff_stays_within_schedule(attempt, base, cap, retry_after):
+    """
+    **Feature: http-transport, Property 1: Bounded Jittered Backoff**
+
+    The delay for attempt n SHALL lie in [0, min(cap, base * 2^(n-1))], except
+    that a numeric Retry-After SHALL raise it to at least min(cap, Retry-After).
+    """
+    delay = backoff_delay(attempt, base, cap, retry_after)
+    ceiling = min(cap, base * 2 ** (attempt - 1))
+    if retry_after in (None, "soon"):
+        assert 0 <= delay <= ceiling
+    else:
+        floor = min(cap, float(retry_after))
+        assert floor <= delay <= max(ceiling, floor)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff sleeps instead of waiting, with jitter pinned to its upper bound."""
+    recorded = []
+    monkeypatch.setattr(transport_module.time, "sleep", recorded.append)
+    monkeypatch.setattr(transport_module.random, "uniform", lambda low, high: high)
+    return recorded
+
+
+def test_session_connections_are_reused():
+    transport = HTTPTransport()
+    with StubServer() as stub:
+        for n in range(4):
+            stub.add(json_response({"n": n}, chunked=n % 2 == 1))
+        results = [transport.post_json(f"{stub.url}/v1", {"n": n}) for n in range(4)]
+    assert results == [{"n": n} for n in range(4)]
+    assert {r.connection for r in stub.requests} == {0}
+    assert transport.stats.new_connections == 1
+    assert transport.stats.reused_calls == 3
+    assert transport.last_timing.reused
+
+
+def test_retry_count_and_backoff_schedule(sleeps):
+    transport = HTTPTransport(max_retries=3, backoff_base=0.5, backoff_max=1.5)
+    with StubServer() as stub:
+        stub.add(response(503), response(502), response(429), json_response({"ok": True}))
+        assert transport.post_json(f"{stub.url}/v1", {}) == {"ok": True}
+    assert sleeps == [0.5, 1.0, 1.5]
+    assert transport.last_timing.attempts == 4
+    assert transport.stats.retries == 3 and transport.stats.failures == 0
+
+
+def test_retry_after_overrides_shorter_backoff(sleeps):
+    transport = HTTPTransport(backoff_base=0.1, backoff_max=8.0)
+    with StubServer() as stub:
+        stub.add(response(429, headers={"Retry-After": "3"}), json_response({"ok": True}))
+        assert transport.post_json(f"{stub.url}/v1", {}) == {"ok": True}
+    assert sleeps == [3.0]
+
+
+def test_exhausted_retries_raise(sleeps):
+    transport = HTTPTransport(max_retries=2, backoff_base=0.25)
+    with StubServer() as stub:
+        stub.add(*[response(500)] * 3)
+        with pytest.raises(requests.HTTPError):
+            transport.post_json(f"{stub.url}/v1", {})
+        assert len(stub.requests) == 3
+    assert sleeps == [0.25, 0.5]
+    assert transport.stats.failures == 1 and transport.stats.retries == 2
+
+
+def test_connection_errors_are_retried(sleeps):
+    with StubServer() as stub:
+        url = stub.url
+    transport = HTTPTransport(max_retries=2, backoff_base=0.25)
+    with pytest.raises(requests.ConnectionError):
+        transport.post_json(f"{url}/v1", {})
+    assert sleeps == [0.25, 0.5]
+    assert transport.last_timing.attempts == 3 and not transport.last_timing.ok
+
+
+def test_stream_events_yields_sse_data():
+    transport = HTTPTransport()
+    with StubServer() as stub:
+        stub.add(sse_response(["a", "b"], chunk_size=4), json_response({"whole": 1}))
+        assert list(transport.stream_events(f"{stub.url}/v1", {})) == ["a", "b"]
+        assert list(transport.stream_events(f"{stub.url}/v1", {})) == ['{"whole": 1}']
+    assert transport.stats.calls == 2 and transport.stats.failures == 0
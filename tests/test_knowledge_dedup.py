@@ -0,0 +1,62 @@
+"""
+Tests for near-duplicate knowledge detection.
+"""
+
+import itertools
+import random
+import time
+from hypothesis import given, strategies as st, settings
+
+from core.mind.dedup import KnowledgeDeduper, cosine, vectorize
+
+
+entry_strategy = st.text(alphabet="abcdefg 创建文件子体合并[]", min_size=1, max_size=40)
+
+
+@settings(max_examples=100)
+@given(st.lists(entry_strategy, max_size=30))
+def test_merged_knowledge_has_no_near_duplicates(entries: list):
+    """
+    **Feature: knowledge-dedup, Property 1: No Near-Duplicates After Merge**
+
+    After merging any entries into an empty knowledge base, no two stored
+    entries SHALL reach the similarity threshold, and merging the same
+    entries again SHALL add nothing.
+    """
+    deduper = KnowledgeDeduper()
+    knowledge = []
+    deduper.merge_into(knowledge, entries)
+
+    for a, b in itertools.combinations(knowledge, 2):
+        va, vb = vectorize(a), vectorize(b)
+        assert not (va and vb and cosine(va, vb) >= deduper.threshold)
+    assert deduper.merge_into(knowledge, list(knowledge)) == 0
+
+
+def test_tagged_rewording_is_merged():
+    knowledge = [
+        "[Exp] Avoid vague or ambiguous naming or goals — specificity drives effectiveness.",
+        "[经验] 合并子文件时，应主动吸收其内容并删除冗余实体以节省资源。",
+    ]
+    deduper = KnowledgeDeduper()
+    added = deduper.merge_into(knowledge, [
+        "[经验] Avoid vague or ambiguous naming or goals; specificity drives effectiveness",
+        "[Parental Wisdom] 合并子文件时应主动吸收其内容，并删除冗余实体以节省资源和时间",
+        "[经验] 写入文件前先确认目录存在",
+    ])
+    assert added == 1
+    assert len(knowledge) == 3
+    assert knowledge[1].endswith("节省资源和时间")
+    assert deduper.stats == {"added": 1, "merged": 1, "rejected": 1}
+
+
+def test_short_entries_do_not_share_buckets():
+    """Short entries fill few MinHash slots; densification must keep them out of shared buckets."""
+    rng = random.Random(0)
+    entries = ["".join(chr(rng.randint(0x4E00, 0x9FFF)) for _ in range(10)) for _ in range(4000)]
+    deduper = KnowledgeDeduper()
+    knowledge = []
+    start = time.perf_counter()
+    assert deduper.merge_into(knowledge, entries) == len(entries)
+    assert time.perf_counter() - start < 5
+    assert max(len(bucket) for bucket in deduper._buckets.values()) < 50
@@ -0,0 +1,54 @@
+"""
+Tests for the lazy, section-level AgentState view.
+"""
+
+from hypothesis import given, strategies as st, settings
+
+from core.parser import parse_aml, parse_aml_lazy
+from core.parser.aml import SECTION_TAGS
+
+
+line_strategy = st.one_of(
+    st.text(alphabet="ab 任务:\t", max_size=10),
+    st.sampled_from(["? a", "! b", "✗ c", "~ d", "- [ ] e", "- [x] f", "[DONE] g", "[PENDING] h", "[X]",
+                     '? i <!-- {"retry_count": 1} -->', '[X] <!-- {"retry_count": 2} -->', "<!-- x -->"]),
+)
+body_strategy = st.lists(line_strategy, max_size=6).map("\n".join)
+
+
+@settings(max_examples=200)
+@given(
+    st.permutations(SECTION_TAGS),
+    st.lists(body_strategy, min_size=5, max_size=5),
+    st.sets(st.sampled_from(SECTION_TAGS)),
+    st.sampled_from(["\n", "\r\n"]),
+)
+def test_lazy_view_matches_full_parse(order, bodies, missing, newline):
+    """
+    **Feature: lazy-state, Property 1: Lazy Equals Eager**
+
+    For any document, every section of the lazy view and its pending count
+    SHALL equal what the full parser returns.
+    """
+    text = "".join(
+        f"<{tag}>\n{body}\n</{tag}>\n" for tag, body in zip(order, bodies) if tag not in missing
+    ).replace("\n", newline)
+    state = parse_aml(text.replace("\r\n", "\n"))
+    data = text.encode("utf-8")
+
+    assert parse_aml_lazy(data).pending_count == sum(1 for t in state.todo if t.status == "PENDING")
+    lazy = parse_aml_lazy(data)
+    assert lazy.to_state() == state
+    assert lazy.pending_count == sum(1 for t in state.todo if t.status == "PENDING")
+
+
+def test_unread_sections_are_never_decoded():
+    data = (
+        "<agent>\nname: 列表\n</agent>\n<memory>\n".encode("utf-8")
+        + b"\xff\xfe not utf-8\n"
+        + "</memory>\n<todo>\n? 任务\n! 完成\n</todo>\n".encode("utf-8")
+    )
+    lazy = parse_aml_lazy(data)
+    assert lazy.agent == {"name": "列表"}
+    assert lazy.pending_count == 1
+    assert "memory" not in lazy.__dict__
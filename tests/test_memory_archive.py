@@ -0,0 +1,68 @@
+"""
+Tests for the cold memory archive and its lookup index.
+"""
+
+import ast
+import os
+import tempfile
+from hypothesis import given, strategies as st, settings
+
+from core.state import MemoryArchive
+from core.state import archive as archive_module
+from core.text import tokenize
+
+
+entry_strategy = st.builds(
+    lambda day, text: f"[2025-12-{day:02d} 10:00:00] {text}",
+    st.integers(min_value=1, max_value=28),
+    st.text(alphabet="创建文件失败网页abc xyz", min_size=1, max_size=20),
+)
+
+
+@settings(max_examples=50, deadline=None)
+@given(st.lists(st.lists(entry_strategy, min_size=1, max_size=8), min_size=1, max_size=5), st.booleans())
+def test_every_archived_entry_is_recallable(batches: list, compress: bool):
+    """
+    **Feature: memory-archive, Property 1: Recall After Eviction**
+
+    Every archived entry SHALL be returned by a recall for its own text and
+    date, both from the live index and from an index rebuilt from the
+    archive file alone.
+    """
+    path = os.path.join(tempfile.mkdtemp(), "agent.md.archive")
+    archive = MemoryArchive(path, compress=compress)
+    for batch in batches:
+        archive.append(batch)
+
+    entries = [e for batch in batches for e in batch]
+    assert len(archive) == len(entries)
+
+    os.remove(archive.index_path)
+    rebuilt = MemoryArchive(path)
+    for entry in entries:
+        day = entry[1:11]
+        for source in (archive, rebuilt):
+            assert entry in source.recall(entry[22:], since=day, until=day, limit=len(entries))
+
+
+def test_interrupted_append_is_discarded():
+    path = os.path.join(tempfile.mkdtemp(), "agent.md.archive")
+    MemoryArchive(path, compress=True).append(["[2025-12-10 17:29:51] 创建 task 文件夹成功"])
+    with open(path, "ab") as f:
+        f.write(b'{"n": 1, "len": 999, "z": 0}\n["partial')
+
+    archive = MemoryArchive(path)
+    archive.append(["[2025-12-11 09:00:00] 写入 index.html 失败: 路径不存在"])
+    assert archive.recall("index.html") == ["[2025-12-11 09:00:00] 写入 index.html 失败: 路径不存在"]
+    assert MemoryArchive(path).recall(since="2025-12-10", until="2025-12-10") == \
+        ["[2025-12-10 17:29:51] 创建 task 文件夹成功"]
+    assert "归档中没有匹配" in archive.recall_text("mitosis")
+
+
+def test_archive_does_not_import_the_mind_package():
+    """The state layer tokenizes through core.text, so it no longer depends on core.mind."""
+    with open(archive_module.__file__, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = [node.module or "" for node in ast.walk(tree) if isinstance(node, ast.ImportFrom)]
+    assert not [m for m in modules if m.startswith("core.mind") or m.startswith("mind")]
+    assert archive_module.tokenize is tokenize
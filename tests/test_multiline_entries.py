@@ -0,0 +1,69 @@
+"""
+Tests for multi-line knowledge and memory entries in the AML format.
+"""
+
+from hypothesis import given, strategies as st, settings
+
+from core.parser import parse_aml, dump_aml, parse_entries
+from core.state import AgentState
+from runtime.parser import parse_md, dump_state
+
+
+line_strategy = st.text(alphabet="ab 任务:.-[]<>\t", max_size=15).map(str.rstrip)
+entry_strategy = st.lists(line_strategy, min_size=1, max_size=4).map("\n".join).map(str.strip).filter(
+    lambda e: e and "<" not in e
+)
+
+
+@settings(max_examples=200)
+@given(st.lists(entry_strategy, max_size=6), st.lists(entry_strategy, max_size=6))
+def test_multiline_entries_round_trip(knowledge, memory):
+    """
+    **Feature: multiline-entries, Property 1: One Entry Per Event**
+
+    For any entries spanning several lines, parsing the dumped document SHALL
+    return the same entries, so list lengths count logical entries, not lines.
+    """
+    state = AgentState(knowledge=knowledge, memory=memory)
+    parsed = parse_aml(dump_aml(state))
+    assert parsed.knowledge == knowledge
+    assert parsed.memory == memory
+    runtime_state = parse_md(dump_state(parse_md(dump_aml(state))))
+    assert runtime_state.memory == memory
+
+
+def test_unindented_continuations_after_timestamp():
+    """Files written before continuation indentation still group failure analyses by timestamp."""
+    content = (
+        "[2025-01-01 10:00:00] ✗ 失败分析: 1. 路径不存在\n"
+        "2. 权限不足\n"
+        "[摘要] 整理文档\n"
+        "[2025-01-01 10:05:00] ✓ 完成"
+    )
+    assert parse_entries(content, timestamped=True) == [
+        "[2025-01-01 10:00:00] ✗ 失败分析: 1. 路径不存在\n2. 权限不足",
+        "[摘要] 整理文档",
+        "[2025-01-01 10:05:00] ✓ 完成",
+    ]
+    assert len(parse_entries(content)) == 4
+
+
+def test_single_line_entries_unchanged():
+    text = "<knowledge>\n  a\nb\n\nc\n</knowledge>"
+    assert parse_aml(text).knowledge == ["a", "b", "c"]
+
+
+@settings(max_examples=200)
+@given(st.lists(st.text(alphabet="ab 任务:[]", max_size=12), max_size=8), st.booleans())
+def test_unindented_sections_parse_like_plain_lines(lines, timestamped):
+    """
+    **Feature: multiline-entries, Property 2: Plain Sections Unchanged**
+
+    A section with no indented lines, whose lines all start with "[" when
+    timestamped, SHALL parse to its non-empty lines exactly as before multi-line entries.
+    """
+    lines = [line.lstrip() for line in lines]
+    if timestamped:
+        lines = ["[2025-01-01 10:00:00] " + line for line in lines]
+    content = "\n".join(lines)
+    assert parse_entries(content, timestamped) == [line.strip() for line in lines if line.strip()]
@@ -0,0 +1,114 @@
+"""
+Tests for plan-ahead mode: one multi-step plan per task.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from hypothesis import given, strategies as st, settings
+
+from core.loop import AsyncLifeLoop
+from core.mind import CircuitBreaker
+from core.mind.planner import Planner, TASK_COMPLETE_TOOL
+from core.state import StateStore
+
+
+class _ScriptedLLM:
+    """Answers plan-ahead requests with a fixed step list and per-step plans with task_complete."""
+
+    def __init__(self, steps: list):
+        self.steps = steps
+        self.breaker = CircuitBreaker()
+        self.step_plans = 0
+
+    async def chat(self, messages, tools=None, **kwargs):
+        if tools:
+            self.step_plans += 1
+            call = {"id": "done", "type": "function",
+                    "function": {"name": TASK_COMPLETE_TOOL, "arguments": "{}"}}
+            return {"choices": [{"message": {"content": None, "tool_calls": [call]}}]}
+        if "JSON 数组" in messages[-1]["content"]:
+            return {"choices": [{"message": {"content": "计划如下：\n" + json.dumps(self.steps, ensure_ascii=False)}}]}
+        return {"choices": [{"message": {"content": "摘要"}}]}
+
+    async def summarize(self, text, max_length=100):
+        return text[:max_length]
+
+
+def _run(steps: list, task: str) -> tuple:
+    llm = _ScriptedLLM(steps)
+    path = os.path.join(tempfile.mkdtemp(), "agent.md")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"<agent>\nname: t\n</agent>\n<todo>\n? {task}\n</todo>\n")
+    loop = AsyncLifeLoop(StateStore(path), llm, plan_ahead=True)
+    stats = asyncio.run(loop.run_all())
+    return stats, loop, llm
+
+
+_SCHEMAS = [{"type": "function", "function": {
+    "name": "write_file", "parameters": {"properties": {"path": {}, "content": {}}}}}]
+
+
+@settings(max_examples=100)
+@given(st.lists(
+    st.fixed_dictionaries({
+        "tool": st.sampled_from(["write_file", "rm_rf"]),
+        "args": st.dictionaries(st.sampled_from(["path", "content"]), st.text(max_size=10)),
+        "expect": st.text(max_size=10),
+    }),
+    min_size=1, max_size=5,
+))
+def test_plan_only_contains_known_tools(steps: list):
+    """
+    **Feature: plan-ahead, Property 1: Validated Step Lists**
+
+    A step list naming only known tools SHALL be returned in order;
+    any unknown tool SHALL reject the whole plan so the loop falls back to per-step planning.
+    """
+    planner = Planner(_ScriptedLLM(steps), _SCHEMAS)
+    planned = asyncio.run(planner.plan_ahead({"name": "t"}, [], [], "任务"))
+    if any(step["tool"] != "write_file" for step in steps):
+        assert planned is None
+    else:
+        assert [(p.tool_call.name, p.tool_call.args, p.expect) for p in planned] == \
+            [(s["tool"], s["args"], s["expect"]) for s in steps]
+
+
+def test_successful_plan_needs_no_step_calls():
+    out = tempfile.mkdtemp()
+    steps = [
+        {"tool": "create_folder", "args": {"path": os.path.join(out, "docs")}, "expect": "created"},
+        {"tool": "write_file", "args": {"path": os.path.join(out, "docs", "a.txt"), "content": "x"}},
+        {"tool": "read_file", "args": {"path": os.path.join(out, "docs", "a.txt")}, "expect": "x"},
+    ]
+    stats, loop, llm = _run(steps, "写入 a.txt")
+    assert stats["completed"] == 1
+    assert llm.step_plans == 0
+    assert loop.plan_stats["llm_calls_saved"] == 2
+
+
+def test_divergence_falls_back_to_step_planning():
+    out = tempfile.mkdtemp()
+    steps = [
+        {"tool": "read_file", "args": {"path": os.path.join(out, "missing.txt")}},
+        {"tool": "write_file", "args": {"path": os.path.join(out, "b.txt"), "content": "y"}},
+    ]
+    stats, loop, llm = _run(steps, "整理 missing.txt")
+    assert stats["completed"] == 1
+    assert llm.step_plans == 1
+    assert not os.path.exists(os.path.join(out, "b.txt"))
+    assert loop.plan_stats["diverged"] == 1
+
+
+def test_unverified_plan_is_confirmed_by_step_planning():
+    out = tempfile.mkdtemp()
+    no_writes = [{"tool": "create_folder", "args": {"path": os.path.join(out, "docs")}, "expect": "created"}]
+    stats, loop, llm = _run(no_writes, "建立文档目录")
+    assert stats["completed"] == 1
+    assert llm.step_plans == 1
+
+    undecided = [{"tool": "write_file", "args": {"path": os.path.join(out, "notes.txt"), "content": "x"}}]
+    stats, loop, llm = _run(undecided, "整理笔记")
+    assert stats["completed"] == 1
+    assert llm.step_plans == 1
@@ -0,0 +1,113 @@
+"""
+Tests for completion signalling in planning responses.
+"""
+
+import asyncio
+import json
+from hypothesis import given, strategies as st, settings
+
+from core.mind import AsyncLLMClient, EndpointPool
+from core.mind.planner import Planner, TASK_COMPLETE_TOOL
+from tests.stub_server import StubServer, sse_response
+
+
+class _CannedLLM:
+    """Returns a fixed chat completion message."""
+
+    def __init__(self, message: dict):
+        self.message = message
+
+    async def chat(self, messages, tools=None, **kwargs):
+        return {"choices": [{"message": self.message}]}
+
+
+def _plan(message: dict):
+    planner = Planner(_CannedLLM(message), [])
+    return asyncio.run(planner.plan({"name": "t"}, [], [], "创建 a.md"))
+
+
+def _call(name: str, args: dict) -> dict:
+    return {"id": f"call_{name}", "type": "function",
+            "function": {"name": name, "arguments": json.dumps(args, ensure_ascii=False)}}
+
+
+@settings(max_examples=100)
+@given(st.text(max_size=100))
+def test_free_text_never_completes_without_marker(text: str):
+    """
+    **Feature: completion-signal, Property 1: No Substring False Positives**
+
+    Text such as "未完成" or "完成了一半" SHALL NOT mark the task complete;
+    only the task_complete tool or a line starting with DONE SHALL.
+    """
+    plan = _plan({"content": f"任务未完成。{text}".replace("DONE", "")})
+    assert not plan.task_completed
+
+
+def test_one_response_can_act_and_complete():
+    plan = _plan({"content": None, "tool_calls": [
+        _call("write_file", {"path": "a.md", "content": "x"}),
+        _call(TASK_COMPLETE_TOOL, {"summary": "a.md 已写入"}),
+    ]})
+    assert plan.tool_call.name == "write_file"
+    assert plan.task_completed and plan.final_answer == "a.md 已写入"
+
+    plan = _plan({"content": "DONE: 已写好"})
+    assert plan.task_completed
+
+
+def test_streamed_batch_keeps_every_call_and_completion():
+    calls = [
+        _call("read_file", {"path": "a.md"}),
+        _call("write_file", {"path": "b.md", "content": "内容"}),
+        _call(TASK_COMPLETE_TOOL, {"summary": "b.md 已写入"}),
+    ]
+    events = []
+    for index, call in enumerate(calls):
+        arguments = call["function"]["arguments"]
+        head = {"index": index, "id": call["id"], "function": {"name": call["function"]["name"], "arguments": ""}}
+        events.append({"choices": [{"delta": {"tool_calls": [head]}}]})
+        for i in range(0, len(arguments), 4):
+            part = {"index": index, "function": {"arguments": arguments[i:i + 4]}}
+            events.append({"choices": [{"delta": {"tool_calls": [part]}}]})
+    events.append({"choices": [{"delta": {}, "finish_reason": "tool_calls"}]})
+
+    with StubServer() as stub:
+        stub.add(sse_response([json.dumps(e, ensure_ascii=False) for e in events]))
+        llm = AsyncLLMClient(base_url=stub.url, endpoints=EndpointPool([stub.url]))
+        planner = Planner(llm, [], stream=True)
+        plan = asyncio.run(planner.plan({"name": "t"}, [], [], "创建 b.md"))
+    assert [(c.name, c.args) for c in plan.tool_calls] == [
+        ("read_file", {"path": "a.md"}), ("write_file", {"path": "b.md", "content": "内容"})
+    ]
+    assert plan.task_completed and plan.final_answer == "b.md 已写入"
+
+
+def test_malformed_arguments_become_an_observation():
+    plan = _plan({"content": None, "tool_calls": [
+        _call("read_file", {"path": "a"}),
+        {"id": "bad", "type": "function",
+         "function": {"name": "write_file", "arguments": '{"path": "a"}{"path": "b"}'}},
+    ]})
+    assert not plan.tool_calls and not plan.task_completed
+    assert plan.failure_reason.startswith("Error:") and "write_file" in plan.failure_reason
+
+
+@settings(max_examples=50)
+@given(st.sampled_from(["任务未完成，还缺少 b.md", "尚未成功写入", "not done yet", "完成度不足"]), st.text(max_size=30))
+def test_unparseable_verdict_is_not_completed(reply: str, suffix: str):
+    """
+    **Feature: completion-signal, Property 2: No Keyword Verdicts**
+
+    A completion check whose reply carries no JSON verdict SHALL report the
+    task as not completed, however the reply is worded.
+    """
+    planner = Planner(_CannedLLM({"content": reply + suffix.replace("{", "")}), [])
+    verdict = asyncio.run(planner.check_task_completion("创建 a.md 和 b.md", ["write_file(a.md)"], "ok"))
+    assert verdict["completed"] is False
+
+
+def test_json_verdict_is_normalized():
+    planner = Planner(_CannedLLM({"content": '结论：```json\n{"completed": "false", "reason": "缺 b.md"}\n```'}), [])
+    verdict = asyncio.run(planner.check_task_completion("创建 b.md", ["write_file(a.md)"], "ok"))
+    assert verdict["completed"] is False and verdict["reason"] == "缺 b.md"
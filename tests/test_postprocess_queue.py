@@ -0,0 +1,110 @@
+"""
+Tests for the background post-processing queue.
+"""
+
+import asyncio
+from hypothesis import given, strategies as st, settings
+
+from core.scheduler import PostProcessQueue
+
+
+@settings(max_examples=100)
+@given(st.lists(st.tuples(st.floats(min_value=0, max_value=0.002), st.booleans()), max_size=15))
+def test_jobs_run_in_submission_order(jobs: list):
+    """
+    **Feature: post-processing, Property 1: Ordered Completion**
+
+    Jobs SHALL finish in the order they were submitted regardless of how long
+    each takes, a failing job SHALL NOT stop later ones, and drain SHALL
+    return only after every submitted job has finished.
+    """
+    queue = PostProcessQueue()
+    finished = []
+
+    def job(i: int, delay: float, fails: bool):
+        async def run():
+            await asyncio.sleep(delay)
+            if fails:
+                raise RuntimeError("boom")
+            finished.append(i)
+        return run
+
+    async def main():
+        for i, (delay, fails) in enumerate(jobs):
+            queue.submit(job(i, delay, fails), f"job {i}")
+        await queue.drain()
+        assert queue.pending == 0
+
+    asyncio.run(main())
+    assert finished == [i for i, (_, fails) in enumerate(jobs) if not fails]
+    assert queue.failed == sum(fails for _, fails in jobs)
+
+
+def test_queue_survives_separate_event_loops():
+    queue = PostProcessQueue()
+    done = []
+
+    async def main(tag: str):
+        async def job():
+            done.append(tag)
+        queue.submit(job)
+        await queue.drain()
+
+    asyncio.run(main("first"))
+    asyncio.run(main("second"))
+    assert done == ["first", "second"]
+
+
+class _AnalystLLM:
+    """Answers failure analysis and follow-up prompts; fails them when asked to."""
+
+    def __init__(self, fail: bool = False):
+        from core.mind import CircuitBreaker
+        self.breaker = CircuitBreaker()
+        self.fail = fail
+
+    async def chat(self, messages, tools=None, **kwargs):
+        if self.fail:
+            raise RuntimeError("service down")
+        if "分析以下任务失败的原因" in messages[-1]["content"]:
+            return {"choices": [{"message": {"content": "目录不存在"}}]}
+        return {"choices": [{"message": {"content": "先创建目录再写文件"}}]}
+
+
+def _restart(journal: dict, fail: bool = False):
+    import json
+    import os
+    import tempfile
+    from core.loop import AsyncLifeLoop
+    from core.mind.memory import is_pending
+    from core.state import StateStore
+
+    path = os.path.join(tempfile.mkdtemp(), "agent.md")
+    done = "[2025-01-01 10:00:00] ✓ [待摘要] 写首页（经过2步完成）"
+    failed = "[2025-01-01 10:05:00] 失败分析: [待摘要] 写样式"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"<agent>\nname: t\n</agent>\n<memory>\n{done}\n{failed}\n</memory>\n<todo>\n! 写首页\n✗ 写样式\n</todo>\n")
+    if journal:
+        with open(path + ".pending.json", "w", encoding="utf-8") as f:
+            json.dump({failed: {"kind": "failure", "task": "写样式", "actions": ["write_file({'path': 'a/b.css'})"],
+                                "last_result": "Error: No such directory"}}, f, ensure_ascii=False)
+
+    asyncio.run(AsyncLifeLoop(StateStore(path), _AnalystLLM(fail)).run_once())
+    state = StateStore(path).load()
+    assert not any(is_pending(m) for m in state.memory)
+    assert not os.path.exists(path + ".pending.json")
+    return state
+
+
+def test_restart_resubmits_journaled_jobs_and_settles_orphans():
+    """Placeholders left by a crashed process are completed on the next start."""
+    state = _restart(journal=True)
+    assert "[2025-01-01 10:00:00] ✓ 写首页（经过2步完成）" in state.memory
+    assert "[2025-01-01 10:05:00] 失败分析: 目录不存在" in state.memory
+    assert [t.content for t in state.todo if t.status == "PENDING"] == ["[续] 先创建目录再写文件"]
+
+
+def test_restart_falls_back_to_local_summary_when_llm_fails():
+    state = _restart(journal=True, fail=True)
+    analysis = [m for m in state.memory if m.startswith("[2025-01-01 10:05:00] 失败分析: ")]
+    assert len(analysis) == 1 and "write_file" in analysis[0] and "No such directory" in analysis[0]
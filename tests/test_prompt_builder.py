@@ -0,0 +1,47 @@
+"""
+Property-based tests for the prefix-stable planner prompt layout.
+"""
+
+import json
+from hypothesis import given, strategies as st, settings
+
+from core.mind.prompt import PromptBuilder
+
+
+agent_strategy = st.fixed_dictionaries({
+    "name": st.text(min_size=1, max_size=20),
+    "objective": st.text(max_size=50),
+    "style": st.text(max_size=20),
+})
+
+items_strategy = st.lists(st.text(max_size=40), max_size=15)
+
+
+@settings(max_examples=100)
+@given(agent_strategy, items_strategy, items_strategy, items_strategy, st.text(max_size=30), st.text(max_size=30))
+def test_volatile_content_never_touches_the_prefix(
+    agent: dict, knowledge: list, memory_a: list, memory_b: list, task_a: str, task_b: str
+):
+    """
+    **Feature: prompt-layout, Property 1: Stable Prefix**
+
+    For a fixed agent and knowledge base, two steps that differ only in memory
+    and task SHALL produce byte-identical system messages, and the measured
+    common prefix SHALL cover at least the whole serialized system message.
+    """
+    builder = PromptBuilder([{"type": "function", "function": {"name": "write_file"}}])
+    first = builder.build(agent, knowledge, memory_a, task_a)
+    second = builder.build(agent, knowledge, memory_b, task_b)
+
+    assert first[0] == second[0]
+    assert [m["role"] for m in second] == ["system", "user"]
+    system_chars = len(json.dumps([second[0]], ensure_ascii=False)) - 1
+    assert builder.stats.prefix_chars >= system_chars
+
+
+def test_server_reported_cache_hits():
+    builder = PromptBuilder([])
+    builder.record_response({"timings": {"cache_n": 90, "prompt_n": 10}})
+    builder.record_response({"usage": {"prompt_tokens": 100, "prompt_tokens_details": {"cached_tokens": 50}}})
+    builder.record_response({"choices": []})
+    assert builder.stats.server_hit_rate == 140 / 200
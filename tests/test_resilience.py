@@ -0,0 +1,53 @@
+"""
+Tests for the LLM circuit breaker and adaptive timeouts.
+"""
+
+import time
+from hypothesis import given, strategies as st, settings
+
+from core.mind.resilience import AdaptiveTimeout, CircuitBreaker, CircuitOpenError, TIMEOUT_MIN_SAMPLES
+
+
+@settings(max_examples=100)
+@given(st.lists(st.floats(min_value=0.001, max_value=1000), min_size=TIMEOUT_MIN_SAMPLES, max_size=50))
+def test_adaptive_timeout_is_bounded_and_covers_p99(latencies: list):
+    """
+    **Feature: resilience, Property 1: Bounded Adaptive Timeout**
+
+    With enough samples, the timeout SHALL lie within [min, max] and SHALL
+    never be shorter than the observed p99 unless capped by max.
+    """
+    timeouts = AdaptiveTimeout(min_timeout=5, max_timeout=600)
+    for latency in latencies:
+        timeouts.record("planning", latency)
+
+    timeout = timeouts.timeout("planning")
+    ordered = sorted(latencies)
+    p99 = ordered[int(0.99 * (len(ordered) - 1))]
+    assert 5 <= timeout <= 600
+    assert timeout >= min(p99, 600)
+    assert timeouts.timeout("summary") == 600
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.is_open and not breaker.allow()
+    try:
+        breaker.raise_if_open()
+        assert False, "expected CircuitOpenError"
+    except CircuitOpenError:
+        pass
+
+    time.sleep(0.06)
+    assert breaker.allow()       # half-open probe
+    assert not breaker.allow()   # others still rejected while probing
+    breaker.record_failure()
+    assert breaker.is_open
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open and breaker.allow()
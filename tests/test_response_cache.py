@@ -0,0 +1,77 @@
+"""
+Tests for the content-addressed LLM response cache.
+"""
+
+import shutil
+import tempfile
+from hypothesis import given, strategies as st, settings
+
+from core.mind.cache import ResponseCache
+
+
+message_strategy = st.fixed_dictionaries({
+    "role": st.sampled_from(["system", "user", "assistant"]),
+    "content": st.text(max_size=50),
+})
+
+payload_strategy = st.fixed_dictionaries({
+    "model": st.sampled_from(["qwen/qwen3-vl-4b", "other"]),
+    "messages": st.lists(message_strategy, min_size=1, max_size=4),
+    "temperature": st.sampled_from([0.0, 0.1, 0.2]),
+    "max_tokens": st.integers(min_value=1, max_value=1024),
+})
+
+
+def _response(text: str) -> dict:
+    return {"choices": [{"message": {"content": text}}]}
+
+
+@settings(max_examples=50)
+@given(payload_strategy, st.text(max_size=50))
+def test_disk_tier_survives_restart(payload: dict, text: str):
+    """
+    **Feature: response-cache, Property 1: Crash-Safe Replay**
+
+    For any request stored by one cache instance, a fresh instance over the
+    same directory SHALL return the identical response from the disk tier.
+    """
+    cache_dir = tempfile.mkdtemp()
+    try:
+        key = ResponseCache.make_key(payload)
+        ResponseCache(cache_dir).put(key, _response(text))
+
+        restarted = ResponseCache(cache_dir)
+        assert restarted.get(key) == _response(text)
+        assert restarted.stats.disk_hits == 1
+        assert restarted.get(key) == _response(text)
+        assert restarted.stats.memory_hits == 1
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+@settings(max_examples=50)
+@given(payload_strategy)
+def test_key_ignores_transport_only_fields(payload: dict):
+    """
+    **Feature: response-cache, Property 2: Content Addressing**
+
+    The key SHALL depend only on (model, messages, tools, temperature,
+    max_tokens); fields such as stream or tool_choice SHALL not change it.
+    """
+    extended = dict(payload, stream=True, tool_choice="auto")
+    assert ResponseCache.make_key(payload) == ResponseCache.make_key(extended)
+    changed = dict(payload, max_tokens=payload["max_tokens"] + 1)
+    assert ResponseCache.make_key(payload) != ResponseCache.make_key(changed)
+
+
+def test_ttl_and_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.put(key, _response(key))
+    assert cache.get("a") is None
+    assert cache.get("c") == _response("c")
+
+    expired = ResponseCache(ttl=-1)
+    expired.put("a", _response("a"))
+    assert expired.get("a") is None
+    assert expired.stats.misses == 1
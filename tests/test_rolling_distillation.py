@@ -0,0 +1,68 @@
+"""
+Tests for hierarchical incremental memory distillation.
+"""
+
+import asyncio
+from hypothesis import given, strategies as st, settings
+
+from core.mind.memory import MemoryManager, DIGEST_LIMIT, DIGEST_WINDOW, KEEP_COUNT, is_digest
+
+
+class _RecordingLLM:
+    """Answers every request with a fixed text and records each prompt size."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.prompt_lines = []
+
+    async def chat(self, messages, **kwargs):
+        self.prompt_lines.append(messages[-1]["content"].count("\n"))
+        if self.fail:
+            return None
+        return {"choices": [{"message": {"content": "- 先建目录再写文件\n- 写入后读取确认"}}]}
+
+
+def _feed(llm, entries: list) -> tuple:
+    manager = MemoryManager(llm)
+    memory, knowledge = [], []
+    for entry in entries:
+        memory.append(entry)
+        if manager.should_distill(memory):
+            new_knowledge, memory = asyncio.run(manager.distill(memory))
+            knowledge.extend(new_knowledge)
+    return memory, knowledge
+
+
+@settings(max_examples=50)
+@given(st.lists(st.text(alphabet="abc 任务写入", min_size=1, max_size=10), max_size=150))
+def test_levels_stay_bounded(entries: list):
+    """
+    **Feature: rolling-distillation, Property 1: Bounded Levels**
+
+    Appending memory one entry at a time and distilling whenever asked SHALL
+    keep raw entries below KEEP_COUNT + DIGEST_WINDOW and digests at most
+    DIGEST_LIMIT, with no single request carrying more than one window.
+    """
+    entries = [e.replace("\n", " ") for e in entries]
+    llm = _RecordingLLM()
+    memory, knowledge = _feed(llm, entries)
+
+    digests = sum(1 for m in memory if is_digest(m))
+    assert len(memory) - digests < KEEP_COUNT + DIGEST_WINDOW
+    assert digests <= DIGEST_LIMIT
+    assert memory[len(memory) - min(len(entries), KEEP_COUNT):] == entries[len(entries) - min(len(entries), KEEP_COUNT):]
+    assert all(lines <= DIGEST_WINDOW + 4 for lines in llm.prompt_lines)
+
+
+def test_digests_roll_up_into_knowledge():
+    entries = [f"记忆 {i}" for i in range(DIGEST_WINDOW * (DIGEST_LIMIT + 1) + KEEP_COUNT)]
+    memory, knowledge = _feed(_RecordingLLM(), entries)
+    assert knowledge == ["[经验] 先建目录再写文件", "[经验] 写入后读取确认"]
+    assert sum(1 for m in memory if is_digest(m)) == 1
+    assert memory[-KEEP_COUNT:] == entries[-KEEP_COUNT:]
+
+
+def test_failed_distillation_keeps_entries():
+    entries = [f"记忆 {i}" for i in range(DIGEST_WINDOW + KEEP_COUNT)]
+    memory, knowledge = _feed(_RecordingLLM(fail=True), entries)
+    assert memory == entries and knowledge == []
@@ -0,0 +1,82 @@
+"""
+Tests for the mtime-validated in-memory cache in StateStore.
+"""
+
+import os
+import tempfile
+from hypothesis import given, strategies as st, settings
+
+from core.parser import parse_aml
+from core.state import AgentState, TodoItem, StateStore
+
+
+text_strategy = st.text(alphabet="ab 任务:[]\n", max_size=15).map(str.strip).filter(bool)
+state_strategy = st.builds(
+    AgentState,
+    agent=st.fixed_dictionaries({"name": st.just("t")}),
+    memory=st.lists(text_strategy, max_size=5),
+    todo=st.lists(st.builds(
+        TodoItem,
+        content=text_strategy.map(lambda s: s.replace("\n", " ")),
+        action_history=st.lists(st.text(max_size=5), max_size=2),
+    ), max_size=3),
+)
+
+
+def _store() -> StateStore:
+    path = os.path.join(tempfile.mkdtemp(), "agent.md")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<agent>\nname: t\n</agent>\n<todo>\n? 任务\n</todo>\n")
+    return StateStore(path)
+
+
+@settings(max_examples=100)
+@given(state_strategy)
+def test_cached_loads_equal_file_and_are_independent(state):
+    """
+    **Feature: state-cache, Property 1: Cache Equals File**
+
+    After a save, the next load SHALL re-read the file once, later loads SHALL
+    be served from the cache, every load SHALL equal a fresh parse of the file,
+    and mutating a returned object SHALL not leak into later loads.
+    """
+    store = _store()
+    store.save(state)
+    loaded = store.load()
+    with open(store.filepath, "r", encoding="utf-8") as f:
+        assert loaded == parse_aml(f.read())
+    assert store.stats["hits"] == 0 and store.stats["misses"] == 1
+
+    loaded.memory.append("changed")
+    for item in loaded.todo:
+        item.status = "DONE"
+        item.action_history.append("x")
+    assert store.load() == parse_aml(open(store.filepath, encoding="utf-8").read())
+    assert store.stats["hits"] == 1 and store.stats["misses"] == 1
+
+
+def test_external_change_and_force_reload_miss():
+    store = _store()
+    store.load()
+    store.load()
+    assert store.stats == {"misses": 1, "hits": 1}
+
+    with open(store.filepath, "a", encoding="utf-8") as f:
+        f.write("<memory>\n外部修改\n</memory>\n")
+    assert store.load().memory == ["外部修改"]
+    assert store.stats["misses"] == 2
+
+    store.load(force=True)
+    assert store.stats["misses"] == 3
+
+
+def test_replaced_file_with_same_size_and_mtime_is_reloaded():
+    store = _store()
+    store.load()
+    stat = os.stat(store.filepath)
+    tmp_path = store.filepath + ".new"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(open(store.filepath, encoding="utf-8").read().replace("? 任务", "! 任务"))
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_path, store.filepath)
+    assert store.load().todo[0].status == "DONE"
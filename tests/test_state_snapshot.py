@@ -0,0 +1,75 @@
+"""
+Tests for the binary state snapshot kept next to each DNA file.
+"""
+
+import os
+import tempfile
+from hypothesis import given, strategies as st, settings
+
+from core.parser import parse_aml
+from core.state import AgentState, TodoItem, StateStore, load_state
+from core.state.snapshot import snapshot_path, read_snapshot, file_key
+
+
+text_strategy = st.text(alphabet="ab 任务:[]-\n", max_size=20).map(str.strip).filter(bool)
+state_strategy = st.builds(
+    AgentState,
+    agent=st.fixed_dictionaries({"name": st.sampled_from(["t", "任务体"])}),
+    knowledge=st.lists(text_strategy, max_size=4),
+    memory=st.lists(text_strategy, max_size=4),
+    todo=st.lists(st.builds(
+        TodoItem,
+        content=text_strategy.map(lambda s: s.replace("\n", " ")),
+        status=st.sampled_from(["PENDING", "DONE", "FAILED"]),
+        retry_count=st.integers(0, 3),
+        action_history=st.lists(st.text(max_size=8), max_size=2),
+    ), max_size=4),
+)
+
+
+def _path() -> str:
+    return os.path.join(tempfile.mkdtemp(), "agent.md")
+
+
+@settings(max_examples=100)
+@given(state_strategy)
+def test_snapshot_matches_parsed_file(state):
+    """
+    **Feature: state-snapshot, Property 1: Snapshot Equals Source**
+
+    After the first load of a saved file, the snapshot SHALL be fresh and hold
+    exactly the state that parsing the .md file yields.
+    """
+    path = _path()
+    StateStore(path).save(state)
+    assert not os.path.exists(snapshot_path(path))
+    load_state(path, snapshot=True)
+    with open(path, "rb") as f:
+        data = f.read()
+    cached = read_snapshot(path, file_key(path, data))
+    assert cached is not None
+    assert cached == parse_aml(data.decode("utf-8")) == load_state(path, snapshot=True)
+
+
+def test_same_size_edit_with_same_mtime_is_detected():
+    path = _path()
+    StateStore(path).save(AgentState(agent={"name": "t"}, todo=[TodoItem("aaa")]))
+    stat = os.stat(path)
+    with open(path, "r+", encoding="utf-8") as f:
+        content = f.read()
+        f.seek(0)
+        f.write(content.replace("? aaa", "! aaa"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert load_state(path, snapshot=True).todo[0].status == "DONE"
+
+
+def test_corrupt_or_missing_snapshot_falls_back_to_parsing():
+    path = _path()
+    state = AgentState(agent={"name": "t"}, memory=["[2025-01-01 10:00:00] 记忆"])
+    StateStore(path).save(state)
+    with open(snapshot_path(path), "wb") as f:
+        f.write(b"\x00garbage")
+    assert load_state(path, snapshot=True) == state
+    os.remove(snapshot_path(path))
+    assert load_state(path, snapshot=True) == state
+    assert os.path.exists(snapshot_path(path))
@@ -0,0 +1,98 @@
+"""
+Property-based tests for the streaming completion parser.
+"""
+
+import json
+from hypothesis import given, strategies as st, settings
+
+from core.mind.stream import JSONCloseScanner, StreamParser
+from core.tools.executor import ToolCall
+
+
+json_args_strategy = st.dictionaries(
+    keys=st.text(min_size=1, max_size=10),
+    values=st.one_of(st.text(max_size=50), st.integers(), st.booleans()),
+    max_size=5
+)
+
+
+def _split(text: str, cuts: list[int]) -> list[str]:
+    """Split text into fragments at the given cut points."""
+    points = sorted({c % (len(text) + 1) for c in cuts})
+    pieces, last = [], 0
+    for p in points:
+        pieces.append(text[last:p])
+        last = p
+    pieces.append(text[last:])
+    return pieces
+
+
+@settings(max_examples=100)
+@given(json_args_strategy, st.lists(st.integers(min_value=0), max_size=10))
+def test_tool_call_emitted_exactly_when_arguments_close(args: dict, cuts: list[int]):
+    """
+    **Feature: streaming, Property 1: Early Tool-Call Detection**
+
+    For any argument object split into arbitrary SSE fragments, the parser
+    SHALL emit the ToolCall on the fragment that closes the JSON object,
+    and never before.
+    """
+    fragments = _split(json.dumps(args, ensure_ascii=False), cuts)
+    parser = StreamParser()
+    parser.feed({"choices": [{"delta": {"tool_calls": [
+        {"index": 0, "id": "call_1", "function": {"name": "write_file", "arguments": ""}}
+    ]}}]})
+
+    emitted = []
+    for i, fragment in enumerate(fragments):
+        calls = parser.feed({"choices": [{"delta": {"tool_calls": [
+            {"index": 0, "function": {"arguments": fragment}}
+        ]}}]})
+        if calls:
+            emitted.append((i, calls))
+
+    last_non_empty = max(i for i, f in enumerate(fragments) if f)
+    assert len(emitted) == 1
+    index, calls = emitted[0]
+    assert index == last_non_empty
+    assert calls == [ToolCall(name="write_file", args=args)]
+
+
+@settings(max_examples=100)
+@given(st.lists(st.text(max_size=20), max_size=10))
+def test_text_deltas_are_forwarded_and_assembled(deltas: list[str]):
+    """
+    **Feature: streaming, Property 2: Thought Streaming**
+
+    Every content delta SHALL be forwarded to on_text in order, and the
+    assembled message content SHALL equal their concatenation.
+    """
+    seen = []
+    parser = StreamParser(on_text=seen.append)
+    for delta in deltas:
+        parser.feed({"choices": [{"delta": {"content": delta}}]})
+
+    assert "".join(seen) == "".join(deltas)
+    assert parser.message()["content"] == "".join(deltas)
+    assert "tool_calls" not in parser.message()
+
+
+def test_scanner_ignores_braces_inside_strings():
+    scanner = JSONCloseScanner()
+    assert not scanner.feed('{"a": "}]\\"')
+    assert not scanner.feed(' {"')
+    assert scanner.feed('}')
+
+
+def test_non_streaming_fallback_keeps_calls_apart():
+    """Servers that ignore stream=true send one message whose tool_calls carry no index."""
+    parser = StreamParser()
+    calls = parser.feed({"choices": [{"message": {"content": None, "tool_calls": [
+        {"id": "a", "type": "function", "function": {"name": "read_file", "arguments": '{"path": "a"}'}},
+        {"id": "b", "type": "function", "function": {"name": "write_file", "arguments": '{"path": "b", "content": "x"}'}},
+    ]}, "finish_reason": "tool_calls"}]})
+    assert calls == [
+        ToolCall(name="read_file", args={"path": "a"}),
+        ToolCall(name="write_file", args={"path": "b", "content": "x"}),
+    ]
+    assert [c["function"]["name"] for c in parser.message()["tool_calls"]] == ["read_file", "write_file"]
@@ -0,0 +1,54 @@
+"""
+Property-based tests for the per-task tool-observation conversation.
+"""
+
+from hypothesis import given, strategies as st, settings
+
+from core.mind.conversation import TaskConversation
+from core.tools.executor import ToolCall
+
+
+step_strategy = st.tuples(
+    st.sampled_from(["read_file", "write_file", None]),
+    st.text(max_size=2000),
+)
+
+
+@settings(max_examples=100)
+@given(st.lists(step_strategy, min_size=1, max_size=12), st.integers(min_value=200, max_value=3000))
+def test_history_fits_budget_and_pairs_tool_results(steps: list, budget: int):
+    """
+    **Feature: conversation, Property 1: Bounded, Well-Formed History**
+
+    After every step the history SHALL fit the token budget unless only the
+    newest step remains, and every tool message SHALL answer the tool call
+    in the assistant message right before it.
+    """
+    conversation = TaskConversation(token_budget=budget)
+    for i, (tool, observation) in enumerate(steps):
+        calls = [ToolCall(name=tool, args={"path": f"f{i}.md"})] if tool else []
+        conversation.add_step(f"thought {i}", calls, [observation] if tool else [], action_log=f"step {i}")
+
+        messages = conversation.messages()
+        assert conversation.tokens() <= budget or len(conversation) == 1
+        for prev, message in zip(messages, messages[1:]):
+            if message["role"] == "tool":
+                assert prev["tool_calls"][0]["id"] == message["tool_call_id"]
+
+
+@settings(max_examples=50)
+@given(st.lists(st.text(max_size=100), min_size=2, max_size=6))
+def test_history_is_append_only_under_budget(observations: list):
+    """
+    **Feature: conversation, Property 2: Growing Prefix**
+
+    While the history is under budget, each step SHALL only append messages,
+    so the previous request is a prefix of the next one.
+    """
+    conversation = TaskConversation(token_budget=100000)
+    previous = []
+    for i, observation in enumerate(observations):
+        conversation.add_step(None, [ToolCall(name="read_file", args={"path": "a"}, id=f"c{i}")], [observation])
+        messages = conversation.messages()
+        assert messages[:len(previous)] == previous
+        previous = messages
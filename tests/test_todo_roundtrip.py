@@ -0,0 +1,126 @@
+"""
+Tests for lossless todo serialization: status, retries, history and failure reason.
+"""
+
+import asyncio
+import os
+import tempfile
+from hypothesis import given, strategies as st, settings
+
+from core.loop import AsyncLifeLoop
+from core.mind import CircuitBreaker
+from core.parser import parse_aml, dump_aml
+from core.state import AgentState, StateStore, TodoItem
+from runtime.parser import parse_md, dump_state
+
+
+content_strategy = st.text(
+    alphabet=st.characters(blacklist_categories=("Cs", "Cc", "Zl", "Zp")), min_size=1, max_size=30
+).map(str.strip).filter(lambda s: s and "</todo>" not in s and "<!--" not in s)
+
+todo_strategy = st.builds(
+    TodoItem,
+    content=content_strategy,
+    status=st.sampled_from(["PENDING", "IN_PROGRESS", "DONE", "FAILED"]),
+    retry_count=st.integers(min_value=0, max_value=5),
+    max_retries=st.integers(min_value=1, max_value=5),
+    action_history=st.lists(st.text(max_size=20), max_size=4),
+    failure_reason=st.text(max_size=40),
+)
+
+
+@settings(max_examples=200)
+@given(st.lists(todo_strategy, max_size=6))
+def test_todo_round_trip_is_lossless(todos):
+    """
+    **Feature: todo-roundtrip, Property 1: Lossless Round-Trip**
+
+    For any todo list, parsing the dumped document SHALL reproduce every field
+    of every item, including retry counts, action history and failure reasons.
+    """
+    state = AgentState(agent={"name": "t"}, todo=todos)
+    assert parse_aml(dump_aml(state)).todo == todos
+
+
+def test_plain_todos_stay_plain():
+    state = AgentState(todo=[TodoItem("写文档"), TodoItem("发布", status="DONE")])
+    assert "<!--" not in dump_aml(state)
+
+
+def test_legacy_syntax_still_parses():
+    text = "<todo>\n? a\n! b\n- [ ] c\n- [x] d\n[FAILED] e\n✗ f\n~ g\n</todo>"
+    todos = parse_aml(text).todo
+    assert [(t.content, t.status) for t in todos] == [
+        ("a", "PENDING"), ("b", "DONE"), ("c", "PENDING"), ("d", "DONE"),
+        ("e", "FAILED"), ("f", "FAILED"), ("g", "IN_PROGRESS"),
+    ]
+    assert all(t.retry_count == 0 and not t.action_history for t in todos)
+
+
+@settings(max_examples=200)
+@given(st.lists(todo_strategy, max_size=6))
+def test_runtime_round_trip_keeps_status_and_metadata(todos):
+    """
+    **Feature: todo-roundtrip, Property 2: Runtime Parser Agreement**
+
+    The runtime parser SHALL read the same statuses and contents as the core
+    parser, and rewriting a file through the runtime SHALL lose no todo field.
+    """
+    text = dump_aml(AgentState(agent={"name": "t"}, todo=todos))
+    runtime_todos = parse_md(text).todo
+    assert [(t.status, t.content) for t in runtime_todos] == [(t.status, t.content) for t in todos]
+    assert parse_aml(dump_state(parse_md(text))).todo == todos
+
+
+@settings(max_examples=100)
+@given(
+    content_strategy,
+    st.sampled_from(['<!-- {"retry_count": 2} -->', "<!-- {} -->", "<!-- {not json} -->", "<!--{x}-->"]),
+    st.integers(min_value=0, max_value=2),
+)
+def test_content_ending_in_a_comment_survives(content, comment, retry_count):
+    """
+    **Feature: todo-roundtrip, Property 3: Comment-Like Content**
+
+    A todo whose content itself ends in an HTML comment SHALL keep that
+    content verbatim, whether or not the item carries metadata.
+    """
+    todos = [TodoItem(f"{content} {comment}", retry_count=retry_count)]
+    text = dump_aml(AgentState(agent={"name": "t"}, todo=todos))
+    assert parse_aml(text).todo == todos
+    assert parse_aml(dump_state(parse_md(text))).todo == todos
+
+
+class _IdleLLM:
+    """Never calls a tool, so every attempt at a task runs out of steps; never proposes a follow-up."""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+        self.step_plans = 0
+
+    async def chat(self, messages, tools=None, **kwargs):
+        self.step_plans += bool(tools)
+        return {"choices": [{"message": {"content": "还在想" if tools else ""}}]}
+
+
+@settings(max_examples=10, deadline=None)
+@given(st.integers(min_value=0, max_value=4), st.integers(min_value=0, max_value=2))
+def test_retry_budget_comes_from_the_todo(max_retries, retry_count):
+    """
+    **Feature: todo-roundtrip, Property 4: Per-Task Retry Budget**
+
+    A task SHALL be attempted until its own stored max_retries is used up,
+    counting retries already spent, with MAX_RETRIES used when it is unset.
+    """
+    path = os.path.join(tempfile.mkdtemp(), "agent.md")
+    todo = TodoItem("任务", retry_count=retry_count, max_retries=max_retries)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dump_aml(AgentState(agent={"name": "t"}, todo=[todo])))
+    llm = _IdleLLM()
+    loop = AsyncLifeLoop(StateStore(path), llm)
+    loop.MAX_STEPS_PER_TASK = 1
+    asyncio.run(loop.run_all())
+
+    budget = max_retries or AsyncLifeLoop.MAX_RETRIES
+    assert llm.step_plans == max(0, budget - retry_count)
+    assert StateStore(path).load().todo[0].status == "FAILED"
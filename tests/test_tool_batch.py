@@ -0,0 +1,71 @@
+"""
+Tests for batched tool execution.
+"""
+
+import threading
+import time
+from hypothesis import given, strategies as st, settings
+
+from core.tools.executor import ToolCall, ToolExecutor
+from core.tools.registry import ToolRegistry
+
+
+def _registry(store: dict) -> ToolRegistry:
+    registry = ToolRegistry()
+    registry.register(
+        name="get",
+        description="read a key",
+        parameters={"type": "object", "properties": {"key": {"type": "string"}}},
+        handler=lambda key: store.get(key, ""),
+        modifies_state=False,
+    )
+    registry.register(
+        name="put",
+        description="write a key",
+        parameters={"type": "object", "properties": {"key": {"type": "string"}, "value": {"type": "string"}}},
+        handler=lambda key, value: store.__setitem__(key, value) or "ok",
+        modifies_state=True,
+    )
+    return registry
+
+
+call_strategy = st.one_of(
+    st.builds(lambda k: ToolCall(name="get", args={"key": k}), st.sampled_from("abc")),
+    st.builds(lambda k, v: ToolCall(name="put", args={"key": k, "value": v}),
+              st.sampled_from("abc"), st.text(max_size=5)),
+)
+
+
+@settings(max_examples=100)
+@given(st.lists(call_strategy, max_size=12))
+def test_batch_matches_sequential_execution(calls: list):
+    """
+    **Feature: tool-batch, Property 1: Sequential Semantics**
+
+    Running a batch SHALL produce the same per-call outputs, in the same
+    order, as executing the calls one by one.
+    """
+    sequential_store, batch_store = {}, {}
+    sequential = ToolExecutor(_registry(sequential_store))
+    expected = [sequential.execute(call).output for call in calls]
+
+    results = ToolExecutor(_registry(batch_store)).execute_batch(calls)
+    assert [r.output for r in results] == expected
+    assert batch_store == sequential_store
+
+
+def test_read_only_calls_run_concurrently():
+    registry = ToolRegistry()
+    threads = set()
+
+    def slow_read(key: str) -> str:
+        threads.add(threading.current_thread().name)
+        time.sleep(0.2)
+        return key
+
+    registry.register(name="slow", description="", parameters={}, handler=slow_read, modifies_state=False)
+    start = time.perf_counter()
+    results = ToolExecutor(registry).execute_batch([ToolCall(name="slow", args={"key": str(i)}) for i in range(4)])
+    assert [r.output for r in results] == ["0", "1", "2", "3"]
+    assert time.perf_counter() - start < 0.6
+    assert len(threads) > 1
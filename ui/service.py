@@ -11,7 +11,8 @@ from dataclasses import dataclass
 from typing import Generator
 
 from core.agent import Agent
-from core.parser.aml import parse_aml
+from core.parser import parse_aml_lazy
+from core.state import StateStore, load_state
 from ui.logger import UILogCapture
 from ui.errors import safe_execute, safe_execute_generator, format_error
 
@@ -186,12 +187,11 @@ class AgentUIService:
                 continue
             
             try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    content = f.read()
-                
-                state = parse_aml(content)
+                # Only the agent and todo sections are decoded; knowledge and memory are skipped
+                with open(filepath, "rb") as f:
+                    state = parse_aml_lazy(f.read())
                 agent_name = state.agent.get("name", filename)
-                pending_count = sum(1 for item in state.todo if item.status == "PENDING")
+                pending_count = state.pending_count
                 
                 result.append(TaskFileInfo(
                     path=filepath,
@@ -242,21 +242,16 @@ class AgentUIService:
             raise FileNotFoundError(target_file)
         
         # Load current state from file
-        with open(target_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        state = parse_aml(content)
+        store = StateStore(target_file)
+        state = store.load()
         
         # Add new task with PENDING status
         from core.state.models import TodoItem
         new_task = TodoItem(content=task_content, status="PENDING")
         state.todo.append(new_task)
         
-        # Persist to file immediately
-        from core.parser.aml import dump_aml
-        new_content = dump_aml(state)
-        with open(target_file, "w", encoding="utf-8") as f:
-            f.write(new_content)
+        # Persist to file immediately (refreshes the state snapshot as well)
+        store.save(state)
         
         # If current agent is using this file, reload its state
         if self.current_agent and self.current_agent.dna_file == target_file:
@@ -369,10 +364,7 @@ class AgentUIService:
             return f"❌ 文件未找到: {file}"
         
         try:
-            with open(file, "r", encoding="utf-8") as f:
-                content = f.read()
-            
-            state = parse_aml(content)
+            state = load_state(file)
             agent_name = state.agent.get("name", os.path.basename(file))
             
             # Convert todo items to dict format for display